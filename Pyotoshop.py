@@ -350,39 +350,59 @@ class Main(QtGui.QMainWindow):
             label_text.setText('- Packed Texture Format - 24 bit .tga -')
 
     @classmethod
-    def scandir_to_dict(cls, path):
-        """Converts the tuples created from scandir walk to dictionaries.
+    def scandir_walk(cls, path):
+        """Lazily walks the root directory and yields textures as they are found.
 
-        Tuple Indexes:
-            [0] {string}- directory path
-            [1] {list} - list of sub directories
-            [2] {list} - list of files in the directory path
+        Nothing is collected up front, each directory is yielded as soon as
+        it has been listed, in the same top down order as scandir.walk, so
+        analysis can start while the rest of the tree is still being walked.
+        Files are filtered by EXTENSIONS during the walk and kept as DirEntry
+        objects so the stat data gathered by the listing can be reused.
 
         Arguments:
             path (string): root directory folder
 
-        Returns:
-            dictionary -- dicionary containing the results of scandir.walk
+        Yields:
+            tuple -- (directory path, list of DirEntry texture files) for
+                each directory that contains textures
         """
 
-        # list of dictionaries
-        scandir_entries = []
+        # stack of directories still to be listed
+        pending_dirs = [path]
+
+        while pending_dirs:
+            directory = pending_dirs.pop()
+
+            try:
+                dir_entries = list(scandir.scandir(directory))
+            except OSError:
+                # unreadable directories are skipped, same as scandir.walk
+                continue
+
+            sub_dirs = []
+            texture_files = []
+
+            for entry in dir_entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
 
-        # walk through directory, sub directories, and files
-        for entry in scandir.walk(path):
-            temp = {}
-            temp['Directory'] = entry[0]
-            temp['Sub_Dirs'] = entry[1]
-            temp['Files'] = entry[2]
+                if is_dir:
+                    sub_dirs.append(entry.path)
+                elif entry.name.lower().endswith(EXTENSIONS):
+                    texture_files.append(entry)
 
-            scandir_entries.append(temp)
+            # reversed so sub directories are popped in listing order
+            pending_dirs.extend(reversed(sub_dirs))
 
-        return scandir_entries
+            if texture_files:
+                yield directory, texture_files
 
     def parse_texture_to_resize(self, path):
         """Parse through root directory and determine which actions to take.
-        Parses input root and uses self.scandir_to_dict to get the directory,
-        all subfolders and files into a dictionary format.
+        Parses input root and uses self.scandir_walk to lazily get each
+        directory and the textures it contains.
 
         Arguments:
             path (string): path to analyze
@@ -395,31 +415,25 @@ class Main(QtGui.QMainWindow):
             'Not Power of 2': [],
             'Not Square': []}
 
-        # use self.scandir_to_dict to walk across the root directory
-        # and output the values to a dictionary
-        scandir_list = self.scandir_to_dict(path)
-
+        # the number of directories is unknown until the walk is done,
+        # so the progress dialog is shown as a busy indicator
         progress_dialog = self.popup_progress_window(
-            'Finding Textures to Resize', len(scandir_list))
+            'Finding Textures to Resize', 0)
 
-        # iterate across list of dictionary that contains the
-        # root directory, subfolders, and files
-        for index, entry in enumerate(scandir_list):
+        # iterate across the directories as self.scandir_walk finds them
+        for index, (directory, dir_files) in enumerate(self.scandir_walk(path)):
 
             if progress_dialog.wasCanceled():
                 texture_analysis_dict.clear()
                 break
 
-            # print str(entry)
             texture_analysis_dict = self.analyze_textures_to_resize(
-                str(entry['Directory']), entry['Files'], texture_analysis_dict)
+                str(directory), dir_files, texture_analysis_dict)
 
             progress_dialog.setValue(index)
 
             progress_dialog.setLabelText(
-                'Searching for Textures in {0}...'.format(str(entry['Directory'])))
-
-        progress_dialog.setValue(len(scandir_list))
+                'Searching for Textures in {0}...'.format(str(directory)))
 
         progress_dialog.close()
 
@@ -458,7 +472,8 @@ class Main(QtGui.QMainWindow):
         Arguments:
             directory_path (string): Input directory to analyze and
                 parse through
-            dir_files (list): Input list of files to iterate through
+            dir_files (list): Input list of scandir.DirEntry texture files
+                to iterate through
             texture_dict (dictionary): Dictionary used to store
                 different scenarios and return the results of the analysis
 
@@ -468,9 +483,10 @@ class Main(QtGui.QMainWindow):
         """
 
         # iterate over scandir_entries in found subdirectory
-        for current_file in dir_files:
+        for file_entry in dir_files:
 
-            current_file_path = os.path.join(directory_path, current_file)
+            current_file = file_entry.name
+            current_file_path = file_entry.path
 
             # check if file extension exists in extension list
             if current_file.lower().endswith(EXTENSIONS):
@@ -564,8 +580,8 @@ class Main(QtGui.QMainWindow):
 
     def parse_texture_dirs_to_pack(self, path):
         """Parse through root directory and determine which actions to take.
-        Parses input root and uses self.scandir_to_dict to get the directory,
-        all subfolders and files into a dictionary format.
+        Parses input root and uses self.scandir_walk to lazily get each
+        directory and the textures it contains.
 
         Arguments:
             path (string): path to analyze
@@ -585,16 +601,15 @@ class Main(QtGui.QMainWindow):
             if self.r_channel_le.text() and self.g_channel_le.text() and \
                     self.b_channel_le.text():
 
-                # use self.scandir_to_dict to walk across the root directory
-                # and output the values to a dictionary
-                scandir_list = self.scandir_to_dict(path)
-
+                # the number of directories is unknown until the walk is
+                # done, so the progress dialog is shown as a busy indicator
                 progress_dialog = self.popup_progress_window(
-                    'Finding Textures to Pack', len(scandir_list))
+                    'Finding Textures to Pack', 0)
 
-                # iterate across list of dictionary that contains the
-                # root directory, subfolders, and files
-                for index, entry in enumerate(scandir_list):
+                # iterate across the directories as self.scandir_walk
+                # finds them
+                for index, (directory, dir_files) in enumerate(
+                        self.scandir_walk(path)):
 
                     if progress_dialog.wasCanceled():
                         texture_analysis_dict.clear()
@@ -602,16 +617,13 @@ class Main(QtGui.QMainWindow):
                         break
 
                     texture_analysis_dict = self.analyze_textures_to_pack(
-                        str(entry['Directory']), entry['Files'],
-                        texture_analysis_dict)
+                        str(directory), dir_files, texture_analysis_dict)
 
                     progress_dialog.setValue(index)
 
                     progress_dialog.setLabelText(
                         'Searching for Textures in {0}...'.format(
-                            str(entry['Directory'])))
-
-                progress_dialog.setValue(len(scandir_list))
+                            str(directory)))
 
                 progress_dialog.close()
 
@@ -643,7 +655,8 @@ class Main(QtGui.QMainWindow):
         Arguments:
             directory_path (string): Input directory to analyze and
                                         parse through
-            dir_files (list): Input list of files to iterate through
+            dir_files (list): Input list of scandir.DirEntry texture files
+                                to iterate through
             texture_dict (dictionary): Dictionary used to
                                         store different scenarios and
                                         return the results of the analysis
@@ -661,10 +674,11 @@ class Main(QtGui.QMainWindow):
         a_texture = ''
 
         # iterate over scandir_entries in a directory
-        for current_file in dir_files:
+        for file_index, file_entry in enumerate(dir_files):
 
-            # store current path by joining directory and the current file name
-            current_file_path = os.path.join(directory_path, current_file)
+            # DirEntry already stores the joined directory and file name
+            current_file = file_entry.name
+            current_file_path = file_entry.path
 
             # check if file extension exists in extension list
             if current_file.lower().endswith(EXTENSIONS):
@@ -701,7 +715,7 @@ class Main(QtGui.QMainWindow):
             # print 'length ' + str(len(dir_files) - 1)
 
             # if last iteration/element of directory files to search through
-            if dir_files.index(current_file) == len(dir_files) - 1:
+            if file_index == len(dir_files) - 1:
 
                 # check if a value for R, G, and B is found to continue
                 # should run only once within each directory
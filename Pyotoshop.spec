@@ -2,12 +2,17 @@
 
 block_cipher = None
 
+# imported on first use through Pyotoshop.lazy, which the import analysis
+# does not follow, keep in sync with lazy.PIL_PLUGINS
+lazy_imports = ['numpy', 'PIL.Image', 'PIL.PngImagePlugin',
+                'PIL.JpegImagePlugin', 'PIL.TgaImagePlugin']
 
-a = Analysis(['Pyotoshop.py'],
-             pathex=['D:\\GitHub\\PythonPhotoshop'],
+
+a = Analysis(['src\\PyotoshopLauncher.py'],
+             pathex=['D:\\GitHub\\PythonPhotoshop\\src'],
              binaries=[],
              datas=[],
-             hiddenimports=[],
+             hiddenimports=lazy_imports,
              hookspath=[],
              runtime_hooks=[],
              excludes=[],
@@ -16,14 +21,21 @@ a = Analysis(['Pyotoshop.py'],
              cipher=block_cipher)
 pyz = PYZ(a.pure, a.zipped_data,
              cipher=block_cipher)
+# one folder build, a one file executable unpacks every library to a
+# temporary directory on each start and UPX compressed libraries are
+# decompressed as they load, both delay the window
 exe = EXE(pyz,
           a.scripts,
-          a.binaries,
-          a.zipfiles,
-          a.datas,
+          exclude_binaries=True,
           name='Pyotoshop',
           debug=False,
           strip=False,
-          upx=True,
-          runtime_tmpdir=None,
+          upx=False,
           console=False )
+coll = COLLECT(exe,
+               a.binaries,
+               a.zipfiles,
+               a.datas,
+               strip=False,
+               upx=False,
+               name='Pyotoshop')
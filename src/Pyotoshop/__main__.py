@@ -0,0 +1,16 @@
+"""Runs the command line interface, python -m Pyotoshop --help lists it."""
+
+import sys
+
+from .startup import mark_startup, report_startup, start_profiling
+
+start_profiling()
+
+from .cli import main  # pylint: disable = C0413
+
+mark_startup('command line imported')
+
+try:
+    sys.exit(main())
+finally:
+    report_startup()
@@ -0,0 +1,98 @@
+"""Parallel execution helpers for the texture analysis."""
+
+import collections
+import multiprocessing
+import multiprocessing.pool
+
+from .index import TextureIndex
+
+
+def read_texture_records(texture_stats, canceled=None):
+    """Reads the metadata of textures that are missing from the texture index.
+
+    Runs inside the worker pool, so only picklable arguments are used.
+
+    Arguments:
+        texture_stats (list): (path, mtime, size) tuples of the textures
+
+    Keyword Arguments:
+        canceled (callable): returns True to stop reading the remaining
+            textures, only usable with a thread pool (default: {None})
+
+    Returns:
+        list -- TextureRecord for each texture read
+    """
+
+    texture_records = []
+
+    for path, mtime, size in texture_stats:
+        if canceled is not None and canceled():
+            break
+
+        texture_records.append(TextureIndex.read_texture(path, mtime, size))
+
+    return texture_records
+
+
+def ordered_results(function, jobs, workers=None, use_processes=False):
+    """Runs a function over jobs in a worker pool and yields results in order.
+
+    Jobs are pulled lazily from the jobs iterable on the calling thread and
+    only a bounded number of them are in flight at once, so the iterable can
+    be a directory walk that is still running. Results are yielded in the
+    same order as the jobs regardless of which worker finishes first, which
+    keeps the merged output deterministic.
+
+    Closing the generator, for example by breaking out of the loop consuming
+    it, terminates the pool and discards any job still in flight.
+
+    Arguments:
+        function (callable): module level function applied to each job
+        jobs (iterable): (context, argument) tuples, the context stays on
+            the calling thread and argument is passed to function
+
+    Keyword Arguments:
+        workers (int): number of workers, defaults to the number of CPUs and
+            runs the jobs inline if it is 1 (default: {None})
+        use_processes (bool): use a process pool instead of a thread pool,
+            the argument and result must then be picklable
+            (default: {False})
+
+    Yields:
+        tuple -- (context, result) for each job
+    """
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    if workers <= 1:
+        for context, argument in jobs:
+            yield context, function(argument)
+        return
+
+    if use_processes:
+        pool = multiprocessing.Pool(workers)
+    else:
+        pool = multiprocessing.pool.ThreadPool(workers)
+
+    # keep every worker busy while bounding how far ahead of the consumer
+    # the job iterable is read
+    max_pending = workers * 4
+    pending = collections.deque()
+
+    try:
+        for context, argument in jobs:
+            pending.append((context, pool.apply_async(function, (argument,))))
+
+            if len(pending) >= max_pending:
+                context, async_result = pending.popleft()
+                yield context, async_result.get()
+
+        while pending:
+            context, async_result = pending.popleft()
+            yield context, async_result.get()
+
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,597 @@
+"""Resize backends used by Pyotoshop.texture_resize."""
+
+import os
+
+from .lazy import Image, numpy
+from .cache import decoded_image_cache
+from .extendscript import PhotoshopScriptRunner
+from .extendscript import resize_script_job, run_script_jobs
+from .tga import TgaError, TgaMemmap, write_tga
+from .tiled import DEFAULT_MEMORY_BUDGET, TiledResizeError
+from .tiled import needs_tiling, tiled_resize
+
+
+class ResizeBackend(object):
+    """
+    Base class of the engines that resize a texture and save the result.
+
+    A backend is started once before a batch, resize is called for every
+    texture and finish is called once the batch is complete.
+    """
+
+    name = ''
+
+    def __init__(self, pyotoshop):
+        """Stores the Pyotoshop instance the backend reports to.
+
+        Arguments:
+            pyotoshop (Pyotoshop): instance driving the batch
+        """
+
+        super(ResizeBackend, self).__init__()
+        self.pyotoshop = pyotoshop
+
+    def is_available(self):
+        """Checks if the backend can run on this machine.
+
+        Returns:
+            bool -- True if the backend can resize textures
+        """
+
+        return True
+
+    def start(self):
+        """Prepares the backend before the first texture is resized."""
+
+    def resize(self, texture_path, target_size, file_name):
+        """Resizes a texture to a square target size and saves it.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_size (int): width and height of the resized texture
+            file_name (string): path the resized texture is saved to
+        """
+
+        raise NotImplementedError
+
+    def resize_chain(self, texture_path, target_sizes, file_names):
+        """Resizes a texture to several square sizes and saves each one.
+
+        Backends override this to decode the texture only once, the base
+        implementation resizes from the source for every size.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_sizes (list): sizes to resize to, largest first
+            file_names (list): path each resized texture is saved to
+        """
+
+        for target_size, file_name in zip(target_sizes, file_names):
+            self.resize(texture_path, target_size, file_name)
+
+    def flush(self):
+        """Completes the queued resizes without reporting to the user."""
+
+    def failed_paths(self):
+        """Gets the textures the backend failed to resize after queueing.
+
+        Resizes that fail in resize_chain raise instead, so only backends
+        that queue their resizes report failures here.
+
+        Returns:
+            list -- path of each texture that failed to resize
+        """
+
+        return []
+
+    def finish(self, message):
+        """Reports the end of the batch.
+
+        Arguments:
+            message (string): message shown to the user
+        """
+
+        self.pyotoshop.popup_ok_window(message)
+
+
+class PillowResizeBackend(ResizeBackend):
+    """
+    Resizes textures in process with Pillow, no Photoshop required.
+
+    Textures too large to decode within the memory budget of the Pyotoshop
+    instance are resized in strips by tiled.tiled_resize instead.
+    """
+
+    name = 'pillow'
+
+    @property
+    def tga_rle(self):
+        """bool -- True if resized TGA files are RLE compressed."""
+
+        return getattr(self.pyotoshop, 'tga_rle', False)
+
+    def resize(self, texture_path, target_size, file_name):
+        """Resizes a texture with Pillow's bicubic filter and saves it.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_size (int): width and height of the resized texture
+            file_name (string): path the resized texture is saved to
+        """
+
+        if self.resize_tiled(texture_path, target_size, file_name):
+            return
+
+        resized_image = self.decode(texture_path, target_size).resize(
+            (target_size, target_size), Image.BICUBIC)
+
+        save_image(resized_image, file_name, self.tga_rle)
+
+    def decode(self, texture_path, target_size):
+        """Decodes a texture through the shared decoded image cache.
+
+        JPEGs that are not cached are decoded at a reduced scale with draft
+        instead, which is cheaper than a full decode and is not cached.
+
+        Arguments:
+            texture_path (string): path of the texture
+            target_size (int): size the texture is resized to
+
+        Returns:
+            PIL.Image -- decoded image, which must not be modified
+        """
+
+        decoded_images = decoded_image_cache()
+
+        if not texture_path.lower().endswith('.jpg'):
+            return decoded_images.load(texture_path)
+
+        image = decoded_images.get(texture_path)
+
+        if image is None:
+            image = Image.open(texture_path)
+
+            # lets libjpeg decode at a reduced scale
+            image.draft(image.mode, (target_size, target_size))
+            image.load()
+
+        return image
+
+    def resize_tiled(self, texture_path, target_size, file_name):
+        """Resizes a texture in strips if it does not fit the memory budget.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_size (int): width and height of the resized texture
+            file_name (string): path the resized texture is saved to
+
+        Returns:
+            bool -- True if the texture was resized in strips, False if it
+                should be decoded in full
+        """
+
+        memory_budget = getattr(
+            self.pyotoshop, 'resize_memory_budget', DEFAULT_MEMORY_BUDGET)
+
+        texture_record = self.pyotoshop.open_texture_index().lookup_path(
+            texture_path)
+
+        # JPEGs are never tiled, draft already decodes them at a reduced scale
+        if texture_path.lower().endswith('.jpg') or not needs_tiling(
+                texture_record.width, texture_record.height,
+                texture_record.channels, memory_budget):
+            return False
+
+        try:
+            tiled_resize(
+                texture_path, target_size, file_name, memory_budget,
+                self.tga_rle)
+        except TiledResizeError:
+            # unsupported variants such as 16 bit or interlaced PNGs
+            return False
+
+        return True
+
+    def resize_chain(self, texture_path, target_sizes, file_names):
+        """Decodes a texture once and saves every size of a mip chain.
+
+        Each level is reduced from the previous one, so when the sizes halve
+        every step, as TEXTURE_SIZES does, all but the first level are an
+        exact 2x2 box average and the total filter work is about a third
+        more than the largest level alone.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_sizes (list): sizes to resize to, largest first
+            file_names (list): path each resized texture is saved to
+        """
+
+        # a texture too large to decode is reduced in strips to the first
+        # level, which is then small enough to decode for the rest
+        if self.resize_tiled(texture_path, target_sizes[0], file_names[0]):
+            texture_path = file_names[0]
+            target_sizes = target_sizes[1:]
+            file_names = file_names[1:]
+
+            if not target_sizes:
+                return
+
+        level_image = self.decode(texture_path, target_sizes[0])
+
+        for target_size, file_name in zip(target_sizes, file_names):
+            level_width, level_height = level_image.size
+
+            if level_width == level_height == target_size * 2:
+                resample = Image.BOX
+            else:
+                resample = Image.BICUBIC
+
+            level_image = level_image.resize(
+                (target_size, target_size), resample)
+
+            save_image(level_image, file_name, self.tga_rle)
+
+
+class NumpyResizeBackend(PillowResizeBackend):
+    """
+    Resizes textures with box filtered NumPy reductions.
+
+    When every size of a chain divides the one before it, each level is the
+    average of whole blocks of pixels of the previous level. Uncompressed
+    TGAs are read through a memory map instead of being decoded, other
+    formats come from the decoded image cache. Textures too large for the
+    memory budget are reduced in strips by tiled.tiled_resize first, like
+    PillowResizeBackend does. Chains with other sizes are resized with
+    Pillow.
+    """
+
+    name = 'numpy'
+
+    def resize(self, texture_path, target_size, file_name):
+        """Resizes a texture to a square target size and saves it.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_size (int): width and height of the resized texture
+            file_name (string): path the resized texture is saved to
+        """
+
+        self.resize_chain(texture_path, [target_size], [file_name])
+
+    def resize_chain(self, texture_path, target_sizes, file_names):
+        """Reduces a texture through every size of a mip chain.
+
+        A texture too large for the memory budget is reduced in strips to
+        the first level, which is then small enough to load for the rest.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_sizes (list): sizes to resize to, largest first
+            file_names (list): path each resized texture is saved to
+        """
+
+        texture_record = self.pyotoshop.open_texture_index().lookup_path(
+            texture_path)
+
+        level_width, level_height = texture_record.width, texture_record.height
+
+        for target_size in target_sizes:
+            if level_width % target_size or level_height % target_size:
+                super(NumpyResizeBackend, self).resize_chain(
+                    texture_path, target_sizes, file_names)
+                return
+
+            level_width = level_height = target_size
+
+        if self.resize_tiled(texture_path, target_sizes[0], file_names[0]):
+            texture_path = file_names[0]
+            target_sizes = target_sizes[1:]
+            file_names = file_names[1:]
+
+            if not target_sizes:
+                return
+
+        level_pixels = self.load_pixels(texture_path, target_sizes[0])
+        save_image(Image.fromarray(level_pixels), file_names[0], self.tga_rle)
+
+        for target_size, file_name in zip(target_sizes[1:], file_names[1:]):
+            level_pixels = box_reduce(level_pixels, target_size, target_size)
+
+            save_image(Image.fromarray(level_pixels), file_name, self.tga_rle)
+
+    @classmethod
+    def load_pixels(cls, texture_path, target_size):
+        """Gets the pixels of a texture box reduced to a square size.
+
+        Uncompressed TGAs are reduced straight from the mapped file in its
+        BGR(A) order and only the reduced pixels are reordered, the mapping
+        is closed before returning.
+
+        Arguments:
+            texture_path (string): path of the texture
+            target_size (int): width and height of the reduced pixels
+
+        Returns:
+            numpy.ndarray -- uint8 array of L, RGB or RGBA pixels, top to
+                bottom
+        """
+
+        try:
+            source = TgaMemmap(texture_path)
+        except TgaError:
+            source = None
+
+        if source is not None:
+            with source:
+                level_pixels = box_reduce(source.rows, target_size, target_size)
+
+                if source.alpha is None:
+                    return numpy.ascontiguousarray(level_pixels[..., 2::-1])
+
+                return level_pixels[..., [2, 1, 0, 3]]
+
+        image = decoded_image_cache().load(texture_path)
+
+        if image.mode not in ('L', 'RGB', 'RGBA'):
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        return box_reduce(numpy.asarray(image), target_size, target_size)
+
+
+class PhotoshopResizeBackend(ResizeBackend):
+    """
+    Resizes textures by driving Photoshop through COM.
+    """
+
+    name = 'photoshop'
+
+    def __init__(self, pyotoshop):
+        super(PhotoshopResizeBackend, self).__init__(pyotoshop)
+        self.ps_app = None
+
+    def is_available(self):
+        """Checks if Photoshop can be launched on this OS, without a popup.
+
+        Returns:
+            bool -- True if the Photoshop session is available
+        """
+
+        return self.pyotoshop.open_photoshop_session().is_available()
+
+    def start(self):
+        """Launches Photoshop."""
+
+        self.ps_app = self.pyotoshop.launch_photoshop()
+
+    def resize(self, texture_path, target_size, file_name):
+        """Opens a texture in Photoshop, resizes it and saves a duplicate.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_size (int): width and height of the resized texture
+            file_name (string): path the resized texture is saved to
+        """
+
+        # open texture file in Photoshop
+        current_ps_doc = self.ps_app.Open(texture_path)
+
+        # incase Photoshop was already open, make current
+        # document the active document
+        self.ps_app.Application.ActiveDocument  # pylint: disable = W0104
+
+        # call the Photoshop resize operation
+        current_ps_doc.resizeImage(target_size, target_size)
+
+        # call function to Save As the resized texture
+        self.pyotoshop.save_as(self.ps_app, current_ps_doc, file_name)
+
+        # close original version without saving
+        current_ps_doc.Close(2)
+
+    def resize_chain(self, texture_path, target_sizes, file_names):
+        """Opens a texture once and resizes it down through every size.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_sizes (list): sizes to resize to, largest first
+            file_names (list): path each resized texture is saved to
+        """
+
+        current_ps_doc = self.ps_app.Open(texture_path)
+
+        self.ps_app.Application.ActiveDocument  # pylint: disable = W0104
+
+        # each level is resized from the previous one in the same document
+        for target_size, file_name in zip(target_sizes, file_names):
+            current_ps_doc.resizeImage(target_size, target_size)
+            self.pyotoshop.save_as(self.ps_app, current_ps_doc, file_name)
+
+        current_ps_doc.Close(2)
+
+    def finish(self, message):
+        """Asks the user if they are done with Photoshop.
+
+        Arguments:
+            message (string): message shown to the user
+        """
+
+        self.pyotoshop.close_photoshop(message, self.ps_app)
+
+
+class ExtendScriptResizeBackend(ResizeBackend):
+    """
+    Resizes textures in Photoshop with batched ExtendScript programs.
+
+    Resizes are queued and every script_batch_size of them are compiled
+    into one program run with a single DoJavaScript call, instead of a COM
+    call for every Open, resizeImage, SaveAs and Close.
+    """
+
+    name = 'extendscript'
+
+    def __init__(self, pyotoshop):
+        super(ExtendScriptResizeBackend, self).__init__(pyotoshop)
+        self.runner = None
+        self.pending_jobs = []
+        self.failed_results = []
+
+    def is_available(self):
+        """Checks if there is a runner for the scripts, without a popup.
+
+        Returns:
+            bool -- True if a stand in runner is set or Photoshop can be
+                launched on this OS
+        """
+
+        return self.pyotoshop.script_runner is not None or \
+            self.pyotoshop.open_photoshop_session().is_available()
+
+    def start(self):
+        """Gets the script runner of the Pyotoshop instance."""
+
+        self.runner = self.pyotoshop.open_script_runner()
+
+    def resize(self, texture_path, target_size, file_name):
+        """Queues the resize of a texture.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_size (int): width and height of the resized texture
+            file_name (string): path the resized texture is saved to
+        """
+
+        self.resize_chain(texture_path, [target_size], [file_name])
+
+    def resize_chain(self, texture_path, target_sizes, file_names):
+        """Queues a texture to be opened once and resized through every size.
+
+        Arguments:
+            texture_path (string): path of the texture to resize
+            target_sizes (list): sizes to resize to, largest first
+            file_names (list): path each resized texture is saved to
+        """
+
+        self.pending_jobs.append(resize_script_job(
+            texture_path, target_sizes, file_names, self.pyotoshop.tga_rle))
+
+        if len(self.pending_jobs) >= self.pyotoshop.script_batch_size:
+            self.flush()
+
+    def flush(self):
+        """Runs the queued resizes as one script."""
+
+        pending_jobs, self.pending_jobs = self.pending_jobs, []
+
+        for _, script_results in run_script_jobs(
+                self.runner, pending_jobs, len(pending_jobs)):
+            self.failed_results.extend(
+                script_result for script_result in script_results
+                if not script_result.ok)
+
+    def failed_paths(self):
+        """Gets the textures whose script failed.
+
+        Returns:
+            list -- path of each texture that failed to resize
+        """
+
+        return [x.job['source'] for x in self.failed_results]
+
+    def finish(self, message):
+        """Runs the remaining resizes and reports any that failed.
+
+        Arguments:
+            message (string): message shown to the user
+        """
+
+        self.flush()
+
+        message = self.pyotoshop.script_results_message(
+            message, self.failed_results)
+
+        if isinstance(self.runner, PhotoshopScriptRunner):
+            self.pyotoshop.close_photoshop(message, self.runner.ps_app)
+        else:
+            self.pyotoshop.popup_ok_window(message)
+
+
+RESIZE_BACKENDS = {
+    PillowResizeBackend.name: PillowResizeBackend,
+    NumpyResizeBackend.name: NumpyResizeBackend,
+    PhotoshopResizeBackend.name: PhotoshopResizeBackend,
+    ExtendScriptResizeBackend.name: ExtendScriptResizeBackend}
+
+
+def box_reduce(pixels, width, height):
+    """Reduces an image by averaging whole blocks of pixels.
+
+    Arguments:
+        pixels (numpy.ndarray): uint8 array of shape (rows, columns) or
+            (rows, columns, bands), whose size is a multiple of the target
+        width (int): width of the reduced image
+        height (int): height of the reduced image
+
+    Returns:
+        numpy.ndarray -- uint8 array of the reduced image
+    """
+
+    block_height = pixels.shape[0] // height
+    block_width = pixels.shape[1] // width
+
+    if block_height == block_width == 1:
+        return numpy.ascontiguousarray(pixels)
+
+    blocks = pixels.reshape(
+        (height, block_height, width, block_width) + pixels.shape[2:])
+
+    block_area = block_height * block_width
+
+    # integer sums rounded to nearest, like Pillow's box filter
+    block_sums = blocks.sum(axis=(1, 3), dtype=numpy.uint32)
+
+    return ((block_sums + block_area // 2) // block_area).astype(numpy.uint8)
+
+
+def save_image(image, file_name, rle=False):
+    """Saves an image the same way Pyotoshop.save_as does in Photoshop.
+
+    TGA files are written as 32 bit when the image has more than 3 channels
+    and as 24 bit otherwise, matching save_tga.
+
+    Arguments:
+        image (PIL.Image): image to save
+        file_name (string): path of the file, the extension picks the format
+
+    Keyword Arguments:
+        rle (bool): RLE compress TGA files with tga.write_tga, they are
+            saved uncompressed otherwise (default: {False})
+    """
+
+    file_extension = os.path.splitext(file_name)[1].lower()
+
+    channel_count = len(image.getbands())
+
+    if file_extension == '.tga':
+        image = image.convert('RGBA' if channel_count > 3 else 'RGB')
+
+        if rle:
+            alpha = None
+
+            if image.mode == 'RGBA':
+                alpha = numpy.asarray(image.getchannel('A'))
+
+            write_tga(
+                file_name, numpy.asarray(image.convert('RGB')), alpha, True)
+        else:
+            image.save(file_name)
+
+    elif file_extension == '.jpg':
+        if image.mode not in ('L', 'RGB', 'CMYK'):
+            image = image.convert('RGB')
+        image.save(file_name, quality=95)
+
+    else:
+        if image.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            image = image.convert('RGBA' if channel_count > 3 else 'RGB')
+        image.save(file_name)
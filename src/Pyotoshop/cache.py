@@ -0,0 +1,211 @@
+"""Process wide cache of decoded images shared by the resize and pack steps."""
+
+import os
+import threading
+import collections
+
+from .lazy import Image
+
+# Global Variables ------------------------------------------------------------
+DEFAULT_CACHE_BUDGET = 512 * 1024 * 1024
+
+CacheStats = collections.namedtuple(
+    'CacheStats', ['hits', 'misses', 'evictions', 'entries', 'size', 'budget'])
+
+
+class DecodedImageCache(object):
+    """
+    Least recently used cache of decoded images with a byte budget.
+
+    Images are keyed by path, modification time and file size, so an edited
+    texture is decoded again. Cached images are shared between callers and
+    must not be modified, Pillow operations such as convert and resize
+    return new images and are safe to use on them.
+    """
+
+    def __init__(self, budget=DEFAULT_CACHE_BUDGET):
+        """Creates an empty cache.
+
+        Keyword Arguments:
+            budget (int): bytes of pixel data kept before the least
+                recently used images are evicted (default:
+                {DEFAULT_CACHE_BUDGET})
+        """
+
+        super(DecodedImageCache, self).__init__()
+
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.images = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def image_key(cls, path):
+        """Builds the cache key of an image file.
+
+        Arguments:
+            path (string): path of the image
+
+        Returns:
+            tuple -- (path, mtime, size) of the file
+        """
+
+        file_stat = os.stat(path)
+
+        return path, file_stat.st_mtime, file_stat.st_size
+
+    @classmethod
+    def image_size(cls, image):
+        """Estimates the bytes of pixel data held by a decoded image.
+
+        Arguments:
+            image (PIL.Image): decoded image
+
+        Returns:
+            int -- width * height * bands
+        """
+
+        width, height = image.size
+
+        return width * height * len(image.getbands())
+
+    def get(self, path):
+        """Gets a decoded image if it is cached.
+
+        Arguments:
+            path (string): path of the image
+
+        Returns:
+            PIL.Image -- the cached image, or None
+        """
+
+        image_key = self.image_key(path)
+
+        with self.lock:
+            image = self.images.get(image_key)
+
+            if image is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            # mark as the most recently used image
+            del self.images[image_key]
+            self.images[image_key] = image
+
+            return image
+
+    def load(self, path):
+        """Gets a decoded image, decoding and caching it on a miss.
+
+        Arguments:
+            path (string): path of the image
+
+        Returns:
+            PIL.Image -- the fully decoded image
+        """
+
+        image = self.get(path)
+
+        if image is None:
+            image = Image.open(path)
+            image.load()
+
+            self.put(path, image)
+
+        return image
+
+    def put(self, path, image):
+        """Adds a decoded image, evicting the least recently used ones.
+
+        Images larger than the budget are not cached.
+
+        Arguments:
+            path (string): path of the image
+            image (PIL.Image): fully decoded image
+        """
+
+        image_key = self.image_key(path)
+        image_size = self.image_size(image)
+
+        if image_size > self.budget:
+            return
+
+        with self.lock:
+            if image_key in self.images:
+                self.size -= self.image_size(self.images.pop(image_key))
+
+            self.images[image_key] = image
+            self.size += image_size
+
+            self.evict(self.budget)
+
+    def evict(self, budget):
+        """Evicts the least recently used images until the cache fits.
+
+        Must be called with the lock held.
+
+        Arguments:
+            budget (int): bytes the cache has to fit in
+        """
+
+        while self.size > budget and self.images:
+            evicted_image = self.images.popitem(last=False)[1]
+            self.size -= self.image_size(evicted_image)
+            self.evictions += 1
+
+    def set_budget(self, budget):
+        """Changes the byte budget, evicting images that no longer fit.
+
+        Arguments:
+            budget (int): bytes of pixel data kept
+        """
+
+        with self.lock:
+            self.budget = budget
+            self.evict(budget)
+
+    def clear(self):
+        """Drops every cached image, the counters are kept."""
+
+        with self.lock:
+            self.images.clear()
+            self.size = 0
+
+    def stats(self):
+        """Gets the counters of the cache for tuning its budget.
+
+        Returns:
+            CacheStats -- hits, misses, evictions, number of entries, bytes
+                held and the budget
+        """
+
+        with self.lock:
+            return CacheStats(
+                self.hits, self.misses, self.evictions, len(self.images),
+                self.size, self.budget)
+
+
+DECODED_IMAGES = DecodedImageCache()
+
+
+def decoded_image_cache(budget=None):
+    """Gets the cache shared by every step of the process.
+
+    Keyword Arguments:
+        budget (int): byte budget to apply to the cache, the current budget
+            is kept when None (default: {None})
+
+    Returns:
+        DecodedImageCache -- the process wide cache
+    """
+
+    if budget is not None and budget != DECODED_IMAGES.budget:
+        DECODED_IMAGES.set_budget(budget)
+
+    return DECODED_IMAGES
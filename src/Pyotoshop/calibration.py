@@ -0,0 +1,92 @@
+"""Timing of the available backends on a sample of the workload."""
+
+import timeit
+import collections
+
+# Global Variables ------------------------------------------------------------
+BackendTiming = collections.namedtuple(
+    'BackendTiming', ['name', 'seconds', 'error'])
+
+
+def time_backends(backend_names, start_backend, run_sample):
+    """Runs a sample of the workload with every backend and times it.
+
+    Starting a backend, such as launching Photoshop, is not timed since a
+    run pays for it once whichever backend is picked.
+
+    Arguments:
+        backend_names (list): names of the backends to time
+        start_backend (callable): takes a backend name and returns the
+            state run_sample needs
+        run_sample (callable): takes a backend name and the state returned
+            by start_backend and runs the sample
+
+    Returns:
+        list -- BackendTiming of each backend, seconds is None and error
+            holds the reason when the backend failed
+    """
+
+    backend_timings = []
+
+    for backend_name in backend_names:
+        try:
+            backend_state = start_backend(backend_name)
+
+            start_time = timeit.default_timer()
+            run_sample(backend_name, backend_state)
+            elapsed_time = timeit.default_timer() - start_time
+        except Exception as error:  # pylint: disable = W0703
+            backend_timings.append(BackendTiming(backend_name, None, str(error)))
+            continue
+
+        backend_timings.append(BackendTiming(backend_name, elapsed_time, ''))
+
+    return backend_timings
+
+
+def fastest_backend(backend_timings, default=None):
+    """Picks the backend that ran the sample fastest.
+
+    Arguments:
+        backend_timings (list): BackendTiming of each backend
+
+    Keyword Arguments:
+        default (string): name returned when every backend failed
+            (default: {None})
+
+    Returns:
+        string -- name of the fastest backend
+    """
+
+    timed_backends = [x for x in backend_timings if x.seconds is not None]
+
+    if not timed_backends:
+        return default
+
+    return min(timed_backends, key=lambda x: x.seconds).name
+
+
+def calibration_report(operation, backend_name, backend_timings):
+    """Describes the backend picked for an operation and the timings.
+
+    Arguments:
+        operation (string): name of the calibrated operation, such as
+            'Resize'
+        backend_name (string): name of the picked backend
+        backend_timings (list): BackendTiming of each backend
+
+    Returns:
+        string -- one line for the choice and one for each backend
+    """
+
+    report_lines = ['{0} backend: {1}'.format(operation, backend_name)]
+
+    for backend_timing in backend_timings:
+        if backend_timing.seconds is None:
+            report_lines.append('    {0}: failed, {1}'.format(
+                backend_timing.name, backend_timing.error))
+        else:
+            report_lines.append('    {0}: {1:.3f}s'.format(
+                backend_timing.name, backend_timing.seconds))
+
+    return '\n'.join(report_lines)
@@ -0,0 +1,425 @@
+"""Command line interface running the Pyotoshop engine without a display."""
+
+import os
+import sys
+import json
+import signal
+import argparse
+import threading
+import traceback
+
+from .core import PACK_BACKENDS, PACK_STRATEGIES, TEXTURE_SIZES, Pyotoshop
+from .backends import RESIZE_BACKENDS
+from .packing import LUMINANCE_CHANNELS, PackPreset, load_pack_presets
+from .packing import packed_file_name
+from .results import build_result_records
+from .startup import mark_startup
+
+# Global Variables ------------------------------------------------------------
+# exit codes of main, argparse exits with 2 on usage errors
+EXIT_COMPLETED = 0
+EXIT_FAILED = 1
+EXIT_CANCELED = 3
+
+
+class HeadlessProgress(object):
+    """
+    Stand in for a QProgressDialog that writes its label to a stream.
+
+    It has the QProgressDialog methods used by core.Pyotoshop and
+    progress.ProgressReporter, which already limits how often the label
+    is updated.
+    """
+
+    def __init__(self, window_title, maximum, canceled, stream=None):
+        """Creates the progress of a batch.
+
+        Arguments:
+            window_title (string): name of the batch
+            maximum (int): number of steps, 0 when unknown
+            canceled (threading.Event): set once the run is canceled
+
+        Keyword Arguments:
+            stream (file): stream the progress is written to, nothing is
+                written when None (default: {None})
+        """
+
+        super(HeadlessProgress, self).__init__()
+
+        self.window_title = window_title
+        self.maximum = maximum
+        self.canceled = canceled
+        self.stream = stream
+        self.value = 0
+
+    def setValue(self, value):  # pylint: disable = C0103
+        """Sets the number of finished steps.
+
+        Arguments:
+            value (int): progress value
+        """
+
+        self.value = value
+
+    def setLabelText(self, text):  # pylint: disable = C0103
+        """Writes the label as a single line.
+
+        Arguments:
+            text (string): label text
+        """
+
+        if self.stream is None:
+            return
+
+        if self.maximum:
+            steps = '{0}/{1}'.format(self.value, self.maximum)
+        else:
+            steps = str(self.value)
+
+        self.stream.write('{0} [{1}]: {2}\n'.format(
+            self.window_title, steps, ' | '.join(text.splitlines())))
+        self.stream.flush()
+
+    def wasCanceled(self):  # pylint: disable = C0103
+        """Checks if the run was canceled, safe to call from any thread.
+
+        Returns:
+            bool -- True once the run was interrupted
+        """
+
+        return self.canceled.is_set()
+
+    def close(self):
+        """Nothing to close, kept for the QProgressDialog interface."""
+
+
+class HeadlessPyotoshop(Pyotoshop):
+    """
+    Pyotoshop engine reporting to a terminal instead of Qt popups.
+
+    It provides the popup methods the engine calls, which gui.Main
+    provides with Qt widgets. Progress is written to a stream, messages
+    and results are kept for the report written once the command ends.
+    """
+
+    # quits Photoshop once a batch that used it is done instead of asking
+    quit_photoshop = False
+
+    def __init__(self, progress_stream=None):
+        """Creates an engine with no messages or results.
+
+        Keyword Arguments:
+            progress_stream (file): stream the progress is written to,
+                nothing is written when None (default: {None})
+        """
+
+        super(HeadlessPyotoshop, self).__init__()
+
+        self.progress_stream = progress_stream
+        self.canceled = threading.Event()
+
+        self.messages = []
+        self.result_records = []
+        self.pack_jobs = []
+
+    def popup_progress_window(self, window_title, progress_length):
+        """Creates the progress of a batch.
+
+        Arguments:
+            window_title (string): name of the batch
+            progress_length (int): number of steps, 0 when unknown
+
+        Returns:
+            HeadlessProgress -- progress writing to self.progress_stream
+        """
+
+        return HeadlessProgress(
+            window_title, progress_length, self.canceled, self.progress_stream)
+
+    def popup_ok_window(self, message):
+        """Keeps a message for the report.
+
+        Arguments:
+            message (string): message of the engine
+        """
+
+        self.messages.append(str(message))
+
+    def popup_results_window(self, result_records):
+        """Keeps the results of the resize analysis for the report.
+
+        Arguments:
+            result_records (list): results.ResultRecord of each texture
+        """
+
+        self.result_records = result_records
+
+    def close_photoshop(self, message, ps_app):
+        """Keeps a message and quits Photoshop if self.quit_photoshop is set.
+
+        Arguments:
+            message (string): message of the engine
+            ps_app (com_object): Photoshop instance used by the batch
+        """
+
+        self.popup_ok_window(message)
+
+        if self.quit_photoshop:
+            ps_app.Quit()
+
+    def pack_textures(self, material_jobs):
+        """Keeps the pack jobs for the report and packs them.
+
+        Arguments:
+            material_jobs (list): tuple of PackJob for each group of sources
+        """
+
+        self.pack_jobs = [
+            pack_job for pack_jobs in material_jobs for pack_job in pack_jobs]
+
+        super(HeadlessPyotoshop, self).pack_textures(material_jobs)
+
+
+def build_parser():
+    """Builds the parser of the command line arguments.
+
+    Returns:
+        argparse.ArgumentParser -- parser with the analyze, resize and pack
+            commands
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m Pyotoshop',
+        description='Resizes and packs textures without a display. A JSON '
+                    'report is written once the command ends.')
+
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument(
+        'path', help='root directory of the textures')
+    common_parser.add_argument(
+        '-o', '--output', help='file the JSON report is written to, '
+                               'standard output by default')
+    common_parser.add_argument(
+        '-q', '--quiet', action='store_true',
+        help='do not write progress to standard error')
+    common_parser.add_argument(
+        '--workers', type=int,
+        help='threads reading and packing textures, one per CPU by default')
+
+    commands = parser.add_subparsers(dest='command')
+    # Python 3 leaves sub commands optional
+    commands.required = True
+
+    analyze_parser = commands.add_parser(
+        'analyze', parents=[common_parser],
+        help='sort the textures by the resize action they need')
+    analyze_parser.add_argument(
+        '-s', '--size', type=int, choices=TEXTURE_SIZES, required=True,
+        help='target texture size')
+
+    resize_parser = commands.add_parser(
+        'resize', parents=[common_parser],
+        help='resize the textures larger than the target size')
+    resize_parser.add_argument(
+        '-s', '--size', type=int, choices=TEXTURE_SIZES, required=True,
+        help='target texture size')
+    resize_parser.add_argument(
+        '--backend', default=Pyotoshop.resize_backend,
+        choices=sorted(RESIZE_BACKENDS) + ['auto'],
+        help='resize backend (default: %(default)s)')
+    resize_parser.add_argument(
+        '--mip-chain', action='store_true',
+        help='save every size from the target size down')
+
+    pack_parser = commands.add_parser(
+        'pack', parents=[common_parser],
+        help='pack the channels of matching textures into one texture')
+    pack_parser.add_argument(
+        '--presets', help='JSON file of packing presets, see '
+                          'packing.load_pack_presets')
+    pack_parser.add_argument('--packed-suffix', help='suffix of packed textures')
+    pack_parser.add_argument('--red', help='suffix of the red channel source')
+    pack_parser.add_argument('--green', help='suffix of the green channel source')
+    pack_parser.add_argument('--blue', help='suffix of the blue channel source')
+    pack_parser.add_argument('--alpha', help='suffix of the alpha channel source')
+    pack_parser.add_argument(
+        '--backend', default=Pyotoshop.pack_backend,
+        choices=PACK_BACKENDS + ('auto',),
+        help='pack backend (default: %(default)s)')
+    pack_parser.add_argument(
+        '--pack-strategy', default=Pyotoshop.photoshop_pack_strategy,
+        choices=PACK_STRATEGIES,
+        help='how the Photoshop pack backends fill the channels '
+             '(default: %(default)s)')
+
+    for command_parser in (resize_parser, pack_parser):
+        command_parser.add_argument(
+            '--rle', action='store_true', help='RLE compress saved TGA files')
+        command_parser.add_argument(
+            '--quit-photoshop', action='store_true',
+            help='quit Photoshop once the Photoshop backends are done')
+
+    return parser
+
+
+def run_analyze(pyotoshop, args):
+    """Sorts the textures by the resize action they need.
+
+    Arguments:
+        pyotoshop (HeadlessPyotoshop): engine running the command
+        args (argparse.Namespace): parsed arguments
+
+    Returns:
+        dictionary -- textures of the report
+    """
+
+    pyotoshop.target_texture_size = args.size
+
+    texture_dict = pyotoshop.find_textures_to_resize(args.path)
+
+    # nothing was done to the textures, so no action is reported
+    result_records = build_result_records(
+        texture_dict, pyotoshop.open_texture_index())
+
+    return {'textures': [
+        x._replace(action=None)._asdict() for x in result_records]}
+
+
+def run_resize(pyotoshop, args):
+    """Resizes the textures larger than the target size.
+
+    Arguments:
+        pyotoshop (HeadlessPyotoshop): engine running the command
+        args (argparse.Namespace): parsed arguments
+
+    Returns:
+        dictionary -- textures of the report
+    """
+
+    pyotoshop.target_texture_size = args.size
+    pyotoshop.resize_backend = args.backend
+    pyotoshop.mip_chain = args.mip_chain
+
+    pyotoshop.parse_texture_to_resize(args.path)
+
+    return {'textures': [x._asdict() for x in pyotoshop.result_records]}
+
+
+def run_pack(pyotoshop, args):
+    """Packs the channels of matching textures.
+
+    Arguments:
+        pyotoshop (HeadlessPyotoshop): engine running the command
+        args (argparse.Namespace): parsed arguments
+
+    Returns:
+        dictionary -- packed textures of the report
+    """
+
+    pyotoshop.pack_backend = args.backend
+    pyotoshop.pack_workers = args.workers
+    pyotoshop.photoshop_pack_strategy = args.pack_strategy
+
+    if args.presets:
+        pyotoshop.pack_presets = load_pack_presets(args.presets)
+    else:
+        pyotoshop.pack_presets = [PackPreset(
+            'Custom', args.packed_suffix,
+            (args.red, args.green, args.blue, args.alpha or ''),
+            LUMINANCE_CHANNELS)]
+
+    pyotoshop.parse_texture_dirs_to_pack(args.path)
+
+    # every backend saves packed textures as TGA files
+    packed_files = [
+        (packed_file_name(pack_job.file_name), pack_job)
+        for pack_job in pyotoshop.pack_jobs]
+
+    return {'packed': [
+        {'output': tga_file,
+         'sources': [x for x in pack_job.channel_paths if x],
+         'written': os.path.isfile(tga_file)}
+        for tga_file, pack_job in packed_files]}
+
+
+COMMANDS = {
+    'analyze': run_analyze,
+    'resize': run_resize,
+    'pack': run_pack}
+
+
+def main(argv=None):
+    """Runs a command and writes its JSON report.
+
+    The first interrupt (Ctrl+C) cancels the command the way the cancel
+    button of a progress dialog does, and the report of the finished work
+    is still written, a second interrupt stops the process.
+
+    Keyword Arguments:
+        argv (list): arguments, sys.argv[1:] when None (default: {None})
+
+    Returns:
+        int -- EXIT_COMPLETED, EXIT_FAILED or EXIT_CANCELED
+    """
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.path):
+        parser.error('{0} is not a directory'.format(args.path))
+
+    if args.command == 'pack' and not args.presets and not (
+            args.packed_suffix and args.red and args.green and args.blue):
+        parser.error(
+            'pack needs --presets or --packed-suffix, --red, --green and --blue')
+
+    pyotoshop = HeadlessPyotoshop(None if args.quiet else sys.stderr)
+    pyotoshop.analysis_workers = args.workers
+    pyotoshop.tga_rle = getattr(args, 'rle', False)
+    pyotoshop.quit_photoshop = getattr(args, 'quit_photoshop', False)
+
+    def cancel(signal_number, frame):  # pylint: disable = W0613
+        pyotoshop.canceled.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, cancel)
+
+    report = {'command': args.command, 'path': os.path.abspath(args.path)}
+
+    # stdout only carries the report, anything the engine prints goes to
+    # stderr
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+
+    mark_startup('command started')
+
+    try:
+        report.update(COMMANDS[args.command](pyotoshop, args))
+    except Exception:  # pylint: disable = W0703
+        report['status'] = 'failed'
+        report['error'] = traceback.format_exc()
+        sys.stderr.write(report['error'])
+    else:
+        if pyotoshop.canceled.is_set():
+            report['status'] = 'canceled'
+        else:
+            report['status'] = 'completed'
+    finally:
+        sys.stdout = stdout
+
+    report['messages'] = pyotoshop.messages
+
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if report['status'] == 'failed':
+        return EXIT_FAILED
+
+    if report['status'] == 'canceled':
+        return EXIT_CANCELED
+
+    return EXIT_COMPLETED
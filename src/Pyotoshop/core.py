@@ -1,57 +1,232 @@
 import os
 import sys
+import shutil
+import functools
 import platform
+import tempfile
 import traceback
 import scandir
-import comtypes.client
-from PIL import Image
+
+from .index import TextureIndex
+from .analysis import ordered_results, read_texture_records
+from .backends import RESIZE_BACKENDS
+from .cache import decoded_image_cache
+from .calibration import calibration_report, fastest_backend, time_backends
+from .photoshop import PhotoshopSession
+from .extendscript import PhotoshopScriptRunner
+from .extendscript import pack_script_job, run_script_jobs
+from .packing import LUMINANCE_CHANNELS, PackJob, PackPreset, run_pack_jobs
+from .matching import SuffixMatcher
+from .progress import ProgressReporter
+from .results import build_result_records
+from .thumbnails import ThumbnailCache
 
 EXTENSIONS = ('.tga', '.png', '.jpg')
 TEXTURE_SIZES = (4096, 2048, 1024, 512, 256, 128, 64)
+PACK_BACKENDS = ('native', 'photoshop', 'extendscript')
+PACK_STRATEGIES = ('clipboard', 'applyimage')
 
 
 class Pyotoshop(object):
+    # persistent texture metadata index, opened on first use
+    texture_index = None
+
+    # persistent thumbnail cache of the results thumbnail grid, opened on
+    # first use
+    thumbnail_cache = None
+
+    # bytes of thumbnail files kept on disk by the thumbnail cache
+    thumbnail_budget = 256 * 1024 * 1024
+
+    # number of workers reading textures during the analysis, None uses
+    # one per CPU and 1 analyzes directories one at a time
+    analysis_workers = None
+
+    # read textures in worker processes rather than threads
+    analysis_use_processes = False
+
+    # name of the backend in backends.RESIZE_BACKENDS used to resize
+    # textures, 'photoshop' drives Photoshop through COM instead and
+    # 'extendscript' through batched ExtendScript programs, 'auto' times
+    # the available backends on a sample of the textures and uses the
+    # fastest
+    resize_backend = 'pillow'
+
+    # size textures are resized to, the target texture size combobox is
+    # read when None
+    target_texture_size = None
+
+    # bytes of pixel data a single resize may hold, larger textures are
+    # resized in strips by the pillow backend
+    resize_memory_budget = 512 * 1024 * 1024
+
+    # packs textures in memory with NumPy, 'photoshop' uses the Photoshop
+    # copy and paste flow instead and 'extendscript' runs that flow in
+    # batched ExtendScript programs, 'auto' times the available backends on
+    # a sample of the textures and uses the fastest
+    pack_backend = 'native'
+
+    # number of textures, or groups of sources when packing, an 'auto'
+    # backend is timed on
+    calibration_sample_size = 2
+
+    # saves every size in TEXTURE_SIZES from the target size down instead of
+    # only the target size, decoding each texture once
+    mip_chain = False
+
+    # number of threads packing textures with the native backend, None uses
+    # one per CPU
+    pack_workers = None
+
+    # list of packing.PackPreset layouts packed in one pass, see
+    # packing.load_pack_presets, the QLineEdit suffixes are used when None
+    pack_presets = None
+
+    # bytes of decoded images kept in cache.DECODED_IMAGES, which lets a
+    # texture that is both resized and packed in a session decode once
+    decoded_image_budget = 512 * 1024 * 1024
+
+    # RLE compresses saved TGA files, in Photoshop and in the native resize
+    # and pack paths
+    tga_rle = False
+
+    # connection to Photoshop shared by resize and pack batches, created on
+    # first use
+    photoshop_session = None
+
+    # how the Photoshop and ExtendScript pack backends fill the channels,
+    # one of PACK_STRATEGIES, 'clipboard' copies and pastes each source and
+    # 'applyimage' applies each source to its channel with Apply Image
+    photoshop_pack_strategy = 'clipboard'
+
+    # number of resize or pack jobs compiled into each ExtendScript program
+    # by the 'extendscript' resize and pack backends
+    script_batch_size = 50
+
+    # runs the ExtendScript programs, None runs them in Photoshop, an
+    # extendscript.LocalScriptRunner runs the job lists without Photoshop
+    script_runner = None
+
+    # creates the Photoshop COM objects from their ProgID, None uses
+    # comtypes.client.CreateObject, fakeps.FakePhotoshop().create_object runs
+    # the Photoshop code paths without Photoshop
+    photoshop_factory = None
+
     def __init__(self):
         super(Pyotoshop, self).__init__()
 
-    def scandir_to_dict(cls, path):
-        """Converts the tuples created from scandir walk to dictionaries.
+    def open_texture_index(self):
+        """Opens the persistent texture index if it is not already open.
+
+        The index is the shared source of texture metadata for the resize
+        analysis, the pack discovery and the results popup.
+
+        Returns:
+            TextureIndex -- the open texture index
+        """
+
+        if self.texture_index is None:
+            self.texture_index = TextureIndex()
+
+        return self.texture_index
 
-        Tuple Indexes:
-            [0] {string}- directory path
-            [1] {list} - list of sub directories
-            [2] {list} - list of files in the directory path
+    def open_thumbnail_cache(self):
+        """Opens the persistent thumbnail cache if it is not already open.
+
+        Returns:
+            ThumbnailCache -- the open thumbnail cache
+        """
+
+        if self.thumbnail_cache is None:
+            self.thumbnail_cache = ThumbnailCache(budget=self.thumbnail_budget)
+
+        return self.thumbnail_cache
+
+    @classmethod
+    def scandir_walk(cls, path):
+        """Lazily walks the root directory and yields textures as they are found.
+
+        Nothing is collected up front, each directory is yielded as soon as
+        it has been listed, in the same top down order as scandir.walk, so
+        analysis can start while the rest of the tree is still being walked.
+        Files are filtered by EXTENSIONS during the walk and kept as DirEntry
+        objects so the stat data gathered by the listing can be reused.
 
         Arguments:
             path (string): root directory folder
 
-        Returns:
-            dictionary -- dicionary containing the results of scandir.walk
+        Yields:
+            tuple -- (directory path, list of DirEntry texture files) for
+                each directory that contains textures
         """
 
-        # list of dictionaries
-        scandir_entries = []
+        # stack of directories still to be listed
+        pending_dirs = [path]
+
+        while pending_dirs:
+            directory = pending_dirs.pop()
+
+            try:
+                dir_entries = list(scandir.scandir(directory))
+            except OSError:
+                # unreadable directories are skipped, same as scandir.walk
+                continue
 
-        # walk through directory, sub directories, and files
-        for entry in scandir.walk(path):
-            temp = {}
-            temp['Directory'] = entry[0]
-            temp['Sub_Dirs'] = entry[1]
-            temp['Files'] = entry[2]
+            sub_dirs = []
+            texture_files = []
 
-            scandir_entries.append(temp)
+            for entry in dir_entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
 
-        return scandir_entries
+                if is_dir:
+                    sub_dirs.append(entry.path)
+                elif entry.name.lower().endswith(EXTENSIONS):
+                    texture_files.append(entry)
+
+            # reversed so sub directories are popped in listing order
+            pending_dirs.extend(reversed(sub_dirs))
+
+            if texture_files:
+                yield directory, texture_files
 
     def parse_texture_to_resize(self, path):
         """Parse through root directory and determine which actions to take.
-        Parses input root and uses self.scandir_to_dict to get the directory,
-        all subfolders and files into a dictionary format.
+        Finds the textures with self.find_textures_to_resize, resizes the
+        larger ones and shows what was done to each texture found.
 
         Arguments:
             path (string): path to analyze
         """
 
+        texture_analysis_dict = self.find_textures_to_resize(path)
+
+        # resizes the larger textures and shows what was done to each
+        # texture found
+        self.resize_results_popup(texture_analysis_dict)
+
+        # reset dictionary values after above code is complete
+        texture_analysis_dict['Larger Textures'] = []
+        texture_analysis_dict['Already Sized Textures'] = []
+        texture_analysis_dict['Not Power of 2'] = []
+        texture_analysis_dict['Not Square'] = []
+
+    def find_textures_to_resize(self, path):
+        """Sorts the textures under a root directory by the resize action
+        they need, without resizing them.
+        Parses input root and uses self.scandir_walk to lazily get each
+        directory and the textures it contains.
+
+        Arguments:
+            path (string): path to analyze
+
+        Returns:
+            dictionary -- lists of texture paths keyed by category, empty
+                if the search was canceled
+        """
+
         # dictionary used to collect images larger than target_size
         texture_analysis_dict = {
             'Larger Textures': [],
@@ -59,55 +234,77 @@ class Pyotoshop(object):
             'Not Power of 2': [],
             'Not Square': []}
 
-        # use self.scandir_to_dict to walk across the root directory
-        # and output the values to a dictionary
-        scandir_list = self.scandir_to_dict(path)
+        texture_index = self.open_texture_index()
 
+        # the number of directories is unknown until the walk is done,
+        # so the progress dialog is shown as a busy indicator
         progress_dialog = self.popup_progress_window(
-            'Finding Textures to Resize', len(scandir_list))
+            'Finding Textures to Resize', 0)
 
-        # iterate across list of dictionary that contains the
-        # root directory, subfolders, and files
-        for index, entry in enumerate(scandir_list):
+        progress = ProgressReporter(
+            progress_dialog, 'Searching for Textures in {0}...')
 
-            if progress_dialog.wasCanceled():
-                texture_analysis_dict.clear()
-                break
+        def directory_jobs():
+            """Pairs each directory with the textures that need to be read."""
 
-            # print str(entry)
-            texture_analysis_dict = self.analyze_textures_to_resize(
-                str(entry['Directory']), entry['Files'], texture_analysis_dict)
+            for directory, dir_files in self.scandir_walk(path):
 
-            progress_dialog.setValue(index)
+                # already sized textures are skipped by name and never read
+                unsized_files = [
+                    x for x in dir_files if not self.is_sized_texture(x.name)]
 
-            progress_dialog.setLabelText(
-                'Searching for Textures in {0}...'.format(str(entry['Directory'])))
+                current_records, stale_textures = texture_index.partition(
+                    unsized_files)
 
-        progress_dialog.setValue(len(scandir_list))
+                yield (directory, dir_files, current_records), stale_textures
 
-        progress_dialog.close()
+        # threads stop reading the textures of their directory once the
+        # search is canceled, processes only take picklable arguments
+        if self.analysis_use_processes:
+            read_function = read_texture_records
+        else:
+            read_function = functools.partial(
+                read_texture_records, canceled=progress_dialog.wasCanceled)
 
-        print texture_analysis_dict['Larger Textures']
-        # if this key's list has values, run function to resize these textures
-        if texture_analysis_dict['Larger Textures']:
+        # textures missing from the index are read by a worker pool while
+        # the walk continues, results come back in walk order
+        directory_results = ordered_results(
+            read_function, directory_jobs(), self.analysis_workers,
+            self.analysis_use_processes)
 
-            self.texture_resize(texture_analysis_dict['Larger Textures'])
+        try:
+            for job, new_records in directory_results:
 
-            # larger_textures = '\n'.join(
-            #     str(x) for x in texture_analysis_dict['Larger Textures'])
-        else:
-            # larger_textures = 'No Textures found larger than ' + \
-            #     self.texture_size_combobox.currentText() + ' were found'
+                if progress.was_canceled():
+                    texture_analysis_dict.clear()
+                    break
 
-            self.popup_ok_window('No Textures found to resize')
+                directory, dir_files, texture_records = job
 
-        # reset dictionary values after above code is complete
-        texture_analysis_dict['Larger Textures'] = []
-        texture_analysis_dict['Already Sized Textures'] = []
-        texture_analysis_dict['Not Power of 2'] = []
-        texture_analysis_dict['Not Square'] = []
+                for texture_record in new_records:
+                    texture_index.store(texture_record)
+                    texture_records[texture_record.path] = texture_record
+
+                texture_analysis_dict = self.analyze_textures_to_resize(
+                    str(directory), dir_files, texture_analysis_dict,
+                    texture_records)
+
+                progress.advance(
+                    directory, len(dir_files),
+                    sum(x.size for x in texture_records.values()))
+        finally:
+            # stops the worker pool if the search was canceled
+            directory_results.close()
 
-    def analyze_textures_to_resize(self, directory_path, dir_files, texture_dict):
+        progress_dialog.close()
+
+        # write the metadata gathered during the analysis to disk
+        texture_index.commit()
+
+        return texture_analysis_dict
+
+    def analyze_textures_to_resize(self, directory_path, dir_files, texture_dict,
+                                   texture_records=None):
         """Parse directories to find textures and resize them.
         This function does a preliminary scan of the directory
         given by the user.
@@ -122,31 +319,45 @@ class Pyotoshop(object):
         Arguments:
             directory_path (string): Input directory to analyze and
                 parse through
-            dir_files (list): Input list of files to iterate through
+            dir_files (list): Input list of scandir.DirEntry texture files
+                to iterate through
             texture_dict (dictionary): Dictionary used to store
                 different scenarios and return the results of the analysis
 
+        Keyword Arguments:
+            texture_records (dictionary): TextureRecord of each texture path
+                that has already been read, other textures are looked up in
+                the texture index (default: {None})
+
         Returns:
             dictionary -- After found textures are analyzed,
                 they are stored in the dictionary variable to be used later
         """
 
+        if texture_records is None:
+            texture_records = {}
+
         # iterate over scandir_entries in found subdirectory
-        for current_file in dir_files:
+        for file_entry in dir_files:
 
-            current_file_path = os.path.join(directory_path, current_file)
+            current_file = file_entry.name
+            current_file_path = file_entry.path
 
             # check if file extension exists in extension list
             if current_file.lower().endswith(EXTENSIONS):
 
-                # s variable used to iterate over TEXTURE_SIZES tuple
-                # x current element being processed in directory
-                if any(str(s) in current_file for s in TEXTURE_SIZES):
-                    texture_dict['Already Sized Textures'].append(current_file)
+                if self.is_sized_texture(current_file):
+                    texture_dict['Already Sized Textures'].append(current_file_path)
                 else:
-                    # use PIL package to create Image object
-                    with Image.open(current_file_path) as image:
-                        size_of_image = image.size
+                    # metadata comes from the texture index, the image is
+                    # only read if it is new or changed since the last run
+                    texture_record = texture_records.get(current_file_path)
+
+                    if texture_record is None:
+                        texture_record = self.open_texture_index().lookup(
+                            file_entry)
+
+                    size_of_image = (texture_record.width, texture_record.height)
 
                     # size_of_image returns tuple (width, height)
                     # check that image is square by comparing width and height
@@ -159,349 +370,850 @@ class Pyotoshop(object):
                             #   '{0}'.format(size_of_image)
                             # count_tileable = count_tileable + 1
 
-                            if int(size_of_image[0]) > int(
-                                    self.target_texture_size_combobox.currentText()):
+                            if int(size_of_image[0]) > \
+                                    self.current_target_size():
                                 # testPrint = testPrint + imagePath + '\n'
                                 texture_dict['Larger Textures'].append(current_file_path)
                             else:
                                 print current_file_path + ' - ' + '{0}'.format(size_of_image)
                         else:
-                            texture_dict['Not Power of 2'].append(current_file)
+                            texture_dict['Not Power of 2'].append(current_file_path)
                     else:
-                        texture_dict['Not Square'].append(current_file)
+                        texture_dict['Not Square'].append(current_file_path)
 
         return texture_dict
 
+    def current_target_size(self):
+        """Gets the size textures are resized to.
+
+        Returns:
+            int -- self.target_texture_size, or the size selected in the
+                target texture size combobox when it is None
+        """
+
+        if self.target_texture_size is not None:
+            return int(self.target_texture_size)
+
+        return int(self.target_texture_size_combobox.currentText())
+
     def texture_resize(self, list_to_resize):
         """Resize and export process textures.
-        Logic to control Photoshop, resize textures, and save as a new texture
-        and include the new size in the file name
+        Uses the backend selected by self.resize_backend to resize textures,
+        and save as a new texture and include the new size in the file name
 
         Arguments:
             list_to_resize (list): List of textures designated to be resized
+
+        Returns:
+            dictionary -- 'Resized' or 'Failed' keyed by the path of every
+                texture the batch reached
         """
 
-        ps_app = self.launch_photoshop()
+        decoded_image_cache(self.decoded_image_budget)
+
+        target_resolution = self.current_target_size()
+
+        # sizes saved for each texture, largest first
+        if self.mip_chain:
+            target_sizes = [x for x in TEXTURE_SIZES if x <= target_resolution]
+        else:
+            target_sizes = [target_resolution]
+
+        message = 'Completed Texture Resizing!'
+        backend_name = self.resize_backend
+
+        if backend_name == 'auto':
+            backend_name, report = self.calibrate_resize_backend(
+                list_to_resize, target_sizes)
+            message = '{0}\n\n{1}'.format(message, report)
+
+        backend = RESIZE_BACKENDS[backend_name](self)
+        backend.start()
 
         progress_dialog = self.popup_progress_window('Resizing Textures', len(list_to_resize))
 
+        progress = ProgressReporter(
+            progress_dialog, 'Resizing Textures in {0}...', len(list_to_resize))
+
+        texture_index = self.open_texture_index()
+
+        # textures left out by a cancel have no outcome, they are pending
+        resize_outcomes = {}
+
         for texture_path in list_to_resize:
 
-            if progress_dialog.wasCanceled():
+            if progress.was_canceled():
                 self.popup_ok_window('Search Canceled')
                 break
 
-            path_name = os.path.dirname(os.path.abspath(texture_path))
+            new_file_names = [
+                self.new_file_name(texture_path, True, x) for x in target_sizes]
+
+            # a texture that fails to resize must not stop the batch
+            try:
+                backend.resize_chain(texture_path, target_sizes, new_file_names)
+            except Exception:  # pylint: disable = W0703
+                resize_outcomes[texture_path] = 'Failed'
+            else:
+                resize_outcomes[texture_path] = 'Resized'
 
-            # open texture file in Photoshop
-            current_ps_doc = ps_app.Open(texture_path)
+            progress.advance(
+                os.path.dirname(os.path.abspath(texture_path)),
+                size=texture_index.lookup_path(texture_path).size)
 
-            current_index = list_to_resize.index(texture_path)
+        progress.finish()
 
-            progress_dialog.setValue(current_index)
+        progress_dialog.close()
 
-            progress_dialog.setLabelText('Resizing Textures in {0}...'.format(path_name))
+        failed_count = list(resize_outcomes.values()).count('Failed')
 
-            # incase Photoshop was already open, make current
-            # document the active document
-            ps_app.Application.ActiveDocument  # pylint: disable = W0104
+        if failed_count:
+            message = '{0}\n\n{1} textures failed to resize'.format(
+                message, failed_count)
 
-            target_resolution = int(self.target_texture_size_combobox.currentText())
+        # launch popup to report completion, the Photoshop backend asks
+        # the user if they are done with photoshop
+        backend.finish(message)
 
-            # call the Photoshop resize operation
-            current_ps_doc.resizeImage(target_resolution, target_resolution)
+        # queued resizes are only known to have failed once they are run
+        for texture_path in backend.failed_paths():
+            resize_outcomes[texture_path] = 'Failed'
 
-            new_file_name = self.new_file_name(texture_path, True)
+        return resize_outcomes
 
-            # call function to Save As the resized texture
-            self.save_as(ps_app, current_ps_doc, new_file_name)
+    def calibrate_resize_backend(self, list_to_resize, target_sizes):
+        """Times every available resize backend on the first textures.
 
-            # close original version without saving
-            current_ps_doc.Close(2)
+        The sample is saved to a temporary directory that is removed after.
 
-        progress_dialog.setValue(len(list_to_resize))
+        Arguments:
+            list_to_resize (list): textures designated to be resized
+            target_sizes (list): sizes saved for each texture, largest first
 
-        progress_dialog.close()
+        Returns:
+            tuple -- (name of the fastest backend, report of the timings)
+        """
+
+        sample_textures = list_to_resize[:self.calibration_sample_size]
+        sample_dir = tempfile.mkdtemp(prefix='pyotoshop_calibration_')
+
+        backend_names = [
+            backend_name for backend_name in sorted(RESIZE_BACKENDS)
+            if RESIZE_BACKENDS[backend_name](self).is_available()]
+
+        def start_backend(backend_name):
+            # every backend decodes the sample itself
+            decoded_image_cache().clear()
+
+            backend = RESIZE_BACKENDS[backend_name](self)
+            backend.start()
 
-        # launch popup to ask user if they are done with photoshop
-        self.close_photoshop('Completed Texture Resizing!', ps_app)
+            return backend
+
+        def run_sample(backend_name, backend):
+            for sample_index, texture_path in enumerate(sample_textures):
+                file_names = [
+                    os.path.join(sample_dir, '{0}_{1}_{2}'.format(
+                        backend_name, sample_index, os.path.basename(
+                            self.new_file_name(texture_path, True, x))))
+                    for x in target_sizes]
+
+                backend.resize_chain(texture_path, target_sizes, file_names)
+
+            backend.flush()
+
+        try:
+            backend_timings = time_backends(
+                backend_names, start_backend, run_sample)
+        finally:
+            shutil.rmtree(sample_dir, ignore_errors=True)
+
+        backend_name = fastest_backend(backend_timings, 'pillow')
+
+        return backend_name, calibration_report(
+            'Resize', backend_name, backend_timings)
 
     def parse_texture_dirs_to_pack(self, path):
         """Parse through root directory and determine which actions to take.
-        Parses input root and uses self.scandir_to_dict to get the directory,
-        all subfolders and files into a dictionary format.
+        Parses input root and uses self.scandir_walk to lazily get each
+        directory and the textures it contains.
+
+        Textures are packed with every preset in self.pack_presets, or with
+        the suffixes entered in the QLineEdits when no presets are set.
 
         Arguments:
             path (string): path to analyze
         """
 
-        texture_analysis_dict = {
-            'Red': [],
-            'Green': [],
-            'Blue': [],
-            'Alpha': []}
+        material_jobs = []
+
+        if self.pack_presets:
+            pack_presets = self.pack_presets
 
         # check to prevent execution without entered output suffix
-        if self.packed_texture_le.text():
+        elif not self.packed_texture_le.text():
+            self.popup_ok_window('No Suffix for Packed Texture')
+            return
 
-            # precautionary check to make sure that there is an
-            # entry in the RGB channels
-            if self.r_channel_le.text() and self.g_channel_le.text() and \
-                    self.b_channel_le.text():
+        # precautionary check to make sure that there is an
+        # entry in the RGB channels
+        elif not (self.r_channel_le.text() and self.g_channel_le.text() and
+                  self.b_channel_le.text()):
+            self.popup_ok_window('No Suffix Entred for all RGB Channels')
+            return
 
-                # use self.scandir_to_dict to walk across the root directory
-                # and output the values to a dictionary
-                scandir_list = self.scandir_to_dict(path)
+        else:
+            pack_presets = [self.line_edit_pack_preset()]
 
-                progress_dialog = self.popup_progress_window(
-                    'Finding Textures to Pack', len(scandir_list))
+        # the number of directories is unknown until the walk is
+        # done, so the progress dialog is shown as a busy indicator
+        progress_dialog = self.popup_progress_window(
+            'Finding Textures to Pack', 0)
 
-                # iterate across list of dictionary that contains the
-                # root directory, subfolders, and files
-                for index, entry in enumerate(scandir_list):
+        progress = ProgressReporter(
+            progress_dialog, 'Searching for Textures in {0}...')
 
-                    if progress_dialog.wasCanceled():
-                        texture_analysis_dict.clear()
-                        self.popup_ok_window('Search Canceled')
-                        break
+        # suffixes of every preset are compiled once for the whole walk
+        suffix_matcher = self.pack_suffix_matcher(pack_presets)
 
-                    texture_analysis_dict = self.analyze_textures_to_pack(
-                        str(entry['Directory']), entry['Files'],
-                        texture_analysis_dict)
+        # iterate across the directories as self.scandir_walk
+        # finds them
+        for directory, dir_files in self.scandir_walk(path):
 
-                    progress_dialog.setValue(index)
+            if progress.was_canceled():
+                del material_jobs[:]
+                self.popup_ok_window('Search Canceled')
+                break
 
-                    progress_dialog.setLabelText(
-                        'Searching for Textures in {0}...'.format(
-                            str(entry['Directory'])))
+            material_jobs = self.analyze_textures_to_pack(
+                str(directory), dir_files, material_jobs, suffix_matcher,
+                pack_presets)
 
-                progress_dialog.setValue(len(scandir_list))
+            progress.advance(directory, len(dir_files))
 
-                progress_dialog.close()
+        progress_dialog.close()
 
-                if texture_analysis_dict:
-                    # if this key's list has values, run function to
-                    # pack these textures
-                    if texture_analysis_dict['Red'] and \
-                        texture_analysis_dict['Blue'] and \
-                            texture_analysis_dict['Blue']:
+        # write the metadata gathered during the analysis to disk
+        self.open_texture_index().commit()
 
-                        # print str(texture_analysis_dict)
-                        self.pack_textures(texture_analysis_dict)
+        # every complete group found in the walk is packed
+        # in a single batch
+        if material_jobs:
+            self.pack_textures(material_jobs)
 
-                else:
-                    self.popup_ok_window('No textures were found to pack')
-            else:
-                self.popup_ok_window('No Suffix Entred for all RGB Channels')
         else:
-            self.popup_ok_window('No Suffix for Packed Texture')
+            self.popup_ok_window('No textures were found to pack')
 
-    def analyze_textures_to_pack(self, directory_path, dir_files, texture_dict):
+    def analyze_textures_to_pack(self, directory_path, dir_files, material_jobs,
+                                 suffix_matcher=None, pack_presets=None):
         """Analyze files within a directory and determine if the
             directory contains the designate textures to pack.
 
-        Textures within the directory are iterated over and compared to the
-        inputs of the RGB QLineEdits and if there are matches, store those
-        paths in another dictionary to be used to pack the textures.
+        Textures within the directory are matched against the suffixes of
+        every preset in a single pass and bucketed by the base name
+        self.new_file_name derives for the packed texture, everything before
+        the last '_'. Each preset with a match for R, G and B in a group
+        adds a PackJob for that group, so a directory holding several
+        materials packs all of them with every preset.
 
         Arguments:
             directory_path (string): Input directory to analyze and
                                         parse through
-            dir_files (list): Input list of files to iterate through
-            texture_dict (dictionary): Dictionary used to
-                                        store different scenarios and
-                                        return the results of the analysis
+            dir_files (list): Input list of scandir.DirEntry texture files
+                                to iterate through
+            material_jobs (list): tuple of PackJob for every group found so
+                                    far, the jobs of a group share sources
+
+        Keyword Arguments:
+            suffix_matcher (SuffixMatcher): matcher compiled from the
+                preset suffixes, created with self.pack_suffix_matcher
+                when None (default: {None})
+            pack_presets (list): PackPreset layouts to pack, the suffixes of
+                the QLineEdits are used when None (default: {None})
+
         Returns:
-            dictionary -- After found textures are analyzed, they are stored
-                            in the dictionary variable to be used
-                                later for texture packing
+            list -- material_jobs with a tuple of PackJob added for each
+                group in the directory with at least one complete preset
         """
 
-        # variables used to store paths of textures that match desired suffixes
-        # variables are initilized to empty strings
-        r_texture = ''
-        g_texture = ''
-        b_texture = ''
-        a_texture = ''
+        if pack_presets is None:
+            pack_presets = [self.line_edit_pack_preset()]
 
-        # iterate over scandir_entries in a directory
-        for current_file in dir_files:
+        if suffix_matcher is None:
+            suffix_matcher = self.pack_suffix_matcher(pack_presets)
 
-            # store current path by joining directory and the current file name
-            current_file_path = os.path.join(directory_path, current_file)
+        texture_index = self.open_texture_index()
 
-            # check if file extension exists in extension list
-            if current_file.lower().endswith(EXTENSIONS):
+        source_sets = suffix_matcher.group(dir_files, self.pack_group_key)
 
-                # series of conditions to check if the current file matches any
-                # of the QLineEdit channel inputs.
-                # secondary condition to check if the temporary string variable
-                # is empty.
-                if str(self.r_channel_le.text()) in current_file:
-                    if not r_texture:
-                        print current_file
-                        r_texture = current_file_path
-
-                if str(self.g_channel_le.text()) in current_file:
-                    if not g_texture:
-                        print current_file
-                        g_texture = current_file_path
-
-                if str(self.b_channel_le.text()) in current_file:
-                    if not b_texture:
-                        print current_file
-                        b_texture = current_file_path
-
-                # similarly to RGB checks, will only check if a
-                # QLineEdit is enabled
-                if self.a_channel_le.isEnabled() and self.a_channel_le.text():
-                    if str(self.a_channel_le.text()) in current_file:
-                        if not a_texture:
-                            print current_file
-                            a_texture = current_file_path
-
-            # print 'current file ' + current_file
-            # print 'current index ' + str(dir_files.index(current_file))
-            # print 'length ' + str(len(dir_files) - 1)
-
-            # if last iteration/element of directory files to search through
-            if dir_files.index(current_file) == len(dir_files) - 1:
-
-                # check if a value for R, G, and B is found to continue
-                # should run only once within each directory
-                # if a texture is found for RGB at least
-                if r_texture and g_texture and b_texture:
-
-                    texture_dict['Red'].append(r_texture)
-                    texture_dict['Green'].append(g_texture)
-                    texture_dict['Blue'].append(b_texture)
-                    texture_dict['Alpha'].append(a_texture)
-
-                # clear variables on last iteration
-                r_texture = ''
-                g_texture = ''
-                b_texture = ''
-                a_texture = ''
-
-        # print str(texture_dict)
-        return texture_dict
+        for source_set in source_sets.values():
+            pack_jobs = []
+
+            for pack_preset in pack_presets:
+                channel_paths = tuple(
+                    source_set.get(suffix, '') if suffix else ''
+                    for suffix in pack_preset.channel_suffixes)
+
+                # a preset is only packed if a texture is found for RGB at least
+                if not all(channel_paths[:3]):
+                    continue
+
+                pack_jobs.append(PackJob(
+                    self.new_file_name(
+                        channel_paths[0], packed_suffix=pack_preset.packed_suffix),
+                    channel_paths, pack_preset.source_channels))
+
+            if not pack_jobs:
+                continue
 
-    def pack_textures(self, scandir_entry):
+            # index the matched sources so their metadata is
+            # available to the packing step without reopening them
+            for source_texture in source_set.values():
+                texture_index.lookup_path(source_texture)
+
+            material_jobs.append(tuple(pack_jobs))
+
+        return material_jobs
+
+    def pack_group_key(self, file_path):
+        """Gets the base path of the packed textures a source contributes to.
+
+        Arguments:
+            file_path (string): full path of a source texture
+
+        Returns:
+            string -- path of the packed texture without its packed suffix
+                or extension
+        """
+
+        return os.path.splitext(self.new_file_name(file_path, packed_suffix=''))[0]
+
+    def line_edit_pack_preset(self):
+        """Builds a preset from the suffixes entered in the QLineEdits.
+
+        The alpha suffix is only used if its QLineEdit is enabled.
+
+        Returns:
+            PackPreset -- preset for the QLineEdit suffixes
+        """
+
+        alpha_suffix = ''
+
+        if self.a_channel_le.isEnabled():
+            alpha_suffix = str(self.a_channel_le.text())
+
+        return PackPreset(
+            'Custom', str(self.packed_texture_le.text()),
+            (str(self.r_channel_le.text()), str(self.g_channel_le.text()),
+             str(self.b_channel_le.text()), alpha_suffix),
+            LUMINANCE_CHANNELS)
+
+    def pack_suffix_matcher(self, pack_presets):
+        """Compiles the source suffixes used by a list of presets.
+
+        Each source suffix is matched once no matter how many presets use
+        it, so its texture is decoded once for every layout it is packed in.
+
+        Arguments:
+            pack_presets (list): PackPreset layouts to pack
+
+        Returns:
+            SuffixMatcher -- matcher grouping sources under their suffix
+        """
+
+        source_suffixes = []
+
+        for pack_preset in pack_presets:
+            for suffix in pack_preset.channel_suffixes:
+                if suffix and suffix not in source_suffixes:
+                    source_suffixes.append(suffix)
+
+        return SuffixMatcher(
+            [(suffix, suffix) for suffix in source_suffixes], EXTENSIONS)
+
+    def pack_textures(self, material_jobs):
+        """Packs the found textures with the engine set by self.pack_backend.
+
+        A ValueError is raised if self.photoshop_pack_strategy is not one of
+        PACK_STRATEGIES.
+
+        Arguments:
+            material_jobs (list): tuple of PackJob for each group of sources
+        """
+
+        # checked before any backend runs, both Photoshop backends fall back
+        # to the clipboard for any other value
+        if self.photoshop_pack_strategy not in PACK_STRATEGIES:
+            raise ValueError('Unknown Photoshop pack strategy {0}'.format(
+                self.photoshop_pack_strategy))
+
+        message = 'Completed Texture Packing!'
+        backend_name = self.pack_backend
+
+        # Photoshop pastes the composite of every source, so presets that
+        # pick a band of a source are only packed by the native backend
+        if backend_name != 'native' and any(
+                any(pack_job.source_channels)
+                for pack_jobs in material_jobs for pack_job in pack_jobs):
+            backend_name = 'native'
+            message = '{0}\n\nPack backend: native, the presets pick ' \
+                'source channels'.format(message)
+
+        if backend_name == 'auto':
+            backend_name, report = self.calibrate_pack_backend(material_jobs)
+            message = '{0}\n\n{1}'.format(message, report)
+
+        if backend_name == 'photoshop':
+            self.pack_textures_photoshop(
+                [pack_job for pack_jobs in material_jobs for pack_job in pack_jobs],
+                message)
+        elif backend_name == 'extendscript':
+            self.pack_textures_extendscript(
+                [pack_job for pack_jobs in material_jobs for pack_job in pack_jobs],
+                message)
+        else:
+            self.pack_textures_native(material_jobs, message)
+
+    def calibrate_pack_backend(self, material_jobs):
+        """Times every available pack backend on the first groups of
+            sources.
+
+        The sample is packed into a temporary directory that is removed
+        after.
+
+        Arguments:
+            material_jobs (list): tuple of PackJob for each group of sources
+
+        Returns:
+            tuple -- (name of the fastest backend, report of the timings)
+        """
+
+        sample_dir = tempfile.mkdtemp(prefix='pyotoshop_calibration_')
+
+        sample_jobs = [
+            tuple(PackJob(os.path.join(sample_dir, '{0}_{1}_{2}'.format(
+                group_index, job_index, os.path.basename(pack_job.file_name))),
+                          pack_job.channel_paths, pack_job.source_channels)
+                  for job_index, pack_job in enumerate(pack_jobs))
+            for group_index, pack_jobs in enumerate(
+                material_jobs[:self.calibration_sample_size])]
+
+        # checked without the popup of is_supported_os
+        photoshop_available = self.open_photoshop_session().is_available()
+
+        backend_names = [
+            backend_name for backend_name in PACK_BACKENDS
+            if backend_name == 'native' or photoshop_available or (
+                backend_name == 'extendscript' and self.script_runner is not None)]
+
+        def start_backend(backend_name):
+            # every backend decodes the sample itself
+            decoded_image_cache().clear()
+
+            if backend_name == 'photoshop':
+                return self.launch_photoshop()
+            elif backend_name == 'extendscript':
+                return self.open_script_runner()
+
+            return None
+
+        def run_sample(backend_name, backend_state):
+            pack_jobs = [x for group_jobs in sample_jobs for x in group_jobs]
+
+            if backend_name == 'photoshop':
+                for pack_job in pack_jobs:
+                    self.pack_job_photoshop(backend_state, pack_job)
+
+            elif backend_name == 'extendscript':
+                script_jobs = [
+                    pack_script_job(
+                        x, self.tga_rle, self.photoshop_pack_strategy)
+                    for x in pack_jobs]
+
+                for _, script_results in run_script_jobs(
+                        backend_state, script_jobs, self.script_batch_size):
+                    for script_result in script_results:
+                        if not script_result.ok:
+                            raise RuntimeError(script_result.error)
+
+            else:
+                for _ in ordered_results(
+                        run_pack_jobs,
+                        ((group_jobs, (group_jobs, self.tga_rle))
+                         for group_jobs in sample_jobs),
+                        self.pack_workers):
+                    pass
+
+        try:
+            backend_timings = time_backends(
+                backend_names, start_backend, run_sample)
+        finally:
+            shutil.rmtree(sample_dir, ignore_errors=True)
+
+        backend_name = fastest_backend(backend_timings, 'native')
+
+        return backend_name, calibration_report(
+            'Pack', backend_name, backend_timings)
+
+    def pack_textures_native(self, material_jobs,
+                             message='Completed Texture Packing!'):
+        """Decodes the found textures and packs their luminance into the
+            RGBA channels of a new texture without Photoshop.
+
+        The jobs of a group share their sources, so each source is decoded
+        once for every preset it is packed in. Groups are independent of
+        each other and run in a pool of self.pack_workers threads, NumPy and
+        Pillow release the GIL while decoding and copying pixels.
+
+        Arguments:
+            material_jobs (list): tuple of PackJob for each group of sources
+
+        Keyword Arguments:
+            message (string): message shown once the textures are packed
+                (default: {'Completed Texture Packing!'})
+        """
+
+        decoded_image_cache(self.decoded_image_budget)
+
+        progress_dialog = self.popup_progress_window(
+            'Packing Textures', len(material_jobs))
+
+        progress = ProgressReporter(
+            progress_dialog, 'Packed {0}...', len(material_jobs))
+
+        # groups being packed stop before their next job on cancel
+        packed_textures = ordered_results(
+            functools.partial(
+                run_pack_jobs, canceled=progress_dialog.wasCanceled),
+            ((pack_jobs, (pack_jobs, self.tga_rle))
+             for pack_jobs in material_jobs),
+            self.pack_workers)
+
+        try:
+            for _, tga_files in packed_textures:
+
+                if progress.was_canceled():
+                    self.popup_ok_window('Search Canceled')
+                    break
+
+                progress.advance(', '.join(tga_files), len(tga_files))
+        finally:
+            packed_textures.close()
+
+        progress.finish()
+
+        progress_dialog.close()
+
+        self.popup_ok_window(message)
+
+    def pack_textures_extendscript(self, pack_jobs,
+                                   message='Completed Texture Packing!'):
+        """Packs textures in Photoshop with batched ExtendScript programs.
+
+        Every self.script_batch_size pack jobs are compiled into one program
+        that runs the copy and paste flow of pack_textures_photoshop with a
+        single DoJavaScript call.
+
+        Arguments:
+            pack_jobs (list): PackJob for each texture to pack
+
+        Keyword Arguments:
+            message (string): message shown once the textures are packed
+                (default: {'Completed Texture Packing!'})
+        """
+
+        script_runner = self.open_script_runner()
+
+        script_jobs = [
+            pack_script_job(pack_job, self.tga_rle, self.photoshop_pack_strategy)
+            for pack_job in pack_jobs]
+        failed_results = []
+
+        progress_dialog = self.popup_progress_window(
+            'Packing Textures', len(script_jobs))
+
+        progress = ProgressReporter(
+            progress_dialog, 'Packed {0}...', len(script_jobs))
+
+        for _, script_results in run_script_jobs(
+                script_runner, script_jobs, self.script_batch_size):
+
+            failed_results.extend(
+                script_result for script_result in script_results
+                if not script_result.ok)
+
+            progress.advance(
+                script_results[-1].job['output'], len(script_results),
+                steps=len(script_results))
+
+            if progress.was_canceled():
+                self.popup_ok_window('Search Canceled')
+                break
+
+        progress_dialog.close()
+
+        message = self.script_results_message(message, failed_results)
+
+        if isinstance(script_runner, PhotoshopScriptRunner):
+            self.close_photoshop(message, script_runner.ps_app)
+        else:
+            self.popup_ok_window(message)
+
+    def open_script_runner(self):
+        """Gets the runner of batched ExtendScript programs.
+
+        Returns:
+            object -- self.script_runner, or a PhotoshopScriptRunner for the
+                Photoshop session when it is None
+        """
+
+        if self.script_runner is not None:
+            return self.script_runner
+
+        return PhotoshopScriptRunner(self.launch_photoshop())
+
+    @classmethod
+    def script_results_message(cls, message, failed_results):
+        """Adds the jobs of a batch that failed to a completion message.
+
+        Arguments:
+            message (string): completion message
+            failed_results (list): ScriptResult of each failed job
+
+        Returns:
+            string -- message listing the failed jobs
+        """
+
+        if not failed_results:
+            return message
+
+        failed_jobs = '\n'.join(
+            '{0}: {1}'.format(
+                script_result.job.get('source') or script_result.job['output'],
+                script_result.error)
+            for script_result in failed_results)
+
+        return '{0}\n\nFailed:\n{1}'.format(message, failed_jobs)
+
+    def pack_textures_photoshop(self, pack_jobs,
+                                message='Completed Texture Packing!'):
         """Logic used to control Photoshop and copy flattened textures
             into RGBA channels of a new texture.
 
         Arguments:
-            scandir_entry (dictionary): input scandir generated dictionary to
-                                        iterate over.
+            pack_jobs (list): PackJob for each texture to pack
+
+        Keyword Arguments:
+            message (string): message shown once the textures are packed
+                (default: {'Completed Texture Packing!'})
         """
 
         # open Photoshop
         ps_app = self.launch_photoshop()
 
         progress_dialog = self.popup_progress_window(
-            'Packing Textures', len(scandir_entry['Red']))
+            'Packing Textures', len(pack_jobs))
+
+        progress = ProgressReporter(
+            progress_dialog, 'Packed {0}...', len(pack_jobs))
 
-        # iterate over scandir_entries in a directory
-        # since the length of scandir_entry['Red'], ['Blue'], ['Green'],
-        # and ['Alpha'] are all the same, one of them can be iterated over
-        # and the index number just needs to be matched for each other channel
-        for current_file in scandir_entry['Red']:
+        # Photoshop is driven through a single COM connection, so pack jobs
+        # run one at a time
+        for pack_job in pack_jobs:
 
-            if progress_dialog.wasCanceled():
+            if progress.was_canceled():
                 self.popup_ok_window('Search Canceled')
                 break
 
-            new_file_name_path = self.new_file_name(current_file)
+            self.pack_job_photoshop(ps_app, pack_job)
 
-            current_index = scandir_entry['Red'].index(current_file)
+            progress.advance(pack_job.file_name)
 
-            progress_dialog.setValue(current_index)
+        progress.finish()
 
-            progress_dialog.setLabelText(
-                'Packing {0}...'.format(new_file_name_path))
+        progress_dialog.close()
 
-            # open texture matching designated suffix to be used
-            # for R Channel
-            r_doc = ps_app.Open(scandir_entry['Red'][current_index])
+        # after using photoshop, prompt and ask user if they are done
+        # using photoshop
+        self.close_photoshop(message, ps_app)
 
-            # get width and height of texture
-            doc_width = r_doc.width
-            doc_height = r_doc.height
+    def pack_job_photoshop(self, ps_app, pack_job):
+        """Packs and saves one texture in Photoshop with the strategy set
+            by self.photoshop_pack_strategy.
 
-            # selec and  copy contents of the layer in focus
-            r_doc.selection.selectAll()
-            r_doc.activeLayer.Copy()
+        Arguments:
+            ps_app (com_object): Gets current Photoshop instance
+            pack_job (PackJob): packed texture and its sources
+        """
 
-            # use height and width variables to create new texture
-            # with same resolution
-            blank_doc = ps_app.Documents.Add(
-                doc_width, doc_height, 72, 'new_document', 2, 1, 1)
+        new_file_name_path = pack_job.file_name
+        alpha_file = pack_job.channel_paths[3]
 
-            # blank_doc.channels['Red'] - equivalent to calling channel
-            # by name
-            # activeChannels must receive an array
-            blank_doc.activeChannels = [blank_doc.channels['Red']]
-            blank_doc.Paste()
+        if self.photoshop_pack_strategy == 'applyimage':
+            blank_doc = self.pack_with_apply_image(ps_app, pack_job)
+        else:
+            blank_doc = self.pack_with_clipboard(ps_app, pack_job)
 
-            # follows same flow as what was done for R Channel
-            g_doc = ps_app.Open(scandir_entry['Green'][current_index])
-            g_doc.selection.selectAll()
-            g_doc.activeLayer.Copy()
+        # if there is an alpha input be sure to export TGA with
+        # alpha option on
+        if alpha_file:
+            self.save_tga(ps_app, new_file_name_path, True)
+        else:
+            self.save_tga(ps_app, new_file_name_path)
 
-            ps_app.activeDocument = blank_doc
-            blank_doc.activeChannels = [blank_doc.channels['Green']]
-            blank_doc.Paste()
+        blank_doc.Close(2)
 
-            # follows same flow as what was done for R and G Channels
-            b_doc = ps_app.Open(scandir_entry['Blue'][current_index])
-            b_doc.selection.selectAll()
-            b_doc.activeLayer.Copy()
+    def pack_with_clipboard(self, ps_app, pack_job):
+        """Copies flattened textures into the RGBA channels of a new
+            document through the clipboard.
+
+        Arguments:
+            ps_app (com_object): Gets current Photoshop instance
+            pack_job (PackJob): packed texture and its sources
+
+        Returns:
+            com_object -- the packed document, left open to be saved
+        """
+
+        red_file, green_file, blue_file, alpha_file = pack_job.channel_paths
+
+        # open texture matching designated suffix to be used
+        # for R Channel
+        r_doc = ps_app.Open(red_file)
+
+        # get width and height of texture from the texture index
+        # rather than querying the Photoshop document
+        r_record = self.open_texture_index().lookup_path(red_file)
+        doc_width = r_record.width
+        doc_height = r_record.height
+
+        # selec and  copy contents of the layer in focus
+        r_doc.selection.selectAll()
+        r_doc.activeLayer.Copy()
+
+        # use height and width variables to create new texture
+        # with same resolution
+        blank_doc = ps_app.Documents.Add(
+            doc_width, doc_height, 72, 'new_document', 2, 1, 1)
+
+        # blank_doc.channels['Red'] - equivalent to calling channel
+        # by name
+        # activeChannels must receive an array
+        blank_doc.activeChannels = [blank_doc.channels['Red']]
+        blank_doc.Paste()
+
+        # follows same flow as what was done for R Channel
+        g_doc = ps_app.Open(green_file)
+        g_doc.selection.selectAll()
+        g_doc.activeLayer.Copy()
+
+        ps_app.activeDocument = blank_doc
+        blank_doc.activeChannels = [blank_doc.channels['Green']]
+        blank_doc.Paste()
+
+        # follows same flow as what was done for R and G Channels
+        b_doc = ps_app.Open(blue_file)
+        b_doc.selection.selectAll()
+        b_doc.activeLayer.Copy()
+
+        ps_app.activeDocument = blank_doc
+        blank_doc.activeChannels = [blank_doc.channels['Blue']]
+        blank_doc.Paste()
+
+        # close original textures without saving
+        r_doc.Close(2)
+        g_doc.Close(2)
+        b_doc.Close(2)
+
+        # based on earlier A Channel checks
+        # should only proceed if A Channel was desired
+        if alpha_file:
+
+            # follows same flow as what was done for R, G and B Channels
+            a_doc = ps_app.Open(alpha_file)
+            a_doc.selection.selectAll()
+            a_doc.activeLayer.Copy()
 
             ps_app.activeDocument = blank_doc
-            blank_doc.activeChannels = [blank_doc.channels['Blue']]
+            blank_doc.channels.add()
+            # blank_doc.Name = 'Alpha 1'
+            # blank_doc.Kind = 2
+            # = PsChannelType.psMaskedAreaAlphaChannel
             blank_doc.Paste()
 
-            # close original textures without saving
-            r_doc.Close(2)
-            g_doc.Close(2)
-            b_doc.Close(2)
-
-            # based on earlier A Channel checks
-            # should only proceed if A Channel was desired
-            if scandir_entry['Alpha'][current_index]:
-
-                # follows same flow as what was done for R, G and B Channels
-                a_doc = ps_app.Open(scandir_entry['Alpha'][current_index])
-                a_doc.selection.selectAll()
-                a_doc.activeLayer.Copy()
-
-                ps_app.activeDocument = blank_doc
-                blank_doc.channels.add()
-                # blank_doc.Name = 'Alpha 1'
-                # blank_doc.Kind = 2
-                # = PsChannelType.psMaskedAreaAlphaChannel
-                blank_doc.Paste()
-
-                a_doc.Close(2)
-
-            # if there is an alpha input be sure to export TGA with
-            # alpha option on
-            if scandir_entry['Alpha'][current_index]:
-                self.save_tga(ps_app, new_file_name_path, True)
-            else:
-                self.save_tga(ps_app, new_file_name_path)
+            a_doc.Close(2)
 
-            blank_doc.Close(2)
+        return blank_doc
 
-        progress_dialog.setValue(len(scandir_entry['Red']))
+    def pack_with_apply_image(self, ps_app, pack_job):
+        """Applies flattened textures to the RGBA channels of a new
+            document with Apply Image.
 
-        progress_dialog.close()
+        Each source is applied straight into its target channel through an
+        action descriptor, so the clipboard is never used and the packed
+        document stays the active document while the channels are filled.
+        Sources are opened and resized to the red source before the packed
+        document is created, since only the active document can be resized.
 
-        # after using photoshop, prompt and ask user if they are done
-        # using photoshop
-        self.close_photoshop('Completed Texture Packing!', ps_app)
+        Arguments:
+            ps_app (com_object): Gets current Photoshop instance
+            pack_job (PackJob): packed texture and its sources
+
+        Returns:
+            com_object -- the packed document, left open to be saved
+        """
+
+        texture_index = self.open_texture_index()
+        photoshop_session = self.open_photoshop_session()
+
+        channel_paths = [x for x in pack_job.channel_paths if x]
+        channel_records = [texture_index.lookup_path(x) for x in channel_paths]
+
+        # get width and height of texture from the texture index
+        # rather than querying the Photoshop document
+        doc_width = channel_records[0].width
+        doc_height = channel_records[0].height
+
+        # a source used for several channels is opened once
+        source_docs = {}
+
+        for channel_path, channel_record in zip(channel_paths, channel_records):
+            if channel_path in source_docs:
+                continue
+
+            source_docs[channel_path] = ps_app.Open(channel_path)
+
+            if (channel_record.width, channel_record.height) != (doc_width, doc_height):
+                source_docs[channel_path].resizeImage(doc_width, doc_height)
+
+        blank_doc = ps_app.Documents.Add(
+            doc_width, doc_height, 72, 'new_document', 2, 1, 1)
+
+        target_channels = [
+            blank_doc.channels['Red'],
+            blank_doc.channels['Green'],
+            blank_doc.channels['Blue']]
+
+        if len(channel_paths) > 3:
+            target_channels.append(blank_doc.channels.add())
+
+        for channel_path, channel_record, target_channel in zip(
+                channel_paths, channel_records, target_channels):
 
-    def new_file_name(self, file_path, resize=False):
+            blank_doc.activeChannels = [target_channel]
+
+            # Photoshop names a document after its file
+            photoshop_session.apply_image(
+                os.path.basename(channel_path), channel_record.channels < 3)
+
+        # close original textures without saving
+        for source_doc in source_docs.values():
+            source_doc.Close(2)
+
+        return blank_doc
+
+    def new_file_name(self, file_path, resize=False, target_size=None,
+                      packed_suffix=None):
         """Since assigning a new file name for both texture packing and
         texture resizing follow similar operations, the functions were
         combined.
@@ -512,6 +1224,10 @@ class Pyotoshop(object):
         Keyword Arguments:
             resize (bool): Toggle to be able switch between
             texture packing or texture resizing (default: {False})
+            target_size (int): Size appended to resized textures, uses
+            self.current_target_size when None (default: {None})
+            packed_suffix (str): Suffix appended to packed textures, uses the
+            packed texture QLineEdit when None (default: {None})
 
         Returns:
             str -- Returns updated path name
@@ -522,15 +1238,16 @@ class Pyotoshop(object):
         file_name, file_ext = os.path.splitext(split_path_file_name)
 
         if resize:
+            if target_size is None:
+                target_size = self.current_target_size()
+
             # split the extension from the texture path
             file_name, file_extension = os.path.splitext(file_path)
 
             # by splitting the extension, the new image size can be
             # appended to a new string and that is combined with the
             # extension
-            new_file_name = file_name + '_' + str(
-                self.target_texture_size_combobox.currentText()
-                ) + file_extension
+            new_file_name = file_name + '_' + str(target_size) + file_extension
 
             return new_file_name
         else:
@@ -544,8 +1261,11 @@ class Pyotoshop(object):
             else:
                 split_file_name = split_file_name[0]
 
+            if packed_suffix is None:
+                packed_suffix = self.packed_texture_le.text()
+
             new_file_name = str(split_file_name) + \
-                str(self.packed_texture_le.text()) + file_ext
+                str(packed_suffix) + file_ext
 
             new_file_name_path = os.path.join(split_path, new_file_name)
 
@@ -655,76 +1375,58 @@ class Pyotoshop(object):
         but it has allowed the script to work with various Photoshop versions.
         Photoshop versions tested with 2018, 2017, CS6
 
+        The connection is kept by the Photoshop session, so later batches
+        reuse it instead of launching Photoshop again.
+
         Returns:
             com_object -- Returns instance of Photoshop object.
         """
 
-        os_ver = self.check_windows_version()
-
-        if os_ver == '10':
+        return self.open_photoshop_session().attach()
 
-            ps_app = comtypes.client.CreateObject(
-                'Photoshop.Application', dynamic=True)
+    def open_photoshop_session(self):
+        """Creates the Photoshop session if it does not exist yet.
 
-            ps_app.Visible = True
-
-            # Set the default unit to pixels!
-            ps_app.Preferences.RulerUnits = 1
+        Returns:
+            PhotoshopSession -- the session shared by every batch
+        """
 
-            return ps_app
+        if self.photoshop_session is None:
+            self.photoshop_session = PhotoshopSession(self)
 
-        else:
-            self.popup_ok_window(
-                'Error with determining OS Version to launch Photoshop')
+        return self.photoshop_session
 
     def resize_results_popup(self, texture_dict):
         """Generates popup to show results of resize texture function.
-        Collects contents of resize texture dictionary, combines into a
-        string, and generates a popup witht his string.
+        Resizes the larger textures and shows a table of every texture
+        found with its size, category and the action taken on it.
 
         Arguments:
             texture_dict (dictionary): Dictionary used to store different scenarios and return the
                                        results of the analysis
-
-            target_size (int): Input texture sized that files will be sized to
         """
 
-        if texture_dict['Larger Textures']:
+        resize_outcomes = {}
 
-            self.texture_resize(texture_dict['Larger Textures'])
+        if texture_dict.get('Larger Textures'):
 
-            larger_textures_header = 'Resized Textures:' + '\n'
-            larger_textures = '\n'.join(str(x) for x in texture_dict['Larger Textures'])
-        else:
-            larger_textures_header = 'Resized Textures' + '\n'
-            larger_textures = 'No Textures found larger than ' + \
-                str(self.target_texture_size_combobox.currentText()) + \
-                ' were found'
+            resize_outcomes = self.texture_resize(texture_dict['Larger Textures'])
 
-        already_resized_textures_header = '\n\n' + 'Already ReSized and Skipped:' + '\n'
-        already_resized_textures = '\n'.join(str(x) for x in texture_dict['Already Sized Textures'])
+        # records are built on this thread, which owns the texture index
+        result_records = build_result_records(
+            texture_dict, self.open_texture_index(), resize_outcomes)
 
-        not_power_of_2_textures_header = '\n\n' + 'Not Power of 2 Textures' + '\n'
-        not_power_of_2_textures = '\n'.join(str(x) for x in texture_dict['Not Power of 2'])
-
-        not_square_texture_header = '\n\n' + 'Not Square Textures' + '\n'
-        not_square_textures = '\n'.join(str(x) for x in texture_dict['Not Square'])
-
-        output_string = larger_textures_header + \
-            larger_textures + already_resized_textures_header + \
-            already_resized_textures + not_power_of_2_textures_header + \
-            not_power_of_2_textures + not_square_texture_header + \
-            not_square_textures
-
-        self.popup_ok_window(output_string)
+        if result_records:
+            self.popup_results_window(result_records)
+        else:
+            self.popup_ok_window('No Textures found to resize')
 
     def save_as(self, ps_app, ps_doc, file_name):
         """Runs Save As Photoshop operation to save resized texture as a
             duplicate file.
 
-        Similarly to com_object needed to launch and control Photoshop, a
-        com_object is needed. So a com_object is created to contain the
-        appopriate save options to save the file.
+        The save options COM object of each format is built once by the
+        Photoshop session and reused for every file.
 
         Arguments:
             ps_app (com_object): Gets current Photoshop instance
@@ -732,71 +1434,37 @@ class Pyotoshop(object):
             file_name (string): File name for the tga file to be generated.
         """
 
-        os_ver = self.check_windows_version()
-
-        # check if currently on Win10
-        if os_ver == '10':
-
-            # split the extension from the texture path
-            file_name_split, file_extension = os.path.splitext(file_name)
-
-            if file_extension == '.tga':
-
-                # get channel count of document
-                # if there are less than 3 channels then save without alpha
-                if ps_doc.channels.count > 3:
-                    self.save_tga(ps_app, file_name, True)
-                else:
-                    self.save_tga(ps_app, file_name)
-
-            else:
-
-                if file_extension == '.jpg':
-                    # creates com object for tga save operation
-                    save_options = comtypes.client.CreateObject(
-                        'Photoshop.JPEGSaveOptions', dynamic=True)
-                elif file_extension == '.png':
-                    # creates com object for tga save operation
-                    save_options = comtypes.client.CreateObject(
-                        'Photoshop.PNGSaveOptions', dynamic=True)
-
-                # Photoshop saves texture as tga
-                ps_app.ActiveDocument.SaveAs(file_name, save_options, True)
+        self.open_photoshop_session().save_as(ps_doc, file_name)
 
     def save_tga(self, ps_app, tga_file, alpha_channel=False):
         """Runs Save As Photoshop operation to save resized texture as a duplicate file.
 
-        Similarly to com_object needed to launch and control Photoshop, a com_object is needed.
-        So a com_object is created to contain the attributes to create a tga file.
+        The TargaSaveOptions COM object for each alpha setting is built once
+        by the Photoshop session and reused for every file.
 
         Arguments:
-            ps_doc (com_object): The active photoshop document.
+            ps_app (com_object): Gets current Photoshop instance
             tga_file (string): File name for the tga file to be generated.
 
         Keyword Arguments:
             alpha_channel (bool): Determines if alpha channel is included in save (default: {False})
         """
 
-        os_ver = self.check_windows_version()
-
-        # check if currently on Win10
-        if os_ver == '10':
+        self.open_photoshop_session().save_tga(tga_file, alpha_channel)
 
-            # creates com object for tga save operation
-            tga_save_options = comtypes.client.CreateObject(
-                'Photoshop.TargaSaveOptions', dynamic=True)
-            tga_save_options.Resolution = 24
-            tga_save_options.AlphaChannels = False
-            tga_save_options.RLECompression = False
+    @classmethod
+    def is_sized_texture(cls, file_name):
+        """Checks if a file name already contains one of the TEXTURE_SIZES.
 
-            # If designated to include alpha, set parameters to do so
-            if alpha_channel:
+        Arguments:
+            file_name (string): name of the texture file
 
-                tga_save_options.Resolution = 32
-                tga_save_options.AlphaChannels = True
+        Returns:
+            boolean -- True if the texture has already been sized
+        """
 
-            # Photoshop saves texture as tga
-            ps_app.ActiveDocument.SaveAs(tga_file, tga_save_options, True)
+        # s variable used to iterate over TEXTURE_SIZES tuple
+        return any(str(s) in file_name for s in TEXTURE_SIZES)
 
     @classmethod
     def is_power2(cls, num):
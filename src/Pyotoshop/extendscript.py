@@ -0,0 +1,400 @@
+"""Batched ExtendScript execution of resize and pack jobs in Photoshop."""
+
+import re
+import json
+import collections
+
+from .lazy import Image
+from .packing import pack_channels, packed_file_name
+
+# Global Variables ------------------------------------------------------------
+# marks the line of a compiled script holding its job list
+JOBS_MARKER = '/* pyotoshop jobs */'
+
+ScriptResult = collections.namedtuple('ScriptResult', ['job', 'ok', 'error'])
+
+# runtime prepended to every batch, runs each job in its own try block and
+# returns a JSON array with the outcome of every job
+SCRIPT_RUNTIME = r'''
+function pyotoshopQuote(text) {
+    text = String(text);
+    var quoted = '"';
+    for (var i = 0; i < text.length; i++) {
+        var c = text.charAt(i);
+        var code = text.charCodeAt(i);
+        if (c == '"' || c == '\\') {
+            quoted += '\\' + c;
+        } else if (code < 32) {
+            quoted += '\\u' + ('000' + code.toString(16)).slice(-4);
+        } else {
+            quoted += c;
+        }
+    }
+    return quoted + '"';
+}
+
+function pyotoshopSave(doc, path, rle) {
+    var extension = path.slice(path.lastIndexOf('.')).toLowerCase();
+    var options;
+    if (extension == '.tga') {
+        var alpha = doc.channels.length > 3;
+        options = new TargaSaveOptions();
+        options.resolution = alpha ? TargaBitsPerPixels.THIRTYTWO : TargaBitsPerPixels.TWENTYFOUR;
+        options.alphaChannels = alpha;
+        options.rleCompression = rle;
+    } else if (extension == '.jpg') {
+        options = new JPEGSaveOptions();
+    } else {
+        options = new PNGSaveOptions();
+    }
+    doc.saveAs(new File(path), options, true);
+}
+
+function pyotoshopResize(job) {
+    var doc = app.open(new File(job.source));
+    try {
+        for (var i = 0; i < job.sizes.length; i++) {
+            doc.resizeImage(UnitValue(job.sizes[i], 'px'), UnitValue(job.sizes[i], 'px'));
+            pyotoshopSave(doc, job.outputs[i], job.rle);
+        }
+    } finally {
+        doc.close(SaveOptions.DONOTSAVECHANGES);
+    }
+}
+
+function pyotoshopPaste(packed, path, channel) {
+    var source = app.open(new File(path));
+    try {
+        source.selection.selectAll();
+        source.activeLayer.copy();
+    } finally {
+        source.close(SaveOptions.DONOTSAVECHANGES);
+    }
+    app.activeDocument = packed;
+    packed.activeChannels = [channel];
+    packed.paste();
+}
+
+function pyotoshopApplyImage(source) {
+    var composite = source.mode == DocumentMode.GRAYSCALE ? 'Blck' : 'RGB ';
+    var reference = new ActionReference();
+    reference.putEnumerated(
+        charIDToTypeID('Chnl'), charIDToTypeID('Chnl'), charIDToTypeID(composite));
+    reference.putName(charIDToTypeID('Dcmn'), source.name);
+    var calculation = new ActionDescriptor();
+    calculation.putReference(charIDToTypeID('T   '), reference);
+    var descriptor = new ActionDescriptor();
+    descriptor.putObject(charIDToTypeID('With'), charIDToTypeID('Clcl'), calculation);
+    executeAction(charIDToTypeID('AppI'), descriptor, DialogModes.NO);
+}
+
+function pyotoshopPackApplyImage(job) {
+    var sources = {};
+    var opened = [];
+    try {
+        for (var i = 0; i < job.channels.length; i++) {
+            var path = job.channels[i];
+            if (!path || sources.hasOwnProperty(path)) {
+                continue;
+            }
+            var source = app.open(new File(path));
+            sources[path] = source;
+            opened.push(source);
+            // only the active document can be resized
+            var sameWidth = source.width.as('px') == opened[0].width.as('px');
+            var sameHeight = source.height.as('px') == opened[0].height.as('px');
+            if (!sameWidth || !sameHeight) {
+                source.resizeImage(opened[0].width, opened[0].height);
+            }
+        }
+        var packed = app.documents.add(
+            opened[0].width, opened[0].height, 72, 'new_document',
+            NewDocumentMode.RGB, DocumentFill.WHITE, 1);
+        try {
+            var targets = [packed.channels[0], packed.channels[1], packed.channels[2]];
+            if (job.channels[3]) {
+                targets.push(packed.channels.add());
+            }
+            for (var j = 0; j < targets.length; j++) {
+                packed.activeChannels = [targets[j]];
+                pyotoshopApplyImage(sources[job.channels[j]]);
+            }
+            pyotoshopSave(packed, job.output, job.rle);
+        } finally {
+            packed.close(SaveOptions.DONOTSAVECHANGES);
+        }
+    } finally {
+        for (var k = 0; k < opened.length; k++) {
+            opened[k].close(SaveOptions.DONOTSAVECHANGES);
+        }
+    }
+}
+
+function pyotoshopPack(job) {
+    if (job.strategy == 'applyimage') {
+        pyotoshopPackApplyImage(job);
+        return;
+    }
+    var red = app.open(new File(job.channels[0]));
+    var width = red.width;
+    var height = red.height;
+    red.close(SaveOptions.DONOTSAVECHANGES);
+    var packed = app.documents.add(
+        width, height, 72, 'new_document', NewDocumentMode.RGB, DocumentFill.WHITE, 1);
+    try {
+        pyotoshopPaste(packed, job.channels[0], packed.channels[0]);
+        pyotoshopPaste(packed, job.channels[1], packed.channels[1]);
+        pyotoshopPaste(packed, job.channels[2], packed.channels[2]);
+        if (job.channels[3]) {
+            pyotoshopPaste(packed, job.channels[3], packed.channels.add());
+        }
+        pyotoshopSave(packed, job.output, job.rle);
+    } finally {
+        packed.close(SaveOptions.DONOTSAVECHANGES);
+    }
+}
+
+function pyotoshopRun(jobs) {
+    var dialogModes = app.displayDialogs;
+    var rulerUnits = app.preferences.rulerUnits;
+    var results = [];
+    app.displayDialogs = DialogModes.NO;
+    app.preferences.rulerUnits = Units.PIXELS;
+    for (var i = 0; i < jobs.length; i++) {
+        try {
+            if (jobs[i].op == 'resize') {
+                pyotoshopResize(jobs[i]);
+            } else {
+                pyotoshopPack(jobs[i]);
+            }
+            results.push('{"ok": true}');
+        } catch (error) {
+            results.push('{"ok": false, "error": ' + pyotoshopQuote(error) + '}');
+        }
+    }
+    app.displayDialogs = dialogModes;
+    app.preferences.rulerUnits = rulerUnits;
+    return '[' + results.join(', ') + ']';
+}
+'''
+
+
+def resize_script_job(texture_path, target_sizes, file_names, rle=False):
+    """Describes the resize of a texture for a batch script.
+
+    Like PhotoshopResizeBackend.resize_chain, the texture is opened once
+    and resized down through every size.
+
+    Arguments:
+        texture_path (string): path of the texture to resize
+        target_sizes (list): sizes to resize to, largest first
+        file_names (list): path each resized texture is saved to
+
+    Keyword Arguments:
+        rle (bool): RLE compress saved TGA files (default: {False})
+
+    Returns:
+        dict -- job for compile_script
+    """
+
+    return {
+        'op': 'resize',
+        'source': texture_path,
+        'sizes': list(target_sizes),
+        'outputs': list(file_names),
+        'rle': bool(rle)}
+
+
+def pack_script_job(pack_job, rle=False, strategy='clipboard'):
+    """Describes a PackJob for a batch script.
+
+    The packed texture is always saved as a TGA, as save_tga does, so the
+    alpha channel is kept whatever the format of the red source.
+
+    Arguments:
+        pack_job (PackJob): packed texture and its sources
+
+    Keyword Arguments:
+        rle (bool): RLE compress the packed TGA (default: {False})
+        strategy (string): 'clipboard' to copy and paste each source or
+            'applyimage' to apply each source to its channel with Apply
+            Image (default: {'clipboard'})
+
+    Returns:
+        dict -- job for compile_script
+    """
+
+    return {
+        'op': 'pack',
+        'channels': list(pack_job.channel_paths),
+        'output': packed_file_name(pack_job.file_name),
+        'rle': bool(rle),
+        'strategy': strategy}
+
+
+def compile_script(jobs):
+    """Compiles jobs into one ExtendScript program.
+
+    The job list is embedded as a JSON literal, which ExtendScript parses
+    as an array of objects, and the value of the program is the JSON text
+    of the results.
+
+    Arguments:
+        jobs (list): jobs made by resize_script_job or pack_script_job
+
+    Returns:
+        string -- the script to run with DoJavaScript
+    """
+
+    return '\n'.join([
+        SCRIPT_RUNTIME,
+        '{0}\nvar pyotoshopJobs = {1};'.format(JOBS_MARKER, json.dumps(jobs)),
+        'pyotoshopRun(pyotoshopJobs);'])
+
+
+def parse_results(jobs, result_text):
+    """Pairs the result of a batch script with its jobs.
+
+    Arguments:
+        jobs (list): jobs the script was compiled from
+        result_text (string): JSON text returned by the script
+
+    Returns:
+        list -- ScriptResult for each job
+    """
+
+    outcomes = json.loads(result_text)
+
+    if len(outcomes) != len(jobs):
+        raise ValueError('Expected {0} script results, got {1}'.format(
+            len(jobs), len(outcomes)))
+
+    return [ScriptResult(job, outcome['ok'], outcome.get('error', ''))
+            for job, outcome in zip(jobs, outcomes)]
+
+
+def run_script_jobs(runner, jobs, batch_size):
+    """Runs jobs in chunks, one script per chunk.
+
+    Arguments:
+        runner (object): PhotoshopScriptRunner or LocalScriptRunner
+        jobs (list): jobs made by resize_script_job or pack_script_job
+        batch_size (int): number of jobs compiled into each script
+
+    Yields:
+        tuple -- (number of jobs run so far, list of ScriptResult of the
+            chunk)
+    """
+
+    batch_size = max(1, batch_size)
+
+    for chunk_start in range(0, len(jobs), batch_size):
+        chunk = jobs[chunk_start:chunk_start + batch_size]
+
+        yield (chunk_start + len(chunk),
+               parse_results(chunk, runner.run(compile_script(chunk))))
+
+
+class PhotoshopScriptRunner(object):
+    """
+    Runs compiled scripts in Photoshop with a single DoJavaScript call.
+    """
+
+    def __init__(self, ps_app):
+        """Stores the Photoshop application the scripts run in.
+
+        Arguments:
+            ps_app (com_object): Photoshop application
+        """
+
+        super(PhotoshopScriptRunner, self).__init__()
+        self.ps_app = ps_app
+
+    def run(self, script):
+        """Runs a script.
+
+        Arguments:
+            script (string): program made by compile_script
+
+        Returns:
+            string -- value of the script
+        """
+
+        return self.ps_app.DoJavaScript(script)
+
+
+class LocalScriptRunner(object):
+    """
+    Stand in for Photoshop that runs the job list of a compiled script.
+
+    The job list is read back from the script and every job is run with
+    Pillow and packing.pack_channels, so the batching, chunking and result
+    handling can be exercised on machines without Photoshop.
+    """
+
+    def __init__(self):
+        super(LocalScriptRunner, self).__init__()
+        self.scripts_run = 0
+
+    @classmethod
+    def read_jobs(cls, script):
+        """Reads the job list embedded in a compiled script.
+
+        Arguments:
+            script (string): program made by compile_script
+
+        Returns:
+            list -- the jobs of the script
+        """
+
+        jobs_match = re.search(
+            re.escape(JOBS_MARKER) + r'\nvar pyotoshopJobs = (.*);\n', script)
+
+        return json.loads(jobs_match.group(1))
+
+    def run(self, script):
+        """Runs the jobs of a script and reports them like the runtime does.
+
+        Arguments:
+            script (string): program made by compile_script
+
+        Returns:
+            string -- JSON text of the results
+        """
+
+        self.scripts_run += 1
+        outcomes = []
+
+        for job in self.read_jobs(script):
+            try:
+                if job['op'] == 'resize':
+                    self.resize(job)
+                else:
+                    pack_channels(
+                        job['channels'], job['output'], rle=job['rle'])
+
+                outcomes.append({'ok': True})
+            except Exception as error:  # pylint: disable = W0703
+                outcomes.append({'ok': False, 'error': str(error)})
+
+        return json.dumps(outcomes)
+
+    @classmethod
+    def resize(cls, job):
+        """Resizes a texture down through the sizes of a resize job.
+
+        Arguments:
+            job (dict): job made by resize_script_job
+        """
+
+        # imported here, backends imports this module for its script backend
+        from .backends import save_image
+
+        with Image.open(job['source']) as image:
+            level_image = image.copy()
+
+        for target_size, file_name in zip(job['sizes'], job['outputs']):
+            level_image = level_image.resize(
+                (target_size, target_size), Image.BICUBIC)
+
+            save_image(level_image, file_name, job['rle'])
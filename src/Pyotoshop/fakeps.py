@@ -0,0 +1,637 @@
+"""In process stand in for the Photoshop COM object model, backed by Pillow."""
+
+import os
+import time
+import struct
+import collections
+
+from .lazy import Image, numpy
+from .backends import save_image
+from .extendscript import LocalScriptRunner
+
+# Global Variables ------------------------------------------------------------
+# extension Photoshop gives a file saved with each kind of save options
+SAVE_OPTIONS_EXTENSIONS = {
+    'Photoshop.TargaSaveOptions': '.tga',
+    'Photoshop.JPEGSaveOptions': '.jpg',
+    'Photoshop.PNGSaveOptions': '.png'}
+
+RGB_CHANNEL_NAMES = ('Red', 'Green', 'Blue')
+
+# PsDocumentFill values
+FILL_WHITE = 1
+FILL_BACKGROUND_COLOR = 2
+
+
+class FakeComError(Exception):
+    """Raised when a member of a Photoshop that has quit is used."""
+
+
+class FakeComObject(object):
+    """
+    Base of the fake COM objects.
+
+    COM members are resolved case insensitively like a dynamic comtypes
+    dispatch. Every method call and property get or set is recorded as one
+    round trip on the owning FakePhotoshop, which also applies its latency.
+    Methods are implemented as com_<name> and properties as get_<name> and
+    set_<name>, so plain Python attributes never count as calls.
+    """
+
+    com_methods = frozenset()
+    com_properties = frozenset()
+
+    def __init__(self, photoshop):
+        super(FakeComObject, self).__init__()
+        self.photoshop = photoshop
+
+    def __getattr__(self, name):
+        member = name.lower()
+
+        if member in type(self).com_methods:
+            com_method = object.__getattribute__(self, 'com_' + member)
+
+            def com_call(*args):
+                self.photoshop.record_call(self, member)
+                return com_method(*args)
+
+            return com_call
+
+        if member in type(self).com_properties:
+            self.photoshop.record_call(self, member)
+            return object.__getattribute__(self, 'get_' + member)()
+
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        member = name.lower()
+
+        if member in type(self).com_properties:
+            self.photoshop.record_call(self, member)
+            object.__getattribute__(self, 'set_' + member)(value)
+        else:
+            object.__setattr__(self, name, value)
+
+
+class FakePhotoshop(FakeComObject):
+    """
+    Fake Photoshop.Application with call counters and per call latency.
+
+    Use create_object as Pyotoshop.photoshop_factory to run the Photoshop
+    code paths without Photoshop, then read call_counts or total_calls to
+    compare how many COM round trips each path makes.
+    """
+
+    com_methods = frozenset([
+        'open', 'quit', 'dojavascript', 'charidtotypeid', 'executeaction'])
+    com_properties = frozenset([
+        'visible', 'preferences', 'documents', 'activedocument', 'application'])
+
+    def __init__(self, latency=0.0):
+        """Creates a fake Photoshop with no open documents.
+
+        Keyword Arguments:
+            latency (float): seconds each COM call sleeps, to model the
+                cost of a round trip to Photoshop (default: {0.0})
+        """
+
+        super(FakePhotoshop, self).__init__(self)
+
+        self.latency = latency
+        self.call_counts = collections.Counter()
+        self.running = True
+        self.is_visible = False
+        self.open_documents = []
+        self.active_document = None
+        self.clipboard = None
+        self.ruler_preferences = FakePreferences(self)
+        self.document_collection = FakeDocuments(self)
+        self.script_runner = LocalScriptRunner()
+
+    def create_object(self, prog_id, dynamic=True):
+        """Creates a fake COM object, with the signature of CreateObject.
+
+        Arguments:
+            prog_id (string): ProgID such as 'Photoshop.Application'
+
+        Keyword Arguments:
+            dynamic (bool): ignored, kept for comtypes compatibility
+                (default: {True})
+
+        Returns:
+            FakeComObject -- the application or a new helper object
+        """
+
+        self.record_call(self, 'createobject')
+
+        if prog_id == 'Photoshop.Application':
+            self.running = True
+            return self
+
+        if prog_id in SAVE_OPTIONS_EXTENSIONS:
+            return FakeSaveOptions(self, SAVE_OPTIONS_EXTENSIONS[prog_id])
+
+        if prog_id == 'Photoshop.ActionDescriptor':
+            return FakeActionDescriptor(self)
+
+        if prog_id == 'Photoshop.ActionReference':
+            return FakeActionReference(self)
+
+        raise FakeComError('Unknown ProgID {0}'.format(prog_id))
+
+    def record_call(self, com_object, member):
+        """Counts a COM round trip and waits for the configured latency.
+
+        Arguments:
+            com_object (FakeComObject): object the member belongs to
+            member (string): lower case member name
+        """
+
+        if not self.running and member != 'createobject':
+            raise FakeComError('Photoshop is not running')
+
+        self.call_counts['{0}.{1}'.format(type(com_object).__name__, member)] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def total_calls(self):
+        """int -- number of COM round trips made since the last reset."""
+
+        return sum(self.call_counts.values())
+
+    def reset_counts(self):
+        """Clears the call counters."""
+
+        self.call_counts.clear()
+
+    def find_document(self, document_name):
+        """Finds an open document by name.
+
+        Arguments:
+            document_name (string): name of the document
+
+        Returns:
+            FakeDocument -- the most recently opened match
+        """
+
+        for document in reversed(self.open_documents):
+            if document.document_name == document_name:
+                return document
+
+        raise FakeComError('No open document named {0}'.format(document_name))
+
+    def activate(self, document):
+        """Makes a document the active document.
+
+        Arguments:
+            document (FakeDocument): document to activate
+        """
+
+        self.active_document = document
+
+    def get_visible(self):
+        return self.is_visible
+
+    def set_visible(self, value):
+        self.is_visible = bool(value)
+
+    def get_preferences(self):
+        return self.ruler_preferences
+
+    def get_documents(self):
+        return self.document_collection
+
+    def get_activedocument(self):
+        if self.active_document is None:
+            raise FakeComError('There is no active document')
+
+        return self.active_document
+
+    def set_activedocument(self, document):
+        self.activate(document)
+
+    def get_application(self):
+        return self
+
+    def com_open(self, path):
+        document = FakeDocument.from_file(self, path)
+
+        self.open_documents.append(document)
+        self.activate(document)
+
+        return document
+
+    def com_quit(self):
+        self.open_documents = []
+        self.active_document = None
+        self.running = False
+
+    def com_dojavascript(self, script):
+        # the jobs of a batch script run locally rather than through the
+        # fake documents, so a script is a single round trip like in Photoshop
+        return self.script_runner.run(script)
+
+    def com_charidtotypeid(self, char_id):
+        return struct.unpack('>I', char_id.encode('ascii'))[0]
+
+    def com_executeaction(self, event_id, descriptor, dialog_mode):
+        if event_id != self.com_charidtotypeid('AppI'):
+            raise FakeComError('Only Apply Image is supported')
+
+        calculation = descriptor.values[self.com_charidtotypeid('With')]
+        source_reference = calculation.values[self.com_charidtotypeid('T   ')]
+
+        source_document = self.find_document(source_reference.document_name)
+
+        self.get_activedocument().write_active_channels(
+            source_document.composite_image())
+
+
+class FakePreferences(FakeComObject):
+    """
+    Fake Preferences, only holds the ruler units.
+    """
+
+    com_properties = frozenset(['rulerunits'])
+
+    def __init__(self, photoshop):
+        super(FakePreferences, self).__init__(photoshop)
+        self.ruler_units = 1
+
+    def get_rulerunits(self):
+        return self.ruler_units
+
+    def set_rulerunits(self, value):
+        self.ruler_units = value
+
+
+class FakeDocuments(FakeComObject):
+    """
+    Fake Documents collection.
+    """
+
+    com_methods = frozenset(['add'])
+    com_properties = frozenset(['count'])
+
+    def get_count(self):
+        return len(self.photoshop.open_documents)
+
+    def __getitem__(self, index):
+        self.photoshop.record_call(self, 'item')
+        return self.photoshop.open_documents[index]
+
+    def com_add(self, width, height, resolution=72, name='Untitled',
+                mode=2, initial_fill=FILL_WHITE, pixel_aspect_ratio=1):
+        fill_value = 255 if initial_fill in (FILL_WHITE, FILL_BACKGROUND_COLOR) else 0
+
+        document = FakeDocument(
+            self.photoshop, name,
+            [numpy.full((int(height), int(width)), fill_value, numpy.uint8)
+             for _ in RGB_CHANNEL_NAMES])
+
+        self.photoshop.open_documents.append(document)
+        self.photoshop.activate(document)
+
+        return document
+
+
+class FakeDocument(FakeComObject):
+    """
+    Fake Document holding its channels as 8 bit NumPy planes.
+
+    RGB documents have 3 color planes and grayscale documents 1, every
+    alpha channel adds another plane.
+    """
+
+    com_methods = frozenset(['resizeimage', 'paste', 'saveas', 'close'])
+    com_properties = frozenset([
+        'name', 'width', 'height', 'mode', 'channels', 'activechannels',
+        'selection', 'activelayer'])
+
+    def __init__(self, photoshop, document_name, planes, color_planes=3):
+        """Creates a document from its planes.
+
+        Arguments:
+            photoshop (FakePhotoshop): owning application
+            document_name (string): name of the document
+            planes (list): 2D uint8 arrays, color planes first
+
+        Keyword Arguments:
+            color_planes (int): 3 for RGB or 1 for grayscale (default: {3})
+        """
+
+        super(FakeDocument, self).__init__(photoshop)
+
+        self.document_name = document_name
+        self.planes = planes
+        self.color_planes = color_planes
+        self.channel_collection = FakeChannels(photoshop, self)
+        self.active_channels = []
+        self.document_selection = FakeSelection(photoshop)
+        self.active_layer = FakeLayer(photoshop, self)
+
+    @classmethod
+    def from_file(cls, photoshop, path):
+        """Opens an image the way Photoshop lays it out in channels.
+
+        Arguments:
+            photoshop (FakePhotoshop): owning application
+            path (string): path of the image
+
+        Returns:
+            FakeDocument -- the opened document
+        """
+
+        if not os.path.isfile(path):
+            raise FakeComError('Could not open {0}'.format(path))
+
+        with Image.open(path) as image:
+            if image.mode in ('L', 'LA', '1', 'I', 'I;16', 'F'):
+                color_image = image.convert('L')
+                color_planes = 1
+            else:
+                color_image = image.convert('RGB')
+                color_planes = 3
+
+            planes = [numpy.array(band) for band in color_image.split()]
+
+            if 'A' in image.getbands() or 'transparency' in image.info:
+                planes.append(numpy.array(image.convert('RGBA').getchannel('A')))
+
+        return cls(photoshop, os.path.basename(path), planes, color_planes)
+
+    def composite_image(self):
+        """Builds a Pillow image of the color planes.
+
+        Returns:
+            PIL.Image -- L or RGB image
+        """
+
+        if self.color_planes == 1:
+            return Image.fromarray(self.planes[0])
+
+        return Image.merge(
+            'RGB', [Image.fromarray(x) for x in self.planes[:3]])
+
+    def write_active_channels(self, image):
+        """Writes an image into the active channels.
+
+        A single active channel receives the luminance of the image, which
+        is what Paste and Apply Image do with a color source.
+
+        Arguments:
+            image (PIL.Image): image to write
+        """
+
+        size = (self.planes[0].shape[1], self.planes[0].shape[0])
+
+        if image.size != size:
+            image = image.resize(size, Image.BICUBIC)
+
+        target_indexes = [x.plane_index for x in self.active_channels] or \
+            list(range(self.color_planes))
+
+        if len(target_indexes) == 1:
+            self.planes[target_indexes[0]] = numpy.array(image.convert('L'))
+        else:
+            bands = image.convert('RGB').split()
+
+            for plane_index, band in zip(target_indexes, bands):
+                self.planes[plane_index] = numpy.array(band)
+
+    def get_name(self):
+        return self.document_name
+
+    def get_width(self):
+        return self.planes[0].shape[1]
+
+    def get_height(self):
+        return self.planes[0].shape[0]
+
+    def get_mode(self):
+        # PsDocumentMode, 1 grayscale and 2 RGB
+        return 1 if self.color_planes == 1 else 2
+
+    def get_channels(self):
+        return self.channel_collection
+
+    def get_activechannels(self):
+        return list(self.active_channels)
+
+    def set_activechannels(self, channels):
+        self.active_channels = list(channels)
+
+    def get_selection(self):
+        return self.document_selection
+
+    def get_activelayer(self):
+        return self.active_layer
+
+    def com_resizeimage(self, width, height, resolution=None, resample=None):
+        self.planes = [
+            numpy.array(Image.fromarray(x).resize(
+                (int(width), int(height)), Image.BICUBIC))
+            for x in self.planes]
+
+    def com_paste(self):
+        if self.photoshop.clipboard is None:
+            raise FakeComError('The clipboard is empty')
+
+        self.write_active_channels(self.photoshop.clipboard)
+
+    def com_saveas(self, file_name, save_options, as_copy=True):
+        image = self.composite_image()
+        file_extension = save_options.file_extension
+
+        if file_extension == '.tga' and save_options.values.get('alphachannels') \
+                and len(self.planes) > self.color_planes:
+            image = image.convert('RGB')
+            image.putalpha(Image.fromarray(self.planes[self.color_planes]))
+
+        # Photoshop gives the file the extension of its format
+        file_name = os.path.splitext(file_name)[0] + file_extension
+
+        save_image(
+            image, file_name, bool(save_options.values.get('rlecompression')))
+
+    def com_close(self, save_option=2):
+        self.photoshop.open_documents.remove(self)
+
+        if self.photoshop.active_document is self:
+            self.photoshop.active_document = (
+                self.photoshop.open_documents[-1]
+                if self.photoshop.open_documents else None)
+
+
+class FakeChannels(FakeComObject):
+    """
+    Fake Channels collection of a document.
+    """
+
+    com_methods = frozenset(['add'])
+    com_properties = frozenset(['count'])
+
+    def __init__(self, photoshop, document):
+        super(FakeChannels, self).__init__(photoshop)
+        self.document = document
+
+    def channel_names(self):
+        """Gets the name of every channel in plane order.
+
+        Returns:
+            list -- channel names
+        """
+
+        if self.document.color_planes == 1:
+            channel_names = ['Gray']
+        else:
+            channel_names = list(RGB_CHANNEL_NAMES)
+
+        alpha_count = len(self.document.planes) - self.document.color_planes
+
+        return channel_names + [
+            'Alpha {0}'.format(x + 1) for x in range(alpha_count)]
+
+    def __getitem__(self, key):
+        self.photoshop.record_call(self, 'item')
+
+        channel_names = self.channel_names()
+
+        if not isinstance(key, int):
+            key = channel_names.index(key)
+
+        return FakeChannel(self.photoshop, self.document, key, channel_names[key])
+
+    def get_count(self):
+        return len(self.document.planes)
+
+    def com_add(self):
+        plane = numpy.zeros_like(self.document.planes[0])
+        self.document.planes.append(plane)
+
+        channel = FakeChannel(
+            self.photoshop, self.document, len(self.document.planes) - 1,
+            self.channel_names()[-1])
+
+        # a new channel becomes the active channel
+        self.document.active_channels = [channel]
+
+        return channel
+
+
+class FakeChannel(FakeComObject):
+    """
+    Fake Channel, a reference to one plane of a document.
+    """
+
+    com_properties = frozenset(['name'])
+
+    def __init__(self, photoshop, document, plane_index, channel_name):
+        super(FakeChannel, self).__init__(photoshop)
+        self.document = document
+        self.plane_index = plane_index
+        self.channel_name = channel_name
+
+    def get_name(self):
+        return self.channel_name
+
+
+class FakeSelection(FakeComObject):
+    """
+    Fake Selection, selecting is a no-op since every copy is of the whole
+    layer.
+    """
+
+    com_methods = frozenset(['selectall'])
+
+    def com_selectall(self):
+        pass
+
+
+class FakeLayer(FakeComObject):
+    """
+    Fake ArtLayer that copies the composite of its document.
+    """
+
+    com_methods = frozenset(['copy'])
+
+    def __init__(self, photoshop, document):
+        super(FakeLayer, self).__init__(photoshop)
+        self.document = document
+
+    def com_copy(self):
+        self.photoshop.clipboard = self.document.composite_image()
+
+
+class FakeSaveOptions(FakeComObject):
+    """
+    Fake TargaSaveOptions, JPEGSaveOptions or PNGSaveOptions.
+    """
+
+    com_properties = frozenset([
+        'resolution', 'alphachannels', 'rlecompression', 'quality'])
+
+    def __init__(self, photoshop, file_extension):
+        super(FakeSaveOptions, self).__init__(photoshop)
+        self.file_extension = file_extension
+        self.values = {}
+
+    def __getattr__(self, name):
+        member = name.lower()
+
+        if member in FakeSaveOptions.com_properties:
+            self.photoshop.record_call(self, member)
+            return self.values.get(member)
+
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        member = name.lower()
+
+        if member in FakeSaveOptions.com_properties:
+            self.photoshop.record_call(self, member)
+            self.values[member] = value
+        else:
+            object.__setattr__(self, name, value)
+
+
+class FakeActionDescriptor(FakeComObject):
+    """
+    Fake ActionDescriptor storing its values by key.
+    """
+
+    com_methods = frozenset(['putreference', 'putobject', 'putenumerated'])
+
+    def __init__(self, photoshop):
+        super(FakeActionDescriptor, self).__init__(photoshop)
+        self.values = {}
+
+    def com_putreference(self, key, reference):
+        self.values[key] = reference
+
+    def com_putobject(self, key, class_id, descriptor):
+        self.values[key] = descriptor
+
+    def com_putenumerated(self, key, enum_type, value):
+        self.values[key] = value
+
+
+class FakeActionReference(FakeComObject):
+    """
+    Fake ActionReference to a channel of a document.
+    """
+
+    com_methods = frozenset(['putenumerated', 'putname'])
+
+    def __init__(self, photoshop):
+        super(FakeActionReference, self).__init__(photoshop)
+        self.document_name = None
+        self.channel_id = None
+
+    def com_putenumerated(self, desired_class, enum_type, value):
+        self.channel_id = value
+
+    def com_putname(self, desired_class, name):
+        self.document_name = name
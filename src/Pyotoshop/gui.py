@@ -23,24 +23,26 @@
 # =============================================================================
 """
 
-import os
 import sys
-import platform
-import scandir
-import comtypes.client
-
-from PIL import Image
 
 from Qt import QtGui, QtCore, QtWidgets
 
+from .core import PACK_STRATEGIES, Pyotoshop
+from .resultsview import ResultsWindow
+from .startup import mark_startup, report_startup
+from .workers import GuiDispatcher, ProgressProxy, TaskThread, on_gui_thread
+
 # Global Variables ------------------------------------------------------------
 EXTENSIONS = ('.tga', '.png', '.jpg')
 TEXTURE_SIZES = (4096, 2048, 1024, 512, 256, 128, 64)
 
 
-class Main(QtGui.QMainWindow):
+class Main(QtGui.QMainWindow, Pyotoshop):
     """
     The class that contains, defines, and creates the UI.
+
+    Searching, resizing and packing run on self.task_thread so the window
+    stays responsive, popups they open are shown on the GUI thread.
     """
 
     def __init__(self, parent=None):
@@ -52,6 +54,22 @@ class Main(QtGui.QMainWindow):
         """
 
         super(Main, self).__init__(parent)
+
+        self.gui_dispatcher = GuiDispatcher(self)
+
+        # progress of the running task, canceled when the window closes
+        self.progress_proxy = None
+
+        # widgets disabled while a task runs
+        self.task_widgets = []
+
+        self.task_thread = TaskThread(self)
+        self.task_thread.task_finished.connect(self.task_finished)
+        self.task_thread.task_failed.connect(self.task_failed)
+        self.task_thread.finished.connect(self.task_thread_finished)
+        self.task_thread_done = False
+        self.task_thread.start()
+
         self.create_ui()
 
     def create_ui(self):
@@ -206,6 +224,19 @@ class Main(QtGui.QMainWindow):
             'Enter suffix to add to the created packed texture')
         self.packed_texture_le.setFixedWidth(110)
 
+        # how the Photoshop pack backends fill the channels
+        self.pack_strategy_combobox = QtWidgets.QComboBox()
+        self.pack_strategy_combobox.setFixedWidth(110)
+        self.pack_strategy_combobox.setToolTip(
+            'clipboard copies and pastes each source, applyimage applies ' +
+            'each source to its channel with Apply Image')
+
+        for strategy in PACK_STRATEGIES:
+            self.pack_strategy_combobox.addItem(strategy)
+
+        self.pack_strategy_combobox.setCurrentIndex(
+            PACK_STRATEGIES.index(self.photoshop_pack_strategy))
+
         # Output texture_pack_btn_layout,
         # child of input_channel_formlayout -----------------------------------
         texture_pack_btn_layout = QtWidgets.QHBoxLayout()
@@ -249,6 +280,8 @@ class Main(QtGui.QMainWindow):
         input_channel_formlayout.addRow(output_format_lbl)
         input_channel_formlayout.addRow(
             QtWidgets.QLabel('Packed Texture'), self.packed_texture_le)
+        input_channel_formlayout.addRow(
+            QtWidgets.QLabel('Photoshop Method'), self.pack_strategy_combobox)
 
         input_channel_formlayout.addRow(texture_pack_btn_layout)
 
@@ -293,6 +326,8 @@ class Main(QtGui.QMainWindow):
         central_widget.layout().addWidget(directory_lbl)
         central_widget.layout().addWidget(texture_tools_tab_widget)
 
+        self.task_widgets = [add_directory_btn, texture_tools_tab_widget]
+
         # sets central widget for PyQt window
         self.setCentralWidget(central_widget)
         self.setFixedSize(self.sizeHint())
@@ -306,10 +341,16 @@ class Main(QtGui.QMainWindow):
             lambda: self.get_directory(directory_lbl, texture_tools_tab_widget))
 
         resize_textures_btn.clicked.connect(
-            lambda: self.parse_texture_to_resize(str(directory_lbl.text())))
+            lambda: self.start_task(
+                self.parse_texture_to_resize, str(directory_lbl.text())))
 
         pack_textures_btn.clicked.connect(
-            lambda: self.parse_texture_dirs_to_pack(str(directory_lbl.text())))
+            lambda: self.start_task(
+                self.parse_texture_dirs_to_pack, str(directory_lbl.text())))
+
+        self.pack_strategy_combobox.currentIndexChanged.connect(
+            lambda index: setattr(
+                self, 'photoshop_pack_strategy', PACK_STRATEGIES[index]))
 
         self.a_channel_checkbox.toggled.connect(
             lambda: self.toggle_alpha_input(
@@ -317,6 +358,81 @@ class Main(QtGui.QMainWindow):
             )
         )
 
+    def start_task(self, function, *args):
+        """Runs a task on the worker thread.
+
+        The directory and texture tool widgets are disabled until the task
+        is done, the line edits and combobox read by the task can not change
+        while it runs.
+
+        Arguments:
+            function (callable): task to run, such as
+                self.parse_texture_to_resize
+        """
+
+        for widget in self.task_widgets:
+            widget.setEnabled(False)
+
+        self.task_thread.submit(function, *args)
+
+    @QtCore.Slot()
+    def task_finished(self):
+        """Enables the widgets disabled by start_task."""
+
+        for widget in self.task_widgets:
+            widget.setEnabled(True)
+
+    @QtCore.Slot(str)
+    def task_failed(self, error):
+        """Reports an exception raised by a task.
+
+        Arguments:
+            error (string): traceback of the exception
+        """
+
+        self.popup_detailed_ok_window(error)
+
+    def closeEvent(self, event):  # pylint: disable = C0103
+        """Cancels the running task and closes once the task thread ends.
+
+        The GUI thread does not wait for the task thread, a task waiting on
+        a popup would never resume. The close is ignored until the thread
+        emits finished, which closes the window again.
+
+        Arguments:
+            event (QCloseEvent): close event of the window
+        """
+
+        if not self.task_thread_done:
+            event.ignore()
+
+            if not self.gui_dispatcher.closing.is_set():
+                self.gui_dispatcher.close()
+
+                if self.progress_proxy is not None:
+                    self.progress_proxy.cancel()
+
+                self.setEnabled(False)
+                self.task_thread.stop()
+
+            return
+
+        # run has returned, only the end of the thread is left
+        self.task_thread.wait()
+
+        # a task ended by TaskCanceled leaves its progress dialog open
+        if self.progress_proxy is not None:
+            self.progress_proxy.progress_dialog.close()
+
+        super(Main, self).closeEvent(event)
+
+    @QtCore.Slot()
+    def task_thread_finished(self):
+        """Closes the window the task thread was stopped for."""
+
+        self.task_thread_done = True
+        self.close()
+
     @classmethod
     def get_directory(cls, directory_lbl, tab_widget):
         """Create popup file browser and stores path.
@@ -357,8 +473,8 @@ class Main(QtGui.QMainWindow):
             line_edit.setEnabled(False)
             label_text.setText('- Packed Texture Format - 24 bit .tga -')
 
-    @classmethod
-    def popup_detailed_ok_window(cls, message):
+    @on_gui_thread
+    def popup_detailed_ok_window(self, message):
         """Generic popup window with an OK button and displays message.
         Generates QMessageBox with OK button. Used for a detailed notification.
 
@@ -375,8 +491,21 @@ class Main(QtGui.QMainWindow):
 
         popup_window.exec_()
 
-    @classmethod
-    def popup_progress_window(cls, window_title, progress_length):
+    @on_gui_thread
+    def popup_results_window(self, result_records):
+        """Shows the results of the resize analysis in a table.
+        The window is not modal, so the task continues while it is open.
+
+        Arguments:
+            result_records {list} -- results.ResultRecord of each texture
+        """
+
+        self.results_window = ResultsWindow(
+            result_records, self, self.open_thumbnail_cache)
+        self.results_window.show()
+
+    @on_gui_thread
+    def popup_progress_window(self, window_title, progress_length):
         """Popup QProgressDialog to display operation progress.
 
         The progress_length parameter is the length of the input list or
@@ -389,8 +518,9 @@ class Main(QtGui.QMainWindow):
             progress_length {int} -- Input integer that sets the size of the QProgressDialog
 
         Returns:
-            QProgressDialog -- Returns the QProgressDialog so that it can be
-                                accessed elsewhere.
+            ProgressProxy -- Returns a proxy of the QProgressDialog that the
+                                worker thread can update and check for
+                                cancellation.
         """
 
         # Creates the QProgressDialog Window
@@ -405,10 +535,12 @@ class Main(QtGui.QMainWindow):
         # Show window
         progress_dialog.show()
 
-        return progress_dialog
+        self.progress_proxy = ProgressProxy(progress_dialog)
 
-    @classmethod
-    def popup_ok_window(cls, message):
+        return self.progress_proxy
+
+    @on_gui_thread
+    def popup_ok_window(self, message):
         """Generic popup window with an OK button and displays message
         Generates QMessageBox with OK button. Used as a simple notification.
 
@@ -422,16 +554,33 @@ class Main(QtGui.QMainWindow):
 
         popup_window.exec_()
 
-    @classmethod
-    def close_photoshop(cls, message, ps_app):
+    def close_photoshop(self, message, ps_app):
         """Popup to ask user if they would want to close Photoshop
-        Generates QMessageBox with yes and no buttons.
         If yes button is clicked close Photoshop
 
+        Photoshop is quit from the calling thread, which owns the COM
+        connection, after the question is answered on the GUI thread.
+
         Arguments:
+            message {string} -- string to be generated in popup
             ps_app {com_object} -- Gets current Photoshop instance
         """
 
+        if self.ask_close_photoshop(message):
+            ps_app.Quit()
+
+    @on_gui_thread
+    def ask_close_photoshop(self, message):
+        """Popup to ask user if they would want to close Photoshop
+        Generates QMessageBox with yes and no buttons.
+
+        Arguments:
+            message {string} -- string to be generated in popup
+
+        Returns:
+            bool -- True if the yes button was clicked
+        """
+
         popup_window = QtWidgets.QMessageBox()
 
         popup_message = message + '\n' + 'Close Photoshop?'
@@ -444,12 +593,30 @@ class Main(QtGui.QMainWindow):
 
         result = popup_window.exec_()
 
-        if result == QtWidgets.QMessageBox.Yes:
-            ps_app.Quit()
+        return result == QtWidgets.QMessageBox.Yes
+
+
+def main():
+    """Shows the Pyotoshop window and runs the Qt event loop.
+
+    NumPy, Pillow and comtypes are not imported until a task needs them,
+    so the window is shown before any image library is loaded.
+
+    Returns:
+        int -- exit code of the event loop
+    """
 
-if __name__ == '__main__':
     app = QtWidgets.QApplication(sys.argv) # create an application object
     my_widget = Main()
     my_widget.show()
 
-sys.exit(app.exec_()) # informs environment that widget was destroyed
+    mark_startup('window shown')
+
+    # reported once the event loop has painted the window
+    QtCore.QTimer.singleShot(0, report_startup)
+
+    return app.exec_() # informs environment that widget was destroyed
+
+
+if __name__ == '__main__':
+    sys.exit(main())
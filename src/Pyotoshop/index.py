@@ -0,0 +1,346 @@
+"""Persistent on disk index of texture metadata."""
+
+import os
+import sys
+import hashlib
+import sqlite3
+import collections
+
+from .probe import probe_image
+
+# Global Variables ------------------------------------------------------------
+INDEX_FILE_NAME = 'texture_index.db'
+
+# bumped whenever the table layout or the probed values change, older
+# indexes are rebuilt
+INDEX_VERSION = 3
+
+# number of bytes read from the start and end of a file for its fingerprint
+FINGERPRINT_SAMPLE_SIZE = 512
+
+# number of records written before the pending transaction is committed
+COMMIT_INTERVAL = 500
+
+# number of paths looked up by each query of find_many, below the SQLite
+# limit of 999 bound parameters
+FIND_BATCH_SIZE = 500
+
+TextureRecord = collections.namedtuple(
+    'TextureRecord',
+    ['path', 'mtime', 'size', 'width', 'height', 'bit_depth', 'has_alpha',
+     'mode', 'channels', 'fingerprint'])
+
+
+class TextureIndex(object):
+    """
+    SQLite backed cache of texture metadata keyed by file path.
+
+    Each record stores the width, height, bit depth, alpha presence, mode,
+    channel count and a content fingerprint of a texture along with the
+    mtime and size the file had when it was read. As long as the mtime and
+    size are unchanged the stored record is returned without opening the
+    image, so repeat analysis of an unchanged tree only needs the stat data
+    gathered by the directory walk.
+
+    Paths are stored normalized by index_key, so a texture reached through
+    a relative path or with a different case on Windows shares one record.
+    Records are returned with the path they were looked up with.
+    """
+
+    def __init__(self, db_path=None):
+        """Opens or creates the index database.
+
+        Keyword Arguments:
+            db_path (string): Location of the database file
+                (default: {None} uses default_db_path)
+        """
+
+        super(TextureIndex, self).__init__()
+
+        if db_path is None:
+            db_path = self.default_db_path()
+
+        db_dir = os.path.dirname(db_path)
+
+        if db_dir and not os.path.isdir(db_dir):
+            os.makedirs(db_dir)
+
+        self.db_path = db_path
+        self.pending_writes = 0
+
+        self.connection = sqlite3.connect(db_path)
+
+        # the index only caches data read from the textures, so an index
+        # written with a different layout is simply dropped and rebuilt
+        db_version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+
+        if db_version != INDEX_VERSION:
+            self.connection.execute('DROP TABLE IF EXISTS textures')
+            self.connection.execute(
+                'PRAGMA user_version = {0}'.format(INDEX_VERSION))
+
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS textures ('
+            'path TEXT PRIMARY KEY, mtime REAL, size INTEGER, '
+            'width INTEGER, height INTEGER, bit_depth INTEGER, '
+            'has_alpha INTEGER, mode TEXT, channels INTEGER, '
+            'fingerprint TEXT)')
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    @classmethod
+    def default_db_path(cls):
+        """Determines the per user cache location of the index database.
+
+        Returns:
+            string -- path to the database file
+        """
+
+        if sys.platform.startswith('win'):
+            cache_root = os.environ.get(
+                'LOCALAPPDATA', os.path.expanduser('~\\AppData\\Local'))
+        else:
+            cache_root = os.environ.get(
+                'XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+
+        return os.path.join(cache_root, 'Pyotoshop', INDEX_FILE_NAME)
+
+    @classmethod
+    def index_key(cls, path):
+        """Normalizes a path into the key its record is stored under.
+
+        Arguments:
+            path (string): path of the texture
+
+        Returns:
+            string -- absolute path, lower case on Windows
+        """
+
+        return os.path.normcase(os.path.abspath(path))
+
+    def lookup(self, file_entry):
+        """Gets the metadata of a texture, reading the file only if needed.
+
+        The stat data of the DirEntry is compared to the stored record and
+        the texture is only read when it is new or has changed.
+
+        Arguments:
+            file_entry (scandir.DirEntry): texture file found by the walk
+
+        Returns:
+            TextureRecord -- up to date metadata of the texture
+        """
+
+        stat_result = file_entry.stat()
+
+        return self.lookup_path(
+            file_entry.path, stat_result.st_mtime, stat_result.st_size)
+
+    def lookup_path(self, path, mtime=None, size=None):
+        """Gets the metadata of a texture from its path.
+
+        Arguments:
+            path (string): path of the texture
+
+        Keyword Arguments:
+            mtime (float): modification time of the file, stat'ed when None
+                (default: {None})
+            size (int): size of the file in bytes, stat'ed when None
+                (default: {None})
+
+        Returns:
+            TextureRecord -- up to date metadata of the texture
+        """
+
+        if mtime is None or size is None:
+            stat_result = os.stat(path)
+            mtime = stat_result.st_mtime
+            size = stat_result.st_size
+
+        record = self.find(path)
+
+        if record and record.mtime == mtime and record.size == size:
+            return record
+
+        record = self.read_texture(path, mtime, size)
+        self.store(record)
+
+        return record
+
+    def partition(self, file_entries):
+        """Splits textures into those with a current record and stale ones.
+
+        Used to hand only the stale textures to a worker pool, their records
+        are then added with store once they have been read.
+
+        Arguments:
+            file_entries (list): scandir.DirEntry texture files
+
+        Returns:
+            tuple -- dictionary of path to current TextureRecord and a list
+                of (path, mtime, size) tuples of textures that need reading
+        """
+
+        current_records = {}
+        stale_textures = []
+
+        for file_entry in file_entries:
+            stat_result = file_entry.stat()
+            mtime = stat_result.st_mtime
+            size = stat_result.st_size
+
+            record = self.find(file_entry.path)
+
+            if record and record.mtime == mtime and record.size == size:
+                current_records[file_entry.path] = record
+            else:
+                stale_textures.append((file_entry.path, mtime, size))
+
+        return current_records, stale_textures
+
+    def find(self, path):
+        """Gets the stored record of a path without checking if it is stale.
+
+        Arguments:
+            path (string): path of the texture
+
+        Returns:
+            TextureRecord -- stored record or None if the path is not indexed
+        """
+
+        row = self.connection.execute(
+            'SELECT path, mtime, size, width, height, bit_depth, has_alpha, '
+            'mode, channels, fingerprint FROM textures WHERE path = ?',
+            (self.index_key(path),)).fetchone()
+
+        if row:
+            record = TextureRecord(*row)
+            return record._replace(
+                path=path, has_alpha=bool(record.has_alpha))
+
+        return None
+
+    def find_many(self, paths):
+        """Gets the stored records of many paths with batched queries.
+
+        Arguments:
+            paths (list): paths of the textures
+
+        Returns:
+            dict -- {path: TextureRecord} of the indexed paths
+        """
+
+        records = {}
+
+        # paths given with different spellings of the same key
+        key_paths = collections.defaultdict(list)
+
+        for path in paths:
+            key_paths[self.index_key(path)].append(path)
+
+        keys = list(key_paths)
+
+        for batch_start in range(0, len(keys), FIND_BATCH_SIZE):
+            batch_keys = keys[batch_start:batch_start + FIND_BATCH_SIZE]
+
+            rows = self.connection.execute(
+                'SELECT path, mtime, size, width, height, bit_depth, has_alpha, '
+                'mode, channels, fingerprint FROM textures WHERE path IN '
+                '({0})'.format(', '.join('?' * len(batch_keys))),
+                batch_keys)
+
+            for row in rows:
+                record = TextureRecord(*row)
+
+                for path in key_paths[record.path]:
+                    records[path] = record._replace(
+                        path=path, has_alpha=bool(record.has_alpha))
+
+        return records
+
+    def store(self, record):
+        """Adds or replaces the record of a texture.
+
+        Writes are grouped into transactions of COMMIT_INTERVAL records.
+
+        Arguments:
+            record (TextureRecord): metadata to store
+        """
+
+        self.connection.execute(
+            'INSERT OR REPLACE INTO textures VALUES '
+            '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            record._replace(path=self.index_key(record.path)))
+
+        self.pending_writes += 1
+
+        if self.pending_writes >= COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        """Commits any pending writes to disk."""
+
+        self.connection.commit()
+        self.pending_writes = 0
+
+    def close(self):
+        """Commits pending writes and closes the database."""
+
+        self.commit()
+        self.connection.close()
+
+    @classmethod
+    def read_texture(cls, path, mtime, size):
+        """Reads the metadata of a texture from the file itself.
+
+        Arguments:
+            path (string): path of the texture
+            mtime (float): modification time of the file
+            size (int): size of the file in bytes
+
+        Returns:
+            TextureRecord -- metadata read from the file
+        """
+
+        # only the header of the texture is read
+        image_info = probe_image(path)
+
+        return TextureRecord(
+            path, mtime, size, image_info.width, image_info.height,
+            image_info.bit_depth, image_info.has_alpha, image_info.mode,
+            image_info.channels, cls.fingerprint(path, size))
+
+    @classmethod
+    def fingerprint(cls, path, size):
+        """Creates a quick content fingerprint of a file.
+
+        Only the file size and the first and last FINGERPRINT_SAMPLE_SIZE
+        bytes are hashed, which covers the header and footer of a texture
+        without reading the pixel data. Changes are primarily detected
+        through the mtime and size of the file.
+
+        Arguments:
+            path (string): path of the file
+            size (int): size of the file in bytes
+
+        Returns:
+            string -- hex digest of the sampled content
+        """
+
+        digest = hashlib.sha1(str(size).encode('ascii'))
+
+        with open(path, 'rb') as file_handle:
+            digest.update(file_handle.read(FINGERPRINT_SAMPLE_SIZE))
+
+            if size > FINGERPRINT_SAMPLE_SIZE * 2:
+                file_handle.seek(-FINGERPRINT_SAMPLE_SIZE, os.SEEK_END)
+                digest.update(file_handle.read(FINGERPRINT_SAMPLE_SIZE))
+            else:
+                digest.update(file_handle.read())
+
+        return digest.hexdigest()
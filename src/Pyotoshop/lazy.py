@@ -0,0 +1,85 @@
+"""Heavy modules imported the first time one of their attributes is used."""
+
+import sys
+import types
+import threading
+
+# Global Variables ------------------------------------------------------------
+# Pillow plugins of the formats in core.EXTENSIONS. Pillow loads its few
+# common plugins on first use and every other plugin the first time a
+# file is not recognized by them, which TGA files are not, so these are
+# registered up front instead.
+PIL_PLUGINS = ('PIL.PngImagePlugin', 'PIL.JpegImagePlugin', 'PIL.TgaImagePlugin')
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand in for a module that imports it on first attribute access.
+
+    Once imported, the attributes of the module are copied onto the stand
+    in, so later lookups cost the same as on the module itself. Its own
+    attributes start with lazy so they do not hide those of the module.
+    Modules importing NumPy and Pillow through it can be loaded, by the
+    window or the command line, without paying for those imports until an
+    image is touched.
+    """
+
+    def __init__(self, module_name, setup=None):
+        """Creates the stand in, nothing is imported yet.
+
+        Arguments:
+            module_name (string): full name of the module, such as
+                'PIL.Image'
+
+        Keyword Arguments:
+            setup (callable): called with the module once it is imported
+                (default: {None})
+        """
+
+        super(LazyModule, self).__init__(module_name)
+
+        self.__dict__['lazy_setup'] = setup
+        self.__dict__['lazy_lock'] = threading.Lock()
+        self.__dict__['lazy_module'] = None
+
+    def __getattr__(self, attribute):
+        # only called for attributes missing from the stand in, which are
+        # all the attributes of the module until it is imported
+        return getattr(self.lazy_load(), attribute)
+
+    def lazy_load(self):
+        """Imports the module if it is not imported yet.
+
+        Returns:
+            module -- the imported module
+        """
+
+        with self.lazy_lock:
+            if self.lazy_module is None:
+                # through __import__ so the startup profiler times it
+                __import__(self.__name__)
+                module = sys.modules[self.__name__]
+
+                if self.lazy_setup is not None:
+                    self.lazy_setup(module)
+
+                self.__dict__.update(module.__dict__)
+                self.__dict__['lazy_module'] = module
+
+        return self.lazy_module
+
+
+def load_pil_plugins(image_module):  # pylint: disable = W0613
+    """Registers the Pillow plugins of the texture formats.
+
+    Arguments:
+        image_module (module): PIL.Image
+    """
+
+    for plugin_name in PIL_PLUGINS:
+        __import__(plugin_name)
+
+
+numpy = LazyModule('numpy')
+
+Image = LazyModule('PIL.Image', load_pil_plugins)
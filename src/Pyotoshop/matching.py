@@ -0,0 +1,101 @@
+"""Single pass matching of texture files to channel suffixes."""
+
+import re
+import os
+import collections
+
+
+class SuffixMatcher(object):
+    """
+    Matches file names against the source suffixes of texture packing.
+
+    Every suffix is compiled into one alternation, so a file name is tested
+    against all sources with a single regular expression match. The base
+    name before the suffix is matched lazily, which makes the longest
+    suffix win when one suffix ends with another.
+    """
+
+    def __init__(self, source_suffixes, extensions):
+        """Compiles the suffixes of each source.
+
+        Arguments:
+            source_suffixes (sequence): (key, suffix) pairs where key names
+                the source a match is reported as, keys with an empty suffix
+                are skipped
+            extensions (tuple): lower case file extensions that are matched
+        """
+
+        super(SuffixMatcher, self).__init__()
+
+        self.extensions = extensions
+        self.source_keys = []
+        suffix_patterns = []
+
+        for source_key, suffix in source_suffixes:
+            if suffix:
+                self.source_keys.append(source_key)
+                suffix_patterns.append('({0})'.format(re.escape(suffix)))
+
+        self.pattern = re.compile(
+            r'(.*?)(?:{0})\Z'.format('|'.join(suffix_patterns)), re.DOTALL)
+
+    def match(self, file_name):
+        """Finds the source key a file name belongs to.
+
+        Arguments:
+            file_name (string): name of the texture file
+
+        Returns:
+            tuple -- (base name, key), or None if the file has no
+                matching extension or suffix
+        """
+
+        stem, file_extension = os.path.splitext(file_name)
+
+        if not self.source_keys or file_extension.lower() not in self.extensions:
+            return None
+
+        suffix_match = self.pattern.match(stem)
+
+        if suffix_match is None:
+            return None
+
+        # group 1 is the base name, the rest are the suffixes in order
+        return suffix_match.group(1), self.source_keys[suffix_match.lastindex - 2]
+
+    def group(self, dir_files, group_key=None):
+        """Groups the files of a directory into sets of sources.
+
+        Arguments:
+            dir_files (iterable): scandir.DirEntry texture files
+
+        Keyword Arguments:
+            group_key (callable): returns the group a file path is put
+                under, files are grouped by the base name before the suffix
+                when None (default: {None})
+
+        Returns:
+            collections.OrderedDict -- {group: {key: path}} in the order
+                the groups were first found, the first file found for a
+                key is kept
+        """
+
+        source_sets = collections.OrderedDict()
+
+        for file_entry in dir_files:
+            file_match = self.match(file_entry.name)
+
+            if file_match is None:
+                continue
+
+            base_name, source_key = file_match
+
+            if group_key is not None:
+                base_name = group_key(file_entry.path)
+
+            source_set = source_sets.setdefault(base_name, {})
+
+            if source_key not in source_set:
+                source_set[source_key] = file_entry.path
+
+        return source_sets
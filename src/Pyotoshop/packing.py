@@ -0,0 +1,341 @@
+"""In memory channel packing with NumPy."""
+
+import os
+import json
+import collections
+
+from .lazy import Image, numpy
+from .cache import decoded_image_cache
+from .tga import TgaError, TgaMemmap, write_tga
+
+# Global Variables ------------------------------------------------------------
+# index of each band in a top down rgb view
+RGB_BAND_INDEXES = {'R': 0, 'G': 1, 'B': 2}
+
+# packed texture path, the red, green, blue and alpha source paths, an
+# empty alpha path is skipped, and the band packed from each source, see
+# PackPreset
+PackJob = collections.namedtuple(
+    'PackJob', ['file_name', 'channel_paths', 'source_channels'])
+
+# channel layout of a packed texture, channel_suffixes holds the source
+# suffix of the red, green, blue and alpha channels, an empty alpha suffix
+# packs a 24 bit texture. source_channels holds the band packed from each
+# source, 'R', 'G', 'B' or 'A', or None for its luminance.
+PackPreset = collections.namedtuple(
+    'PackPreset', ['name', 'packed_suffix', 'channel_suffixes',
+                   'source_channels'])
+
+# keys of the channels of a preset in a presets file
+PRESET_CHANNELS = ('Red', 'Green', 'Blue', 'Alpha')
+
+# source bands of a presets file, 'L' is the luminance
+SOURCE_CHANNELS = ('R', 'G', 'B', 'A', 'L')
+
+# every source of a preset packed as its luminance
+LUMINANCE_CHANNELS = (None, None, None, None)
+
+# most pixels of a mapped TGA copied at a time to be converted to luminance
+LUMINANCE_STRIP_PIXELS = 1024 * 1024
+
+
+def load_channel(texture_path, source_channel=None, size=None):
+    """Decodes a texture into a single 8 bit channel.
+
+    The luminance is Pillow's convert('L'), which is close to, but not
+    exactly, the gray Photoshop pastes into a single channel.
+
+    Arguments:
+        texture_path (string): path of the source texture
+
+    Keyword Arguments:
+        source_channel (string): band of the source to extract ('R', 'G',
+            'B' or 'A'), the luminance of the texture is used when None
+            (default: {None})
+        size (tuple): (width, height) the channel is resized to if the
+            source has a different resolution (default: {None})
+
+    Returns:
+        numpy.ndarray -- 2D uint8 array of the channel
+    """
+
+    channel = None
+
+    if texture_path.lower().endswith('.tga'):
+        channel = load_tga_channel(texture_path, source_channel)
+
+    if channel is None:
+        # decoded images are shared with the resize step
+        image = decoded_image_cache().load(texture_path)
+
+        if source_channel is None:
+            channel = numpy.asarray(image.convert('L'))
+        else:
+            channel = numpy.asarray(
+                image.convert('RGBA').getchannel(source_channel))
+
+    return resize_channel(channel, size)
+
+
+def resize_channel(channel, size):
+    """Resizes a channel with Pillow's bicubic filter if its size differs.
+
+    Arguments:
+        channel (numpy.ndarray): 2D uint8 array of the channel
+        size (tuple): (width, height) to resize to, None keeps the channel
+
+    Returns:
+        numpy.ndarray -- 2D uint8 array of the requested size
+    """
+
+    if size is not None and (channel.shape[1], channel.shape[0]) != tuple(size):
+        channel = numpy.asarray(
+            Image.fromarray(numpy.ascontiguousarray(channel)).resize(
+                tuple(size), Image.BICUBIC))
+
+    return channel
+
+
+def load_tga_channel(texture_path, source_channel=None):
+    """Reads a channel of an uncompressed TGA through a memory map.
+
+    The mapping is closed before returning, so the channel is copied out of
+    it, a single band in one pass over the mapped file. The luminance is
+    converted by Pillow itself rather than with NumPy weights, its rounding
+    has changed between versions and the result must match load_channel for
+    every other source. Pillow needs contiguous RGB pixels, which the
+    mapped BGR rows are not, so the image is converted in strips of at most
+    LUMINANCE_STRIP_PIXELS instead of being copied whole.
+
+    Arguments:
+        texture_path (string): path of the source texture
+
+    Keyword Arguments:
+        source_channel (string): band to extract, see load_channel
+            (default: {None})
+
+    Returns:
+        numpy.ndarray -- 2D uint8 array of the channel, or None if the TGA
+            is compressed or not true color
+    """
+
+    try:
+        source = TgaMemmap(texture_path)
+    except TgaError:
+        return None
+
+    with source:
+        if source_channel is None:
+            return rgb_luminance(source.rgb)
+
+        elif source_channel == 'A':
+            if source.alpha is None:
+                return numpy.full(source.rgb.shape[:2], 255, numpy.uint8)
+
+            return numpy.array(source.alpha)
+
+        return numpy.array(source.rgb[..., RGB_BAND_INDEXES[source_channel]])
+
+
+def rgb_luminance(rgb):
+    """Converts RGB pixels to luminance with Pillow, a strip at a time.
+
+    Arguments:
+        rgb (numpy.ndarray): uint8 array of shape (rows, columns, 3), which
+            may be a strided view such as TgaMemmap.rgb
+
+    Returns:
+        numpy.ndarray -- 2D uint8 array of the luminance
+    """
+
+    channel = numpy.empty(rgb.shape[:2], numpy.uint8)
+    strip_rows = max(1, LUMINANCE_STRIP_PIXELS // max(1, rgb.shape[1]))
+
+    for strip_start in range(0, rgb.shape[0], strip_rows):
+        strip = numpy.ascontiguousarray(
+            rgb[strip_start:strip_start + strip_rows])
+
+        channel[strip_start:strip_start + strip_rows] = numpy.asarray(
+            Image.fromarray(strip).convert('L'))
+
+    return channel
+
+
+def load_pack_presets(presets_path):
+    """Reads packing presets from a JSON file.
+
+    The file holds a list of presets such as
+    {"name": "ORM", "packed_suffix": "_ORM",
+     "channels": {"Red": "_AO", "Green": "_Roughness", "Blue": "_Metallic"},
+     "source_channels": {"Green": "G"}}
+    where Alpha is optional. source_channels is optional too, it picks the
+    band packed from the source of a channel, 'R', 'G', 'B', 'A' or 'L'
+    for the luminance, which is used for the channels it leaves out.
+
+    Arguments:
+        presets_path (string): path of the JSON file
+
+    Returns:
+        list -- PackPreset for each preset in the file
+    """
+
+    with open(presets_path) as presets_file:
+        preset_entries = json.load(presets_file)
+
+    pack_presets = []
+
+    for preset_entry in preset_entries:
+        channels = preset_entry['channels']
+
+        for channel in PRESET_CHANNELS[:3]:
+            if not channels.get(channel):
+                raise ValueError('Preset {0} has no suffix for {1}'.format(
+                    preset_entry['name'], channel))
+
+        source_channels = preset_entry.get('source_channels', {})
+
+        for channel, source_channel in source_channels.items():
+            if channel not in PRESET_CHANNELS or \
+                    source_channel not in SOURCE_CHANNELS:
+                raise ValueError(
+                    'Preset {0} has an invalid source channel {1}: {2}'.format(
+                        preset_entry['name'], channel, source_channel))
+
+        pack_presets.append(PackPreset(
+            str(preset_entry['name']), str(preset_entry['packed_suffix']),
+            tuple(str(channels.get(channel, '')) for channel in PRESET_CHANNELS),
+            tuple(
+                None if source_channels.get(channel, 'L') == 'L'
+                else str(source_channels[channel])
+                for channel in PRESET_CHANNELS)))
+
+    return pack_presets
+
+
+def packed_file_name(file_name):
+    """Replaces the extension of a packed texture path with .tga.
+
+    Arguments:
+        file_name (string): path generated by Pyotoshop.new_file_name
+
+    Returns:
+        string -- path of the tga file
+    """
+
+    return os.path.splitext(file_name)[0] + '.tga'
+
+
+def pack_channels(channel_paths, file_name, source_channels=None, rle=False,
+                  channel_cache=None):
+    """Packs up to four textures into the RGBA channels of a new TGA.
+
+    The red source sets the resolution of the packed texture, other sources
+    are resized to match. Like save_tga, the TGA is written uncompressed as
+    32 bit when an alpha source is given and as 24 bit otherwise. Channels
+    are copied straight into a memory mapped output file, so the packed
+    image is never assembled or encoded separately, unless it is RLE
+    compressed.
+
+    Arguments:
+        channel_paths (sequence): paths of the red, green, blue and optional
+            alpha sources, an empty alpha path is skipped
+        file_name (string): path of the packed texture, the extension is
+            replaced with .tga
+
+    Keyword Arguments:
+        source_channels (sequence): band to extract from each source, see
+            load_channel, luminance is used for every source when None
+            (default: {None})
+        rle (bool): RLE compress the packed TGA (default: {False})
+        channel_cache (dict): decoded channels shared between calls that
+            pack the same sources, keyed by path and band (default: {None})
+
+    Returns:
+        string -- path of the written tga file
+    """
+
+    if source_channels is None:
+        source_channels = LUMINANCE_CHANNELS
+
+    channels = []
+    size = None
+
+    for texture_path, source_channel in zip(channel_paths, source_channels):
+        if not texture_path:
+            continue
+
+        cache_key = (texture_path, source_channel)
+
+        if channel_cache is None:
+            channel = load_channel(texture_path, source_channel, size)
+        else:
+            # sources are cached at their own resolution, so a source used
+            # as red in one preset and green in another is decoded once
+            if cache_key not in channel_cache:
+                channel_cache[cache_key] = load_channel(
+                    texture_path, source_channel)
+
+            channel = resize_channel(channel_cache[cache_key], size)
+
+        # first channel decides the resolution of the packed texture
+        if size is None:
+            size = (channel.shape[1], channel.shape[0])
+
+        channels.append(channel)
+
+    tga_file = packed_file_name(file_name)
+    height, width = channels[0].shape
+
+    if rle:
+        rgb = numpy.empty((height, width, 3), numpy.uint8)
+
+        for band_index, channel in enumerate(channels[:3]):
+            rgb[..., band_index] = channel
+
+        write_tga(tga_file, rgb, channels[3] if len(channels) > 3 else None, True)
+
+        return tga_file
+
+    with TgaMemmap.create(tga_file, width, height, min(len(channels), 4)) as packed:
+        packed_rgb = packed.rgb
+
+        for band_index, channel in enumerate(channels[:3]):
+            packed_rgb[..., band_index] = channel
+
+        if packed.alpha is not None:
+            packed.alpha[...] = channels[3]
+
+    return tga_file
+
+
+def run_pack_jobs(job_arguments, canceled=None):
+    """Packs jobs that share sources, used as a worker pool function.
+
+    Each source is decoded once and its channel is reused by every job, so
+    packing a group with several presets costs little more than one.
+
+    Arguments:
+        job_arguments (tuple): (sequence of PackJob, rle) where rle RLE
+            compresses the packed TGAs
+
+    Keyword Arguments:
+        canceled (callable): returns True to stop before the next job
+            (default: {None})
+
+    Returns:
+        list -- path of each written tga file
+    """
+
+    pack_jobs, rle = job_arguments
+    channel_cache = {}
+    tga_files = []
+
+    for pack_job in pack_jobs:
+        if canceled is not None and canceled():
+            break
+
+        tga_files.append(pack_channels(
+            pack_job.channel_paths, pack_job.file_name,
+            pack_job.source_channels, rle, channel_cache))
+
+    return tga_files
@@ -0,0 +1,310 @@
+"""Photoshop COM session reused across resize and pack batches."""
+
+import os
+import platform
+import threading
+
+# Global Variables ------------------------------------------------------------
+# COM state of the current thread, see initialize_com_thread
+COM_THREAD = threading.local()
+
+# PsDialogModes.psDisplayNoDialogs
+NO_DIALOGS = 3
+
+SAVE_OPTIONS_CLASSES = {
+    '.tga': 'Photoshop.TargaSaveOptions',
+    '.jpg': 'Photoshop.JPEGSaveOptions',
+    '.png': 'Photoshop.PNGSaveOptions'}
+
+
+def import_comtypes():
+    """Imports comtypes the first time Photoshop is needed.
+
+    Loading comtypes is slow, so runs that never drive Photoshop, such as
+    the command line with the native backends, do not pay for it. COM is
+    initialized on a thread marked by initialize_com_thread the first time
+    the thread gets comtypes.
+
+    Returns:
+        module -- comtypes with comtypes.client loaded, or None when it is
+            not installed
+    """
+
+    try:
+        import comtypes.client
+    except ImportError:
+        # comtypes only installs on Windows, a stand in such as
+        # fakeps.FakePhotoshop can still be used through photoshop_factory
+        return None
+
+    if getattr(COM_THREAD, 'requested', False) and \
+            not getattr(COM_THREAD, 'initialized', False):
+        comtypes.CoInitialize()
+        COM_THREAD.initialized = True
+
+    return comtypes
+
+
+def initialize_com_thread():
+    """Marks a thread that is not the main thread as a COM thread.
+
+    A thread has to initialize COM before it creates COM objects, and the
+    objects it creates are only used from that thread. COM is initialized
+    by import_comtypes, which runs before the thread creates its first COM
+    object, so a worker thread that never drives Photoshop does not load
+    comtypes.
+    """
+
+    COM_THREAD.requested = True
+
+
+def uninitialize_com_thread():
+    """Releases COM on a thread marked by initialize_com_thread."""
+
+    if getattr(COM_THREAD, 'initialized', False):
+        import_comtypes().CoUninitialize()
+        COM_THREAD.initialized = False
+
+    COM_THREAD.requested = False
+
+
+class PhotoshopSession(object):
+    """
+    Connection to Photoshop shared by every batch of a Pyotoshop instance.
+
+    Photoshop is launched or attached to once, the Windows version is
+    probed once and a save options COM object is built once for each
+    format, so a batch only makes the COM calls that operate on its
+    documents.
+    """
+
+    def __init__(self, pyotoshop):
+        """Creates a session that is connected on first use.
+
+        Arguments:
+            pyotoshop (Pyotoshop): instance the session reports errors to
+        """
+
+        super(PhotoshopSession, self).__init__()
+
+        self.pyotoshop = pyotoshop
+        self.ps_app = None
+        self.os_version = None
+        self.os_checked = False
+        self.save_options_cache = {}
+        self.type_ids = {}
+
+    def create_object(self, prog_id):
+        """Creates a COM object with the factory of the Pyotoshop instance.
+
+        Arguments:
+            prog_id (string): ProgID such as 'Photoshop.Application'
+
+        Returns:
+            com_object -- the created object
+        """
+
+        factory = self.pyotoshop.photoshop_factory
+
+        if factory is None:
+            factory = import_comtypes().client.CreateObject
+
+        return factory(prog_id, dynamic=True)
+
+    def is_available(self):
+        """Checks quietly if Photoshop could be driven on this machine.
+
+        Unlike is_supported_os no popup is shown, so it is used by steps
+        that only pick a backend, such as the calibration. A stand in
+        Photoshop from photoshop_factory is always available, otherwise the
+        OS must be Windows 10 with comtypes installed.
+
+        Returns:
+            bool -- True if a batch could launch Photoshop
+        """
+
+        if self.pyotoshop.photoshop_factory is not None:
+            return True
+
+        return platform.system() == 'Windows' and \
+            platform.release() == '10' and import_comtypes() is not None
+
+    def is_supported_os(self):
+        """Checks once if the tool is running on Windows 10.
+
+        A stand in Photoshop from photoshop_factory runs on any OS.
+
+        Returns:
+            bool -- True on Windows 10
+        """
+
+        if self.pyotoshop.photoshop_factory is not None:
+            return True
+
+        # a failed probe returns None after its popup, it is not repeated
+        if not self.os_checked:
+            self.os_version = self.pyotoshop.check_windows_version()
+            self.os_checked = True
+
+        return self.os_version == '10'
+
+    def attach(self):
+        """Launches Photoshop or reuses the connection of an earlier batch.
+
+        The connection is checked once per batch, so a Photoshop closed by
+        the user since the last batch is launched again.
+
+        Returns:
+            com_object -- Photoshop application, or None if the OS is not
+                supported
+        """
+
+        if not self.is_supported_os():
+            self.pyotoshop.popup_ok_window(
+                'Error with determining OS Version to launch Photoshop')
+            return None
+
+        if self.ps_app is not None:
+            try:
+                self.ps_app.Visible  # pylint: disable = W0104
+            except Exception:  # pylint: disable = W0703
+                # COMError from Photoshop or the error of a stand in
+                self.disconnect()
+
+        if self.ps_app is None:
+            self.ps_app = self.create_object('Photoshop.Application')
+
+            self.ps_app.Visible = True
+
+            # Set the default unit to pixels!
+            self.ps_app.Preferences.RulerUnits = 1
+
+        return self.ps_app
+
+    def disconnect(self):
+        """Drops the connection and the save options built for it."""
+
+        self.ps_app = None
+        self.save_options_cache.clear()
+        self.type_ids.clear()
+
+    def save_options(self, file_extension, alpha_channel=False):
+        """Gets the save options COM object of a format.
+
+        Arguments:
+            file_extension (string): '.tga', '.jpg' or '.png'
+
+        Keyword Arguments:
+            alpha_channel (bool): include the alpha channel in a TGA
+                (default: {False})
+
+        Returns:
+            com_object -- save options, built on first use
+        """
+
+        rle = bool(self.pyotoshop.tga_rle)
+        options_key = (file_extension, alpha_channel, rle)
+
+        save_options = self.save_options_cache.get(options_key)
+
+        if save_options is None:
+            save_options = self.create_object(
+                SAVE_OPTIONS_CLASSES[file_extension])
+
+            if file_extension == '.tga':
+                save_options.Resolution = 32 if alpha_channel else 24
+                save_options.AlphaChannels = alpha_channel
+                save_options.RLECompression = rle
+
+            self.save_options_cache[options_key] = save_options
+
+        return save_options
+
+    def save_as(self, ps_doc, file_name):
+        """Saves the active document as a new file.
+
+        TGA files include an alpha channel when the document has more than
+        3 channels.
+
+        Arguments:
+            ps_doc (com_object): the active Photoshop document
+            file_name (string): path of the file, the extension picks the
+                format
+        """
+
+        if not self.is_supported_os():
+            return
+
+        file_extension = os.path.splitext(file_name)[1]
+
+        if file_extension == '.tga':
+            self.save_tga(file_name, ps_doc.channels.count > 3)
+        else:
+            self.ps_app.ActiveDocument.SaveAs(
+                file_name, self.save_options(file_extension), True)
+
+    def save_tga(self, tga_file, alpha_channel=False):
+        """Saves the active document as a TGA.
+
+        Arguments:
+            tga_file (string): path of the TGA
+
+        Keyword Arguments:
+            alpha_channel (bool): include the alpha channel
+                (default: {False})
+        """
+
+        if not self.is_supported_os():
+            return
+
+        self.ps_app.ActiveDocument.SaveAs(
+            tga_file, self.save_options('.tga', alpha_channel), True)
+
+    def type_id(self, char_id):
+        """Converts a four character action ID once per connection.
+
+        Arguments:
+            char_id (string): four character ID such as 'AppI'
+
+        Returns:
+            int -- type ID used in action descriptors
+        """
+
+        type_id = self.type_ids.get(char_id)
+
+        if type_id is None:
+            type_id = self.ps_app.CharIDToTypeID(char_id)
+            self.type_ids[char_id] = type_id
+
+        return type_id
+
+    def apply_image(self, source_doc_name, grayscale=False):
+        """Applies the composite of an open document to the active channels
+            of the active document.
+
+        Runs the Apply Image command through an action descriptor, which is
+        what Image > Apply Image records, with the normal blending mode.
+
+        Arguments:
+            source_doc_name (string): name of the open source document
+
+        Keyword Arguments:
+            grayscale (bool): the source is a grayscale document, whose
+                composite channel is Gray rather than RGB (default: {False})
+        """
+
+        source_reference = self.create_object('Photoshop.ActionReference')
+        source_reference.PutEnumerated(
+            self.type_id('Chnl'), self.type_id('Chnl'),
+            self.type_id('Blck' if grayscale else 'RGB '))
+        source_reference.PutName(self.type_id('Dcmn'), source_doc_name)
+
+        calculation = self.create_object('Photoshop.ActionDescriptor')
+        calculation.PutReference(self.type_id('T   '), source_reference)
+
+        apply_descriptor = self.create_object('Photoshop.ActionDescriptor')
+        apply_descriptor.PutObject(
+            self.type_id('With'), self.type_id('Clcl'), calculation)
+
+        self.ps_app.ExecuteAction(
+            self.type_id('AppI'), apply_descriptor, NO_DIALOGS)
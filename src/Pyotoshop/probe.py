@@ -0,0 +1,271 @@
+"""Header only probing of texture dimensions for TGA, PNG and JPEG files."""
+
+import struct
+import collections
+
+from .lazy import Image
+from .tga import TGA_HEADER, TGA_TRUE_COLOR, TGA_GRAYSCALE, TGA_RLE_FLAG
+from .tga import parse_header
+
+# Global Variables ------------------------------------------------------------
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SIGNATURE = b'\xff\xd8'
+
+# limits how far a header is searched before falling back to Pillow
+MAX_PNG_CHUNKS = 8
+MAX_JPEG_SEGMENTS = 64
+
+# start of frame markers, every 0xC0 - 0xCF marker except DHT, JPG and DAC
+JPEG_SOF_MARKERS = frozenset(
+    marker for marker in range(0xC0, 0xD0) if marker not in (0xC4, 0xC8, 0xCC))
+
+# markers that stand alone and are not followed by a segment length
+JPEG_STANDALONE_MARKERS = frozenset([0x01] + list(range(0xD0, 0xD8)))
+
+# PNG color type -> channels stored in the file
+PNG_COLOR_TYPES = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# (sample depth, color type) -> mode Pillow decodes the PNG to, 16 bit gray
+# with alpha is widened to RGBA
+PNG_MODES = {
+    (1, 0): '1', (2, 0): 'L', (4, 0): 'L', (8, 0): 'L', (16, 0): 'I;16',
+    (8, 2): 'RGB', (16, 2): 'RGB',
+    (1, 3): 'P', (2, 3): 'P', (4, 3): 'P', (8, 3): 'P',
+    (8, 4): 'LA', (16, 4): 'RGBA',
+    (8, 6): 'RGBA', (16, 6): 'RGBA'}
+
+# JPEG component count -> mode
+JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+
+# Pillow mode -> bits per pixel, used when falling back to Pillow
+MODE_BIT_DEPTHS = {
+    '1': 1, 'L': 8, 'P': 8, 'LA': 16, 'I;16': 16, 'RGB': 24, 'YCbCr': 24,
+    'RGBA': 32, 'CMYK': 32, 'I': 32, 'F': 32}
+
+ImageInfo = collections.namedtuple(
+    'ImageInfo',
+    ['width', 'height', 'bit_depth', 'has_alpha', 'mode', 'channels'])
+
+
+class ProbeError(Exception):
+    """Raised when a header can not be parsed by the fast probes."""
+
+
+def probe_image(path):
+    """Reads the dimensions of a texture from its header.
+
+    TGA, PNG and JPEG headers are parsed directly with a few small reads
+    instead of going through Pillow's plugin machinery. Files that are not
+    recognized, or that use an unusual variant of a format, are handed to
+    Pillow instead.
+
+    Arguments:
+        path (string): path of the texture
+
+    Returns:
+        ImageInfo -- dimensions, bits per pixel, alpha presence, mode and
+            channel count of the texture
+    """
+
+    try:
+        with open(path, 'rb') as file_handle:
+            header = file_handle.read(TGA_HEADER.size)
+
+            if header.startswith(PNG_SIGNATURE):
+                return probe_png(file_handle, header)
+            elif header.startswith(JPEG_SIGNATURE):
+                return probe_jpeg(file_handle)
+            elif path.lower().endswith('.tga'):
+                return probe_tga(header)
+    except (ProbeError, struct.error, TypeError):
+        # TypeError is raised by ord() when a read hits the end of the file
+        pass
+
+    return probe_with_pillow(path)
+
+
+def probe_tga(header):
+    """Parses the fixed 18 byte TGA header.
+
+    Arguments:
+        header (bytes): first TGA_HEADER.size bytes of the file
+
+    Returns:
+        ImageInfo -- information stored in the header
+    """
+
+    tga_header = parse_header(header)
+    width = tga_header.width
+    height = tga_header.height
+    pixel_depth = tga_header.pixel_depth
+
+    # strip the RLE flag, only true color and grayscale are handled here
+    base_type = tga_header.image_type & ~TGA_RLE_FLAG
+
+    if tga_header.color_map_type or \
+            base_type not in (TGA_TRUE_COLOR, TGA_GRAYSCALE) or \
+            not width or not height:
+        raise ProbeError(
+            'Unsupported TGA image type {0}'.format(tga_header.image_type))
+
+    alpha_bits = tga_header.descriptor & 0x0F
+
+    if base_type == TGA_GRAYSCALE:
+        has_alpha = pixel_depth == 16
+        mode = 'LA' if has_alpha else 'L'
+    else:
+        if pixel_depth not in (16, 24, 32):
+            raise ProbeError('Unsupported TGA pixel depth {0}'.format(pixel_depth))
+
+        # writers set the alpha bits of 24 bit files too, only a 32 bit
+        # pixel or the attribute bit of a 16 bit pixel holds alpha
+        has_alpha = pixel_depth == 32 or (pixel_depth == 16 and alpha_bits == 1)
+        mode = 'RGBA' if has_alpha else 'RGB'
+
+    return ImageInfo(width, height, pixel_depth, has_alpha, mode, len(mode))
+
+
+def probe_png(file_handle, header):
+    """Parses the IHDR chunk of a PNG.
+
+    IHDR is always the first chunk so the dimensions come from the first 33
+    bytes. Palette images also look for a tRNS chunk before the image data
+    to determine if they contain transparency.
+
+    Arguments:
+        file_handle (file): open file positioned after header
+        header (bytes): bytes already read from the start of the file
+
+    Returns:
+        ImageInfo -- information stored in the header
+    """
+
+    ihdr = header + file_handle.read(33 - len(header))
+
+    chunk_type = ihdr[12:16]
+
+    if chunk_type != b'IHDR':
+        raise ProbeError('PNG does not start with IHDR')
+
+    width, height, sample_depth, color_type = struct.unpack('>IIBB', ihdr[16:26])
+
+    if (sample_depth, color_type) not in PNG_MODES:
+        raise ProbeError('Unsupported PNG color type {0} at {1} bits'.format(
+            color_type, sample_depth))
+
+    mode = PNG_MODES[sample_depth, color_type]
+    channels = PNG_COLOR_TYPES[color_type]
+    has_alpha = color_type in (4, 6)
+
+    if color_type == 3:
+        has_alpha = find_png_chunk(file_handle, b'tRNS')
+
+    return ImageInfo(
+        width, height, sample_depth * channels, has_alpha, mode, channels)
+
+
+def find_png_chunk(file_handle, chunk_name):
+    """Searches the chunks that come before the image data of a PNG.
+
+    Only the 8 byte chunk headers are read, chunk contents are skipped.
+
+    Arguments:
+        file_handle (file): open file positioned at the start of a chunk
+        chunk_name (bytes): four character chunk type to find
+
+    Returns:
+        bool -- True if the chunk is found before the first IDAT chunk
+    """
+
+    for _ in range(MAX_PNG_CHUNKS):
+        chunk_header = file_handle.read(8)
+
+        if len(chunk_header) < 8:
+            break
+
+        chunk_length, chunk_type = struct.unpack('>I4s', chunk_header)
+
+        if chunk_type == chunk_name:
+            return True
+        elif chunk_type == b'IDAT':
+            break
+
+        # skip chunk data and the 4 byte crc
+        file_handle.seek(chunk_length + 4, 1)
+
+    return False
+
+
+def probe_jpeg(file_handle):
+    """Walks the JPEG marker segments until the start of frame marker.
+
+    Only the marker and length of each segment are read, segment contents
+    such as EXIF data or embedded thumbnails are skipped.
+
+    Arguments:
+        file_handle (file): open file positioned after the SOI marker
+
+    Returns:
+        ImageInfo -- information stored in the start of frame segment
+    """
+
+    file_handle.seek(2)
+
+    for _ in range(MAX_JPEG_SEGMENTS):
+        marker_prefix = file_handle.read(1)
+
+        if marker_prefix != b'\xff':
+            raise ProbeError('Invalid JPEG marker')
+
+        marker = ord(file_handle.read(1))
+
+        # markers may be padded with any number of 0xFF fill bytes
+        while marker == 0xFF:
+            marker = ord(file_handle.read(1))
+
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+
+        segment_length = struct.unpack('>H', file_handle.read(2))[0]
+
+        if marker in JPEG_SOF_MARKERS:
+            precision, height, width, components = struct.unpack(
+                '>BHHB', file_handle.read(6))
+
+            if components not in JPEG_MODES or not width or not height:
+                raise ProbeError('Unsupported JPEG frame')
+
+            return ImageInfo(
+                width, height, precision * components, False,
+                JPEG_MODES[components], components)
+
+        # start of scan or end of image reached without a frame header
+        if marker in (0xD9, 0xDA):
+            break
+
+        file_handle.seek(segment_length - 2, 1)
+
+    raise ProbeError('JPEG start of frame not found')
+
+
+def probe_with_pillow(path):
+    """Reads texture information through Pillow for files the fast probes
+    do not handle.
+
+    Arguments:
+        path (string): path of the texture
+
+    Returns:
+        ImageInfo -- information read by Pillow
+    """
+
+    with Image.open(path) as image:
+        width, height = image.size
+        mode = image.mode
+        bands = image.getbands()
+        has_alpha = 'A' in bands or (
+            mode == 'P' and 'transparency' in image.info)
+
+    return ImageInfo(
+        width, height, MODE_BIT_DEPTHS.get(mode, 8 * len(bands)),
+        has_alpha, mode, len(bands))
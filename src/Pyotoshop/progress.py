@@ -0,0 +1,132 @@
+"""Rate limited progress reporting with throughput and time estimates."""
+
+import timeit
+import datetime
+
+# Global Variables ------------------------------------------------------------
+# shortest time between two updates of a progress dialog, in seconds
+DEFAULT_UPDATE_INTERVAL = 0.1
+
+BYTES_PER_MB = 1024.0 * 1024.0
+
+
+class ProgressReporter(object):
+    """
+    Reports the progress of a batch to a progress dialog at a bounded rate.
+
+    Every step of the batch is counted, but the dialog is only updated when
+    update_interval has passed since the last update, so its repaints and
+    the formatting of the label cost the same on a batch of a hundred
+    thousand steps as on a batch of a hundred. The label shows the current
+    step, the files and bytes processed per second and, when the number of
+    steps is known, the time left.
+    """
+
+    def __init__(self, progress_dialog, label_template, total=0,
+                 update_interval=DEFAULT_UPDATE_INTERVAL,
+                 clock=timeit.default_timer):
+        """Starts timing a batch.
+
+        Arguments:
+            progress_dialog (QProgressDialog): dialog, or ProgressProxy,
+                showing the progress
+            label_template (string): format string of the label, {0} is
+                replaced by the subject passed to advance
+
+        Keyword Arguments:
+            total (int): number of steps in the batch, 0 when unknown such
+                as during a directory walk (default: {0})
+            update_interval (float): shortest time between two updates of
+                the dialog in seconds (default: {DEFAULT_UPDATE_INTERVAL})
+            clock (callable): returns the current time in seconds
+                (default: {timeit.default_timer})
+        """
+
+        super(ProgressReporter, self).__init__()
+
+        self.progress_dialog = progress_dialog
+        self.label_template = label_template
+        self.total = total
+        self.update_interval = update_interval
+        self.clock = clock
+
+        self.steps = 0
+        self.files = 0
+        self.size = 0
+
+        self.start_time = clock()
+        self.last_update = None
+
+    def was_canceled(self):
+        """Checks if the user canceled the batch.
+
+        Returns:
+            bool -- True if the dialog was canceled
+        """
+
+        return self.progress_dialog.wasCanceled()
+
+    def advance(self, subject, files=1, size=0, steps=1):
+        """Counts finished steps and updates the dialog if it is due.
+
+        Arguments:
+            subject (string): what the step processed, such as a directory,
+                formatted into the label only when the dialog is updated
+
+        Keyword Arguments:
+            files (int): files processed by the steps (default: {1})
+            size (int): bytes of the processed files (default: {0})
+            steps (int): steps finished (default: {1})
+        """
+
+        self.steps += steps
+        self.files += files
+        self.size += size
+
+        current_time = self.clock()
+
+        if self.last_update is not None and \
+                current_time - self.last_update < self.update_interval:
+            return
+
+        self.last_update = current_time
+
+        self.progress_dialog.setValue(self.steps)
+
+        self.progress_dialog.setLabelText('{0}\n{1}'.format(
+            self.label_template.format(subject),
+            self.describe_rate(current_time - self.start_time)))
+
+    def describe_rate(self, elapsed_time):
+        """Describes the throughput and time left of the batch.
+
+        Arguments:
+            elapsed_time (float): seconds since the batch started
+
+        Returns:
+            string -- files/s, MB/s when sizes are counted and the estimated
+                time left when the number of steps is known
+        """
+
+        elapsed_time = max(elapsed_time, 1e-6)
+
+        rate_text = '{0} files, {1:.1f} files/s'.format(
+            self.files, self.files / elapsed_time)
+
+        # steps that do not know the size of their files leave it out
+        if self.size:
+            rate_text = '{0}, {1:.1f} MB/s'.format(
+                rate_text, self.size / BYTES_PER_MB / elapsed_time)
+
+        if self.total and self.steps:
+            seconds_left = elapsed_time * (self.total - self.steps) / self.steps
+
+            rate_text = '{0}, {1} left'.format(
+                rate_text, datetime.timedelta(seconds=int(seconds_left)))
+
+        return rate_text
+
+    def finish(self):
+        """Shows the final value of the batch."""
+
+        self.progress_dialog.setValue(self.total or self.steps)
@@ -0,0 +1,103 @@
+"""Records of the resize analysis and their CSV and JSON export."""
+
+import csv
+import json
+import collections
+
+# Global Variables ------------------------------------------------------------
+ResultRecord = collections.namedtuple(
+    'ResultRecord', ['path', 'size', 'width', 'height', 'category', 'action'])
+
+# action taken on the textures of each category of the resize analysis, the
+# larger textures are pending until the outcome of their resize is known
+CATEGORY_ACTIONS = collections.OrderedDict([
+    ('Larger Textures', 'Pending'),
+    ('Already Sized Textures', 'Skipped, already sized'),
+    ('Not Power of 2', 'Skipped, not power of 2'),
+    ('Not Square', 'Skipped, not square')])
+
+
+def build_result_records(texture_dict, texture_index, resize_outcomes=None):
+    """Builds a record for every texture of the resize analysis.
+
+    The sizes and dimensions come from the texture index, looked up in
+    batches. Textures the analysis never reads, such as the already sized
+    ones it sorts by name, are added to the index from their header.
+
+    Arguments:
+        texture_dict (dictionary): lists of texture paths keyed by the
+            categories of CATEGORY_ACTIONS
+        texture_index (TextureIndex): index holding the texture metadata
+
+    Keyword Arguments:
+        resize_outcomes (dictionary): 'Resized' or 'Failed' keyed by the
+            path of each texture of the resize run, textures missing from it
+            keep the action of their category (default: {None})
+
+    Returns:
+        list -- ResultRecord of each texture, by category
+    """
+
+    result_records = []
+    resize_outcomes = resize_outcomes or {}
+
+    for category, category_action in CATEGORY_ACTIONS.items():
+        texture_paths = texture_dict.get(category, [])
+        texture_records = texture_index.find_many(texture_paths)
+
+        for texture_path in texture_paths:
+            texture_record = texture_records.get(texture_path)
+            action = resize_outcomes.get(texture_path, category_action)
+
+            if texture_record is None:
+                try:
+                    texture_record = texture_index.lookup_path(texture_path)
+                except (IOError, OSError):
+                    # removed or unreadable since the analysis
+                    pass
+
+            if texture_record is None:
+                result_records.append(ResultRecord(
+                    texture_path, None, None, None, category, action))
+            else:
+                result_records.append(ResultRecord(
+                    texture_path, texture_record.size, texture_record.width,
+                    texture_record.height, category, action))
+
+    texture_index.commit()
+
+    return result_records
+
+
+def write_results_csv(result_records, csv_path):
+    """Writes result records to a CSV file with a header row.
+
+    Arguments:
+        result_records (iterable): ResultRecord of each texture
+        csv_path (string): path of the CSV file
+    """
+
+    # the csv module of Python 2 writes to binary files, Python 3 to text
+    # files that leave the line endings to it
+    if str is bytes:
+        csv_file = open(csv_path, 'wb')
+    else:
+        csv_file = open(csv_path, 'w', newline='')
+
+    with csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(ResultRecord._fields)
+        csv_writer.writerows(result_records)
+
+
+def write_results_json(result_records, json_path):
+    """Writes result records to a JSON file as a list of objects.
+
+    Arguments:
+        result_records (iterable): ResultRecord of each texture
+        json_path (string): path of the JSON file
+    """
+
+    with open(json_path, 'w') as json_file:
+        json.dump(
+            [x._asdict() for x in result_records], json_file, indent=2)
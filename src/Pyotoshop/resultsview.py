@@ -0,0 +1,327 @@
+"""Table view of the resize analysis records."""
+
+import operator
+
+from Qt import QtCore, QtWidgets
+
+from .results import CATEGORY_ACTIONS, ResultRecord
+from .results import write_results_csv, write_results_json
+from .thumbnailview import ThumbnailListModel, ThumbnailLoader, ThumbnailView
+
+# Global Variables ------------------------------------------------------------
+# rows handed to the view each time it scrolls to the end of the fetched rows
+ROWS_PER_FETCH = 1000
+
+COLUMN_TITLES = ('Path', 'Size (KB)', 'Width', 'Height', 'Category', 'Action')
+
+ALL_CATEGORIES = 'All Categories'
+
+
+class ResultsTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model over a list of results.ResultRecord.
+
+    Rows are handed to the view in batches of ROWS_PER_FETCH through
+    canFetchMore and fetchMore, so the view only lays out the rows that
+    were scrolled to. Filtering and sorting work on the whole record list.
+    Each one resets the model to the first batch.
+    """
+
+    def __init__(self, result_records, parent=None):
+        """Creates a model showing every record.
+
+        Arguments:
+            result_records (list): ResultRecord of each texture
+
+        Keyword Arguments:
+            parent (QObject): parent of the model (default: {None})
+        """
+
+        super(ResultsTableModel, self).__init__(parent)
+
+        self.result_records = result_records
+        self.visible_records = list(result_records)
+
+        # (column, order) of the last sort, reapplied after filtering
+        self.sort_order = None
+        self.fetched_rows = min(ROWS_PER_FETCH, len(self.visible_records))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):  # pylint: disable = C0103
+        if parent.isValid():
+            return 0
+
+        return self.fetched_rows
+
+    def columnCount(self, parent=QtCore.QModelIndex()):  # pylint: disable = C0103
+        if parent.isValid():
+            return 0
+
+        return len(COLUMN_TITLES)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):  # pylint: disable = C0103
+        if parent.isValid():
+            return False
+
+        return self.fetched_rows < len(self.visible_records)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):  # pylint: disable = C0103
+        if parent.isValid():
+            return
+
+        fetch_count = min(
+            ROWS_PER_FETCH, len(self.visible_records) - self.fetched_rows)
+
+        self.beginInsertRows(
+            QtCore.QModelIndex(), self.fetched_rows,
+            self.fetched_rows + fetch_count - 1)
+        self.fetched_rows += fetch_count
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+
+        value = self.visible_records[index.row()][index.column()]
+
+        if value is None:
+            return ''
+
+        if index.column() == ResultRecord._fields.index('size'):
+            return '{0:,}'.format(value // 1024)
+
+        return str(value)
+
+    def headerData(self, section, orientation,  # pylint: disable = C0103
+                   role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+
+        if orientation == QtCore.Qt.Horizontal:
+            return COLUMN_TITLES[section]
+
+        return str(section + 1)
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """Sorts every visible record, not only the fetched rows.
+
+        Missing sizes and dimensions sort before any value.
+
+        Arguments:
+            column (int): column to sort by
+
+        Keyword Arguments:
+            order (Qt.SortOrder): sort order (default: {Qt.AscendingOrder})
+        """
+
+        # the view sorts by column -1 until a header is clicked
+        if column < 0:
+            return
+
+        self.sort_order = (column, order)
+
+        self.beginResetModel()
+
+        self.sort_records()
+
+        self.fetched_rows = min(ROWS_PER_FETCH, len(self.visible_records))
+
+        self.endResetModel()
+
+    def sort_records(self):
+        """Sorts the visible records in the order of the last sort."""
+
+        if self.sort_order is None:
+            return
+
+        column, order = self.sort_order
+        column_value = operator.itemgetter(column)
+
+        self.visible_records.sort(
+            key=lambda x: (column_value(x) is not None, column_value(x)),
+            reverse=order == QtCore.Qt.DescendingOrder)
+
+    def set_filter(self, path_text='', category=None):
+        """Shows only the records matching a path substring and category.
+
+        Arguments:
+            path_text (string): case insensitive text the path must contain,
+                every path matches when empty
+
+        Keyword Arguments:
+            category (string): category the records must be in, every
+                category matches when None (default: {None})
+        """
+
+        path_text = path_text.lower()
+
+        self.beginResetModel()
+
+        self.visible_records = [
+            x for x in self.result_records
+            if (category is None or x.category == category) and
+            path_text in x.path.lower()]
+
+        self.sort_records()
+
+        self.fetched_rows = min(ROWS_PER_FETCH, len(self.visible_records))
+
+        self.endResetModel()
+
+
+class ResultsWindow(QtWidgets.QDialog):
+    """
+    Dialog with the results table, filters and the CSV and JSON export.
+
+    The filtered records can also be browsed as a grid of thumbnails,
+    which is only built when it is first shown.
+    """
+
+    def __init__(self, result_records, parent=None, open_thumbnail_cache=None):
+        """Creates the dialog.
+
+        Arguments:
+            result_records (list): ResultRecord of each texture
+
+        Keyword Arguments:
+            parent (QWidget): parent of the dialog (default: {None})
+            open_thumbnail_cache (callable): returns the ThumbnailCache of
+                the thumbnail grid, the grid is not offered when None
+                (default: {None})
+        """
+
+        super(ResultsWindow, self).__init__(parent)
+
+        self.setWindowTitle('Resize Results')
+        self.setLayout(QtWidgets.QVBoxLayout())
+
+        self.results_model = ResultsTableModel(result_records, self)
+
+        self.open_thumbnail_cache = open_thumbnail_cache
+        self.thumbnail_model = None
+
+        # filter row ----------------------------------------------------------
+        filter_layout = QtWidgets.QHBoxLayout()
+
+        self.path_filter_le = QtWidgets.QLineEdit('')
+        self.path_filter_le.setPlaceholderText('Filter Paths...')
+
+        self.category_combobox = QtWidgets.QComboBox()
+        self.category_combobox.addItem(ALL_CATEGORIES)
+
+        for category in CATEGORY_ACTIONS:
+            self.category_combobox.addItem(category)
+
+        filter_layout.addWidget(self.path_filter_le)
+        filter_layout.addWidget(self.category_combobox)
+
+        # results table -------------------------------------------------------
+        results_table = QtWidgets.QTableView()
+        results_table.setModel(self.results_model)
+        # the records stay in analysis order until a header is clicked
+        results_table.horizontalHeader().setSortIndicator(
+            -1, QtCore.Qt.AscendingOrder)
+        results_table.setSortingEnabled(True)
+        results_table.verticalHeader().setDefaultSectionSize(
+            results_table.fontMetrics().height() + 4)
+        results_table.horizontalHeader().setStretchLastSection(True)
+
+        self.results_stack = QtWidgets.QStackedWidget()
+        self.results_stack.addWidget(results_table)
+
+        # export buttons ------------------------------------------------------
+        export_layout = QtWidgets.QHBoxLayout()
+
+        self.thumbnails_btn = QtWidgets.QPushButton('Show Thumbnails')
+        self.thumbnails_btn.setCheckable(True)
+        self.thumbnails_btn.setVisible(open_thumbnail_cache is not None)
+
+        export_csv_btn = QtWidgets.QPushButton('Export CSV')
+        export_json_btn = QtWidgets.QPushButton('Export JSON')
+
+        export_layout.addWidget(self.thumbnails_btn)
+        export_layout.addStretch()
+        export_layout.addWidget(export_csv_btn)
+        export_layout.addWidget(export_json_btn)
+
+        self.layout().addLayout(filter_layout)
+        self.layout().addWidget(self.results_stack)
+        self.layout().addLayout(export_layout)
+
+        self.resize(900, 600)
+
+        self.path_filter_le.textChanged.connect(self.apply_filter)
+        self.category_combobox.currentIndexChanged.connect(self.apply_filter)
+        self.results_model.modelReset.connect(self.update_thumbnails)
+        self.thumbnails_btn.toggled.connect(self.show_thumbnails)
+
+        export_csv_btn.clicked.connect(
+            lambda: self.export_results('CSV (*.csv)', write_results_csv))
+        export_json_btn.clicked.connect(
+            lambda: self.export_results('JSON (*.json)', write_results_json))
+
+    def apply_filter(self, *args):  # pylint: disable = W0613
+        """Filters the table with the path text and selected category."""
+
+        category = self.category_combobox.currentText()
+
+        self.results_model.set_filter(
+            self.path_filter_le.text(),
+            None if category == ALL_CATEGORIES else category)
+
+    def show_thumbnails(self, checked):
+        """Switches between the table and the thumbnail grid.
+
+        Arguments:
+            checked (bool): True to show the thumbnail grid
+        """
+
+        if checked and self.thumbnail_model is None:
+            thumbnail_loader = ThumbnailLoader(self.open_thumbnail_cache(), self)
+
+            self.thumbnail_model = ThumbnailListModel(
+                thumbnail_loader,
+                [x.path for x in self.results_model.visible_records], self)
+
+            self.results_stack.addWidget(ThumbnailView(self.thumbnail_model))
+
+        self.results_stack.setCurrentIndex(1 if checked else 0)
+        self.thumbnails_btn.setText(
+            'Show Table' if checked else 'Show Thumbnails')
+
+    def update_thumbnails(self):
+        """Shows the filtered and sorted records in the thumbnail grid."""
+
+        if self.thumbnail_model is not None:
+            self.thumbnail_model.set_texture_paths(
+                [x.path for x in self.results_model.visible_records])
+
+    def hideEvent(self, event):  # pylint: disable = C0103
+        """Stops making thumbnails once the dialog is closed.
+
+        Arguments:
+            event (QHideEvent): hide event of the dialog
+        """
+
+        if self.thumbnail_model is not None:
+            self.thumbnail_model.thumbnail_loader.stop()
+
+        super(ResultsWindow, self).hideEvent(event)
+
+    def export_results(self, file_filter, write_results):
+        """Exports the filtered records to a file chosen by the user.
+
+        Arguments:
+            file_filter (string): filter of the file dialog
+            write_results (callable): write_results_csv or
+                write_results_json
+        """
+
+        file_path = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export Results', '', file_filter)
+
+        # PyQt4 returns the path, newer bindings a (path, filter) tuple
+        if isinstance(file_path, tuple):
+            file_path = file_path[0]
+
+        if file_path:
+            write_results(self.results_model.visible_records, str(file_path))
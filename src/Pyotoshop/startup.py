@@ -0,0 +1,227 @@
+"""Import time breakdown of the startup, enabled by PYOTOSHOP_PROFILE_STARTUP."""
+
+import os
+import sys
+import timeit
+import threading
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+# Global Variables ------------------------------------------------------------
+# '1' writes the report to stderr, any other value is the path of a file it
+# is written to, which the windowed executable needs since it has no console
+PROFILE_VARIABLE = 'PYOTOSHOP_PROFILE_STARTUP'
+
+# number of the slowest imports listed in the report
+REPORTED_IMPORTS = 30
+
+# profiler started by start_profiling, None when profiling is off
+STARTUP_PROFILER = None
+
+
+class StartupProfiler(object):
+    """
+    Times the imports and milestones of the startup.
+
+    __import__ is wrapped so every import that loads a new module is
+    timed. The total time of an import includes the modules it imports,
+    its self time does not.
+    """
+
+    def __init__(self, clock=timeit.default_timer):
+        """Starts the clock of the startup.
+
+        Keyword Arguments:
+            clock (callable): returns the current time in seconds
+                (default: {timeit.default_timer})
+        """
+
+        super(StartupProfiler, self).__init__()
+
+        self.clock = clock
+        self.start_time = clock()
+
+        # [total, self] seconds keyed by module name
+        self.import_times = {}
+        self.milestones = []
+
+        # each thread keeps the time spent in the imports of the imports
+        # it is running
+        self.thread_state = threading.local()
+        self.original_import = None
+
+    def start(self):
+        """Starts timing imports."""
+
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+
+    def stop(self):
+        """Stops timing imports."""
+
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def timed_import(self, name, *args, **kwargs):
+        """Stands in for __import__ and times the import.
+
+        Arguments:
+            name (string): name of the module to import
+
+        Returns:
+            module -- the value returned by __import__
+        """
+
+        child_times = getattr(self.thread_state, 'child_times', None)
+
+        if child_times is None:
+            child_times = self.thread_state.child_times = [0.0]
+
+        module_name = self.module_name(name, *args, **kwargs)
+
+        # imports of modules that are already loaded, or being loaded
+        # further up the stack, are not reported
+        is_new_module = module_name not in sys.modules
+
+        child_times.append(0.0)
+        start_time = self.clock()
+
+        try:
+            return self.original_import(name, *args, **kwargs)
+        finally:
+            elapsed_time = self.clock() - start_time
+            nested_time = child_times.pop()
+            child_times[-1] += elapsed_time
+
+            if is_new_module:
+                import_time = self.import_times.setdefault(
+                    module_name, [0.0, 0.0])
+                import_time[0] += elapsed_time
+                import_time[1] += elapsed_time - nested_time
+
+    @classmethod
+    def module_name(cls, name, globals=None, locals=None, fromlist=None,
+                    level=0):  # pylint: disable = W0613, W0622
+        """Resolves the name of a relative import.
+
+        Takes the arguments of __import__.
+
+        Arguments:
+            name (string): name of the module to import
+
+        Keyword Arguments:
+            globals (dictionary): globals of the importing module
+                (default: {None})
+            locals (dictionary): unused (default: {None})
+            fromlist (list): unused (default: {None})
+            level (int): number of leading dots of a relative import
+                (default: {0})
+
+        Returns:
+            string -- full name of the module
+        """
+
+        if level <= 0 or not globals:
+            return name
+
+        package = globals.get('__package__')
+
+        # Python 2 leaves __package__ unset, the __init__ of a package is
+        # named after the package
+        if not package:
+            package = globals.get('__name__', '')
+
+            if '__path__' not in globals:
+                package = package.rpartition('.')[0]
+
+        # every dot past the first goes up a package
+        package = package.rsplit('.', level - 1)[0] if level > 1 else package
+
+        return '{0}.{1}'.format(package, name) if name else package
+
+    def mark(self, milestone):
+        """Records the time a step of the startup was reached.
+
+        Arguments:
+            milestone (string): name of the step, such as 'window shown'
+        """
+
+        self.milestones.append((milestone, self.clock() - self.start_time))
+
+    def report(self):
+        """Describes the milestones and the slowest imports.
+
+        Returns:
+            string -- report of the startup, times in milliseconds
+        """
+
+        report_lines = ['Pyotoshop startup, {0:.1f} ms'.format(
+            (self.clock() - self.start_time) * 1000)]
+
+        for milestone, elapsed_time in self.milestones:
+            report_lines.append('  {0:>9.1f} ms  {1}'.format(
+                elapsed_time * 1000, milestone))
+
+        report_lines.append('   total ms    self ms  import')
+
+        slowest_imports = sorted(
+            self.import_times.items(), key=lambda x: x[1][0], reverse=True)
+
+        for module_name, (total_time, self_time) in \
+                slowest_imports[:REPORTED_IMPORTS]:
+            report_lines.append('  {0:>9.1f}  {1:>9.1f}  {2}'.format(
+                total_time * 1000, self_time * 1000, module_name))
+
+        return '\n'.join(report_lines)
+
+
+def start_profiling():
+    """Starts the startup profiler if PYOTOSHOP_PROFILE_STARTUP is set.
+
+    Must run before the modules to time are imported.
+    """
+
+    global STARTUP_PROFILER  # pylint: disable = W0603
+
+    if not os.environ.get(PROFILE_VARIABLE) or STARTUP_PROFILER is not None:
+        return
+
+    STARTUP_PROFILER = StartupProfiler()
+    STARTUP_PROFILER.start()
+
+
+def mark_startup(milestone):
+    """Records a milestone if the startup is profiled.
+
+    Arguments:
+        milestone (string): name of the step, such as 'window shown'
+    """
+
+    if STARTUP_PROFILER is not None:
+        STARTUP_PROFILER.mark(milestone)
+
+
+def report_startup():
+    """Stops the startup profiler and writes its report."""
+
+    global STARTUP_PROFILER  # pylint: disable = W0603
+
+    if STARTUP_PROFILER is None:
+        return
+
+    STARTUP_PROFILER.stop()
+
+    startup_report = STARTUP_PROFILER.report() + '\n'
+    STARTUP_PROFILER = None
+
+    report_path = os.environ.get(PROFILE_VARIABLE)
+
+    if report_path == '1':
+        sys.stderr.write(startup_report)
+    else:
+        with open(report_path, 'w') as report_file:
+            report_file.write(startup_report)
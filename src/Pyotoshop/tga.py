@@ -0,0 +1,545 @@
+"""Streaming reader and writer for true color TGA files."""
+
+import struct
+import collections
+
+from .lazy import numpy
+
+# Global Variables ------------------------------------------------------------
+TGA_HEADER = struct.Struct('<BBBHHBHHHHBB')
+
+# image types, the RLE variants add 8
+TGA_TRUE_COLOR = 2
+TGA_GRAYSCALE = 3
+TGA_RLE_FLAG = 8
+
+# image descriptor bit set when rows are stored top to bottom
+TGA_TOP_DOWN_FLAG = 0x20
+
+# RLE packets hold at most 128 pixels, the high bit marks a repeated pixel
+RLE_MAX_PACKET = 128
+RLE_RUN_FLAG = 0x80
+
+# bytes of compressed data read from the file at a time
+RLE_READ_SIZE = 1024 * 1024
+
+# rows encoded at a time when writing an RLE TGA
+RLE_WRITE_ROWS = 256
+
+TgaHeader = collections.namedtuple(
+    'TgaHeader',
+    ['id_length', 'color_map_type', 'image_type', 'color_map_start',
+     'color_map_length', 'color_map_depth', 'x_origin', 'y_origin', 'width',
+     'height', 'pixel_depth', 'descriptor'])
+
+
+class TgaError(Exception):
+    """Raised for TGA files the streaming reader does not support."""
+
+
+def parse_header(header_bytes):
+    """Unpacks the fixed 18 byte TGA header.
+
+    Arguments:
+        header_bytes (bytes): first 18 bytes of the file
+
+    Returns:
+        TgaHeader -- fields of the header
+    """
+
+    return TgaHeader._make(TGA_HEADER.unpack(header_bytes))
+
+
+def read_header(file_handle):
+    """Reads the header of a TGA and skips to the start of its pixel data.
+
+    Arguments:
+        file_handle (file): file opened in binary mode at its start
+
+    Returns:
+        TgaHeader -- fields of the header
+    """
+
+    header = parse_header(file_handle.read(TGA_HEADER.size))
+
+    # image id and color map come between the header and the pixels
+    color_map_size = header.color_map_length * ((header.color_map_depth + 7) // 8)
+    file_handle.seek(header.id_length + color_map_size, 1)
+
+    return header
+
+
+def is_true_color(header):
+    """Checks if a TGA stores 24 or 32 bit true color pixels.
+
+    Arguments:
+        header (TgaHeader): header of the TGA
+
+    Returns:
+        bool -- True for 24 or 32 bit true color, with or without RLE
+    """
+
+    return (
+        not header.color_map_type and
+        header.image_type & ~TGA_RLE_FLAG == TGA_TRUE_COLOR and
+        header.pixel_depth in (24, 32))
+
+
+def iter_strips(file_handle, header, rows_per_strip):
+    """Reads the pixels of a TGA a few rows at a time.
+
+    Rows are returned in the order they are stored in the file and pixels
+    keep the BGR(A) order of the file, so a strip can be processed and
+    written back out without reordering.
+
+    Arguments:
+        file_handle (file): file positioned at the start of the pixel data
+        header (TgaHeader): header of the TGA
+        rows_per_strip (int): number of rows in each strip
+
+    Yields:
+        numpy.ndarray -- uint8 array of shape (rows, width, channels)
+    """
+
+    if not is_true_color(header):
+        raise TgaError('Only 24 and 32 bit true color TGA files are supported')
+
+    channels = header.pixel_depth // 8
+    row_size = header.width * channels
+
+    if header.image_type & TGA_RLE_FLAG:
+        pixel_source = RleReader(file_handle, channels)
+    else:
+        pixel_source = file_handle
+
+    for row_start in range(0, header.height, rows_per_strip):
+        strip_rows = min(rows_per_strip, header.height - row_start)
+        strip_size = strip_rows * row_size
+
+        strip_data = pixel_source.read(strip_size)
+
+        if len(strip_data) != strip_size:
+            raise TgaError('TGA pixel data is truncated')
+
+        yield numpy.frombuffer(strip_data, numpy.uint8).reshape(
+            strip_rows, header.width, channels)
+
+
+class RleReader(object):
+    """
+    File like reader that returns the decoded pixel bytes of an RLE TGA.
+
+    Compressed data is read from the file in large blocks and decoded with
+    decode_rle. Packets may span rows, so any bytes decoded past the size
+    asked for are kept for the next read.
+    """
+
+    def __init__(self, file_handle, channels):
+        """Wraps a file positioned at the first RLE packet.
+
+        Arguments:
+            file_handle (file): file opened in binary mode
+            channels (int): bytes per pixel
+        """
+
+        super(RleReader, self).__init__()
+
+        self.file_handle = file_handle
+        self.channels = channels
+        self.compressed = bytearray()
+        self.decoded = bytearray()
+
+    def read(self, size):
+        """Decodes packets until size bytes of pixel data are available.
+
+        Arguments:
+            size (int): number of decoded bytes needed
+
+        Returns:
+            bytes -- decoded bytes, fewer than size only if the file ended
+                early
+        """
+
+        while len(self.decoded) < size:
+            pixel_count = -(-(size - len(self.decoded)) // self.channels)
+            pixel_data, consumed = decode_rle(
+                self.compressed, self.channels, pixel_count)
+
+            del self.compressed[:consumed]
+            self.decoded += pixel_data
+
+            if len(self.decoded) >= size:
+                break
+
+            compressed_data = self.file_handle.read(max(size, RLE_READ_SIZE))
+
+            if not compressed_data:
+                break
+
+            self.compressed += compressed_data
+
+        strip_data = bytes(self.decoded[:size])
+        del self.decoded[:size]
+
+        return strip_data
+
+
+def decode_rle(compressed, channels, pixel_count):
+    """Decodes RLE packets until at least pixel_count pixels are decoded.
+
+    Only the packet headers are walked in Python, the pixels are then
+    gathered from the compressed data with a single NumPy index, repeating
+    the pixel of a run packet and stepping through the pixels of a raw one.
+
+    Arguments:
+        compressed (bytearray): compressed data starting at a packet header
+        channels (int): bytes per pixel
+        pixel_count (int): number of pixels needed
+
+    Returns:
+        tuple -- (decoded bytes, number of compressed bytes consumed), a
+            packet cut off at the end of compressed is left unconsumed
+    """
+
+    compressed_size = len(compressed)
+    run_packet_size = 1 + channels
+    packet_positions = []
+    position = 0
+    decoded_count = 0
+
+    while decoded_count < pixel_count and position < compressed_size:
+        packet_header = compressed[position]
+        count = (packet_header & 0x7F) + 1
+
+        if packet_header & RLE_RUN_FLAG:
+            next_position = position + run_packet_size
+        else:
+            next_position = position + 1 + channels * count
+
+        # packet cut off at the end of the data read so far
+        if next_position > compressed_size:
+            break
+
+        packet_positions.append(position)
+        position = next_position
+        decoded_count += count
+
+    if not packet_positions:
+        return b'', 0
+
+    compressed_array = numpy.frombuffer(
+        bytes(compressed[:position]), numpy.uint8)
+
+    packet_positions = numpy.array(packet_positions, numpy.intp)
+    packet_headers = compressed_array[packet_positions]
+    packet_counts = (packet_headers & 0x7F).astype(numpy.intp) + 1
+
+    # a run packet repeats its one pixel, a raw packet steps through them
+    packet_steps = numpy.where(packet_headers & RLE_RUN_FLAG, 0, channels)
+
+    packet_index = numpy.repeat(
+        numpy.arange(len(packet_counts)), packet_counts)
+
+    # position of each decoded pixel within its packet
+    first_pixels = numpy.cumsum(packet_counts) - packet_counts
+    pixel_in_packet = numpy.arange(decoded_count) - first_pixels[packet_index]
+
+    pixel_offsets = (
+        packet_positions[packet_index] + 1 +
+        pixel_in_packet * packet_steps[packet_index])
+
+    pixels = compressed_array[pixel_offsets[:, None] + numpy.arange(channels)]
+
+    return pixels.tobytes(), position
+
+
+def encode_rle(pixels):
+    """Encodes rows of pixels as TGA RLE packets.
+
+    Runs are found by comparing each pixel, packed into a single integer,
+    with its neighbour. Repeated pixels become run packets, consecutive
+    pixels that differ are merged into raw packets and every packet is
+    built with NumPy indexing rather than a loop over the pixels. Packets
+    never cross a row, so strips of an image can be encoded separately and
+    written one after the other.
+
+    Arguments:
+        pixels (numpy.ndarray): uint8 array of shape (rows, width, channels)
+            in file order and BGR(A) layout
+
+    Returns:
+        bytes -- the encoded packets
+    """
+
+    rows, width, channels = pixels.shape
+    pixel_count = rows * width
+
+    if not pixel_count:
+        return b''
+
+    flat_pixels = numpy.ascontiguousarray(pixels).reshape(pixel_count, channels)
+
+    # pad every pixel to 4 bytes so it can be compared as one integer
+    padded_pixels = numpy.zeros((pixel_count, 4), numpy.uint8)
+    padded_pixels[:, :channels] = flat_pixels
+    pixel_keys = padded_pixels.view(numpy.uint32).ravel()
+
+    # a run starts at each row and wherever a pixel differs from the last
+    run_start_mask = numpy.ones(pixel_count, bool)
+    run_start_mask[1:] = pixel_keys[1:] != pixel_keys[:-1]
+    run_start_mask[::width] = True
+
+    run_starts = numpy.flatnonzero(run_start_mask)
+    run_lengths = numpy.diff(numpy.append(run_starts, pixel_count))
+    single_runs = run_lengths == 1
+
+    # consecutive single pixel runs in a row are merged into one raw segment
+    segment_mask = numpy.ones(len(run_starts), bool)
+    segment_mask[1:] = (
+        ~(single_runs[1:] & single_runs[:-1]) | (run_starts[1:] % width == 0))
+
+    segment_runs = numpy.flatnonzero(segment_mask)
+    segment_starts = run_starts[segment_runs]
+    segment_lengths = numpy.diff(numpy.append(segment_starts, pixel_count))
+    segment_raw = single_runs[segment_runs]
+
+    # split segments into packets of at most RLE_MAX_PACKET pixels
+    segment_packets = -(-segment_lengths // RLE_MAX_PACKET)
+    packet_segments = numpy.repeat(
+        numpy.arange(len(segment_starts)), segment_packets)
+    first_packets = numpy.cumsum(segment_packets) - segment_packets
+    packet_offsets = (
+        numpy.arange(len(packet_segments)) -
+        first_packets[packet_segments]) * RLE_MAX_PACKET
+
+    packet_starts = segment_starts[packet_segments] + packet_offsets
+    packet_lengths = numpy.minimum(
+        segment_lengths[packet_segments] - packet_offsets, RLE_MAX_PACKET)
+    packet_raw = segment_raw[packet_segments]
+    packet_count = len(packet_starts)
+
+    # raw packets store every pixel, run packets only their first
+    stored_counts = numpy.where(packet_raw, packet_lengths, 1)
+    stored_packets = numpy.repeat(numpy.arange(packet_count), stored_counts)
+    first_stored = numpy.cumsum(stored_counts) - stored_counts
+    stored_count = len(stored_packets)
+
+    stored_pixels = (
+        packet_starts[stored_packets] + numpy.arange(stored_count) -
+        first_stored[stored_packets])
+
+    encoded = numpy.empty(stored_count * channels + packet_count, numpy.uint8)
+
+    # each header sits before the pixels of its packet
+    header_positions = first_stored * channels + numpy.arange(packet_count)
+    encoded[header_positions] = numpy.where(
+        packet_raw, packet_lengths - 1, (packet_lengths - 1) | RLE_RUN_FLAG)
+
+    pixel_positions = numpy.arange(stored_count) * channels + stored_packets + 1
+    encoded[pixel_positions[:, None] + numpy.arange(channels)] = (
+        flat_pixels[stored_pixels])
+
+    return encoded.tobytes()
+
+
+def write_header(file_handle, width, height, pixel_depth, top_down=False,
+                 rle=False):
+    """Writes the header of a true color TGA.
+
+    Arguments:
+        file_handle (file): file opened for binary writing
+        width (int): width of the image
+        height (int): height of the image
+        pixel_depth (int): 24 or 32 bits per pixel
+
+    Keyword Arguments:
+        top_down (bool): rows are written top to bottom instead of the
+            default bottom to top (default: {False})
+        rle (bool): the pixel data is RLE compressed (default: {False})
+    """
+
+    # the low bits of the descriptor hold the number of alpha bits
+    descriptor = 8 if pixel_depth == 32 else 0
+
+    if top_down:
+        descriptor |= TGA_TOP_DOWN_FLAG
+
+    image_type = TGA_TRUE_COLOR
+
+    if rle:
+        image_type |= TGA_RLE_FLAG
+
+    file_handle.write(TGA_HEADER.pack(
+        0, 0, image_type, 0, 0, 0, 0, 0, width, height, pixel_depth,
+        descriptor))
+
+
+def write_pixels(file_handle, pixels, rle=False):
+    """Writes rows of pixels after a header written by write_header.
+
+    Arguments:
+        file_handle (file): file opened for binary writing
+        pixels (numpy.ndarray): uint8 array of shape (rows, width, channels)
+            in file order and BGR(A) layout
+
+    Keyword Arguments:
+        rle (bool): RLE compress the rows, a few rows at a time to bound
+            the memory used by the encoder (default: {False})
+    """
+
+    if not rle:
+        file_handle.write(numpy.ascontiguousarray(pixels).tobytes())
+        return
+
+    for row_start in range(0, pixels.shape[0], RLE_WRITE_ROWS):
+        file_handle.write(
+            encode_rle(pixels[row_start:row_start + RLE_WRITE_ROWS]))
+
+
+def write_tga(file_name, rgb, alpha=None, rle=False):
+    """Saves RGB and alpha arrays as a true color TGA.
+
+    Like save_tga, the TGA is 32 bit when an alpha channel is given and 24
+    bit otherwise. Rows are stored top to bottom.
+
+    Arguments:
+        file_name (string): path of the TGA
+        rgb (numpy.ndarray): uint8 array of shape (height, width, 3)
+
+    Keyword Arguments:
+        alpha (numpy.ndarray): uint8 array of shape (height, width)
+            (default: {None})
+        rle (bool): RLE compress the pixel data (default: {False})
+    """
+
+    height, width = rgb.shape[:2]
+    channels = 3 if alpha is None else 4
+
+    pixels = numpy.empty((height, width, channels), numpy.uint8)
+    pixels[..., 2::-1] = rgb
+
+    if alpha is not None:
+        pixels[..., 3] = alpha
+
+    with open(file_name, 'wb') as file_handle:
+        write_header(file_handle, width, height, channels * 8, True, rle)
+        write_pixels(file_handle, pixels, rle)
+
+
+class TgaMemmap(object):
+    """
+    Memory mapped view of the pixels of an uncompressed true color TGA.
+
+    The pixel block of an uncompressed TGA is a flat array of BGR(A) pixels
+    directly after the header, so it is mapped into a NumPy array without
+    decoding. pixels keeps the row order of the file, rows, rgb and alpha
+    are views that present the image top to bottom in RGB order by using
+    negative strides instead of copying.
+    """
+
+    def __init__(self, path, mode='r'):
+        """Maps the pixel data of an existing TGA.
+
+        Arguments:
+            path (string): path of the TGA
+
+        Keyword Arguments:
+            mode (string): numpy.memmap mode, 'r' for read only or 'r+' to
+                modify the file in place (default: {'r'})
+        """
+
+        super(TgaMemmap, self).__init__()
+
+        with open(path, 'rb') as file_handle:
+            self.header = read_header(file_handle)
+            pixel_offset = file_handle.tell()
+
+        if self.header.image_type != TGA_TRUE_COLOR or not is_true_color(self.header):
+            raise TgaError('Only uncompressed 24 and 32 bit TGA files can be mapped')
+
+        self.path = path
+        self.channels = self.header.pixel_depth // 8
+
+        self.pixels = numpy.memmap(
+            path, numpy.uint8, mode, pixel_offset,
+            (self.header.height, self.header.width, self.channels))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    @classmethod
+    def create(cls, path, width, height, channels, top_down=True):
+        """Creates an uncompressed TGA of the final size and maps its pixels.
+
+        The caller fills the pixels, rows, rgb or alpha views and the data
+        is written to disk by the operating system, no encode step is run.
+
+        Arguments:
+            path (string): path of the TGA to create
+            width (int): width of the image
+            height (int): height of the image
+            channels (int): 3 for a 24 bit or 4 for a 32 bit TGA
+
+        Keyword Arguments:
+            top_down (bool): store rows top to bottom, which lets rows be
+                filled in order (default: {True})
+
+        Returns:
+            TgaMemmap -- writable mapping of the new file
+        """
+
+        with open(path, 'wb') as file_handle:
+            write_header(file_handle, width, height, channels * 8, top_down)
+
+            # extend the file to its final size
+            file_handle.seek(width * height * channels - 1, 1)
+            file_handle.write(b'\0')
+
+        return cls(path, 'r+')
+
+    @property
+    def top_down(self):
+        """bool -- True if the rows are stored top to bottom."""
+
+        return bool(self.header.descriptor & TGA_TOP_DOWN_FLAG)
+
+    @property
+    def rows(self):
+        """numpy.ndarray -- BGR(A) pixels ordered top to bottom."""
+
+        if self.top_down:
+            return self.pixels
+
+        return self.pixels[::-1]
+
+    @property
+    def rgb(self):
+        """numpy.ndarray -- RGB pixels ordered top to bottom."""
+
+        return self.rows[..., 2::-1]
+
+    @property
+    def alpha(self):
+        """numpy.ndarray -- alpha channel ordered top to bottom, or None."""
+
+        if self.channels < 4:
+            return None
+
+        return self.rows[..., 3]
+
+    def flush(self):
+        """Writes changes made through a writable mapping to disk."""
+
+        self.pixels.flush()
+
+    def close(self):
+        """Flushes changes and releases the mapping of the file."""
+
+        if self.pixels is not None:
+            if self.pixels.mode != 'r':
+                self.flush()
+
+            self.pixels = None
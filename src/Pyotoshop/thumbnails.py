@@ -0,0 +1,251 @@
+"""Persistent on disk cache of texture thumbnails."""
+
+import os
+import hashlib
+import tempfile
+import threading
+import collections
+
+from .lazy import Image, numpy
+from .index import TextureIndex
+from .tga import TgaError, TgaMemmap
+
+# Global Variables ------------------------------------------------------------
+THUMBNAIL_DIR_NAME = 'thumbnails'
+
+# longest side of a thumbnail in pixels
+THUMBNAIL_SIZE = 128
+
+DEFAULT_THUMBNAIL_BUDGET = 256 * 1024 * 1024
+
+# bumped whenever the way thumbnails are made changes, older ones are orphaned
+THUMBNAIL_VERSION = 1
+
+
+def load_thumbnail(texture_path, thumbnail_size=THUMBNAIL_SIZE):
+    """Makes a thumbnail of a texture without decoding it at full size.
+
+    Uncompressed TGAs are memory mapped and only every nth pixel is read.
+    JPEGs are decoded at a reduced scale through Image.draft. Other formats
+    are decoded and shrunk with Image.thumbnail.
+
+    Arguments:
+        texture_path (string): path of the texture
+
+    Keyword Arguments:
+        thumbnail_size (int): longest side of the thumbnail
+            (default: {THUMBNAIL_SIZE})
+
+    Returns:
+        PIL.Image -- RGB or RGBA thumbnail
+    """
+
+    try:
+        source = TgaMemmap(texture_path)
+    except TgaError:
+        source = None
+
+    if source is not None:
+        step = max(1, max(source.header.width, source.header.height) // thumbnail_size)
+
+        if source.alpha is None:
+            pixels = source.rgb[::step, ::step]
+        else:
+            pixels = source.rows[::step, ::step, [2, 1, 0, 3]]
+
+        image = Image.fromarray(numpy.ascontiguousarray(pixels))
+        source.close()
+    else:
+        image = Image.open(texture_path)
+
+        # only JPEG decoders can skip detail, draft is a no op for the rest
+        image.draft('RGB', (thumbnail_size, thumbnail_size))
+
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    image.thumbnail((thumbnail_size, thumbnail_size))
+
+    return image
+
+
+class ThumbnailCache(object):
+    """
+    Least recently used cache of thumbnail files with a byte budget.
+
+    Thumbnails are PNG files named after a hash of the texture path,
+    modification time and file size, so an edited texture gets a new
+    thumbnail and the old one ages out. The cache survives restarts. The
+    modification time of a thumbnail file is refreshed on every hit and is
+    used to rebuild the least recently used order when the cache is opened.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, cache_dir=None, budget=DEFAULT_THUMBNAIL_BUDGET,
+                 thumbnail_size=THUMBNAIL_SIZE):
+        """Opens the cache, creating its directory if needed.
+
+        Keyword Arguments:
+            cache_dir (string): directory of the thumbnail files, a
+                thumbnails directory next to the texture index when None
+                (default: {None})
+            budget (int): bytes of thumbnail files kept before the least
+                recently used ones are deleted (default:
+                {DEFAULT_THUMBNAIL_BUDGET})
+            thumbnail_size (int): longest side of a thumbnail
+                (default: {THUMBNAIL_SIZE})
+        """
+
+        super(ThumbnailCache, self).__init__()
+
+        self.cache_dir = cache_dir or self.default_cache_dir()
+        self.budget = budget
+        self.thumbnail_size = thumbnail_size
+
+        self.size = 0
+        self.thumbnails = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        self.load_entries()
+
+    @classmethod
+    def default_cache_dir(cls):
+        """Determines the per user location of the thumbnail files.
+
+        Returns:
+            string -- thumbnails directory next to the texture index
+        """
+
+        return os.path.join(
+            os.path.dirname(TextureIndex.default_db_path()), THUMBNAIL_DIR_NAME)
+
+    def load_entries(self):
+        """Reads the thumbnail files on disk, oldest first."""
+
+        thumbnail_stats = []
+
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.png'):
+                continue
+
+            try:
+                file_stat = os.stat(os.path.join(self.cache_dir, file_name))
+            except OSError:
+                continue
+
+            thumbnail_stats.append((file_stat.st_mtime, file_name, file_stat.st_size))
+
+        with self.lock:
+            for _, file_name, file_size in sorted(thumbnail_stats):
+                self.thumbnails[file_name] = file_size
+                self.size += file_size
+
+            self.evict(self.budget)
+
+    def thumbnail_name(self, texture_path):
+        """Builds the file name of the thumbnail of a texture.
+
+        Arguments:
+            texture_path (string): path of the texture
+
+        Returns:
+            string -- hash of the path, modification time, file size and
+                thumbnail size
+        """
+
+        file_stat = os.stat(texture_path)
+
+        thumbnail_key = '{0}|{1}|{2}|{3}|{4}'.format(
+            os.path.normcase(os.path.abspath(texture_path)), file_stat.st_mtime,
+            file_stat.st_size, self.thumbnail_size, THUMBNAIL_VERSION)
+
+        return hashlib.sha1(thumbnail_key.encode('utf-8')).hexdigest() + '.png'
+
+    def get(self, texture_path):
+        """Gets the thumbnail file of a texture, making it on a miss.
+
+        Arguments:
+            texture_path (string): path of the texture
+
+        Returns:
+            string -- path of the PNG thumbnail
+        """
+
+        thumbnail_name = self.thumbnail_name(texture_path)
+        thumbnail_path = os.path.join(self.cache_dir, thumbnail_name)
+
+        with self.lock:
+            file_size = self.thumbnails.pop(thumbnail_name, None)
+
+            if file_size is not None:
+                # mark as the most recently used thumbnail, here and on disk
+                self.thumbnails[thumbnail_name] = file_size
+
+        if file_size is not None:
+            try:
+                os.utime(thumbnail_path, None)
+                return thumbnail_path
+            except OSError:
+                # deleted behind the cache, make it again
+                with self.lock:
+                    if self.thumbnails.pop(thumbnail_name, None) is not None:
+                        self.size -= file_size
+
+        self.put(thumbnail_name, load_thumbnail(texture_path, self.thumbnail_size))
+
+        return thumbnail_path
+
+    def put(self, thumbnail_name, image):
+        """Writes a thumbnail, deleting the least recently used ones.
+
+        The file is written under a temporary name and renamed, so a
+        thumbnail read by another thread or process is never partial.
+
+        Arguments:
+            thumbnail_name (string): file name of the thumbnail
+            image (PIL.Image): thumbnail image
+        """
+
+        thumbnail_path = os.path.join(self.cache_dir, thumbnail_name)
+
+        file_handle, temp_path = tempfile.mkstemp('.tmp', '', self.cache_dir)
+
+        with os.fdopen(file_handle, 'wb') as temp_file:
+            image.save(temp_file, 'PNG')
+
+        try:
+            os.rename(temp_path, thumbnail_path)
+        except OSError:
+            # another thread made the same thumbnail first
+            os.remove(temp_path)
+
+        file_size = os.path.getsize(thumbnail_path)
+
+        with self.lock:
+            self.size -= self.thumbnails.pop(thumbnail_name, 0)
+            self.thumbnails[thumbnail_name] = file_size
+            self.size += file_size
+
+            self.evict(self.budget)
+
+    def evict(self, budget):
+        """Deletes the least recently used thumbnails until the cache fits.
+
+        Must be called with the lock held.
+
+        Arguments:
+            budget (int): bytes the thumbnail files have to fit in
+        """
+
+        while self.size > budget and self.thumbnails:
+            thumbnail_name, file_size = self.thumbnails.popitem(last=False)
+            self.size -= file_size
+
+            try:
+                os.remove(os.path.join(self.cache_dir, thumbnail_name))
+            except OSError:
+                pass
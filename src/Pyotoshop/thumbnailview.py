@@ -0,0 +1,289 @@
+"""Grid of texture thumbnails made on demand for the visible rows."""
+
+import os
+import threading
+import collections
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from Qt import QtCore, QtGui, QtWidgets
+
+# Global Variables ------------------------------------------------------------
+# thumbnails kept as pixmaps by the model, the rest are read back from the
+# thumbnail cache when scrolled to again
+PIXMAPS_KEPT = 1000
+
+PLACEHOLDER_COLOR = (64, 64, 64)
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """
+    Makes thumbnails on worker threads, off the GUI thread.
+
+    Requests are kept in a last in, first out queue, so the most recent
+    ones, which are for the rows on screen, run first. Requests that have
+    not started are dropped by clear, which the view calls when it scrolls
+    so the workers do not work through rows that were only scrolled past.
+    """
+
+    thumbnail_ready = QtCore.Signal(str, str)
+
+    def __init__(self, thumbnail_cache, parent=None):
+        """Creates the loader, the workers start with the first request.
+
+        Arguments:
+            thumbnail_cache (ThumbnailCache): cache making and keeping the
+                thumbnail files
+
+        Keyword Arguments:
+            parent (QObject): parent of the loader (default: {None})
+        """
+
+        super(ThumbnailLoader, self).__init__(parent)
+
+        self.thumbnail_cache = thumbnail_cache
+        self.requests = queue.LifoQueue()
+        self.workers = []
+
+    def request(self, texture_path):
+        """Queues the thumbnail of a texture, thumbnail_ready is emitted
+        with the texture path and the thumbnail path when it is done.
+
+        Arguments:
+            texture_path (string): path of the texture
+        """
+
+        if not self.workers:
+            # leave a core for the GUI thread
+            for _ in range(max(1, QtCore.QThread.idealThreadCount() - 1)):
+                worker = threading.Thread(target=self.run_requests)
+                worker.daemon = True
+                worker.start()
+
+                self.workers.append(worker)
+
+        self.requests.put(texture_path)
+
+    def run_requests(self):
+        """Makes the requested thumbnails until a None request."""
+
+        while True:
+            texture_path = self.requests.get()
+
+            if texture_path is None:
+                break
+
+            try:
+                thumbnail_path = self.thumbnail_cache.get(texture_path)
+            except Exception:  # pylint: disable = W0703
+                # unreadable textures get an empty path and keep the placeholder
+                thumbnail_path = ''
+
+            self.thumbnail_ready.emit(texture_path, thumbnail_path)
+
+    def clear(self):
+        """Drops the requests that have not started."""
+
+        try:
+            while True:
+                self.requests.get_nowait()
+        except queue.Empty:
+            pass
+
+    def stop(self):
+        """Drops the waiting requests and waits for the running ones."""
+
+        self.clear()
+
+        for _ in self.workers:
+            self.requests.put(None)
+
+        for worker in self.workers:
+            worker.join()
+
+        self.workers = []
+
+
+class ThumbnailListModel(QtCore.QAbstractListModel):
+    """
+    List model over texture paths showing their thumbnails.
+
+    A thumbnail is only requested when the view asks for the decoration of
+    its row, which a list view with uniform item sizes does only for the
+    rows on screen. A placeholder is shown until the thumbnail is ready.
+    """
+
+    def __init__(self, thumbnail_loader, texture_paths=(), parent=None):
+        """Creates the model.
+
+        Arguments:
+            thumbnail_loader (ThumbnailLoader): loader making the thumbnails
+
+        Keyword Arguments:
+            texture_paths (list): paths of the textures (default: {()})
+            parent (QObject): parent of the model (default: {None})
+        """
+
+        super(ThumbnailListModel, self).__init__(parent)
+
+        self.thumbnail_loader = thumbnail_loader
+
+        self.texture_paths = []
+        self.texture_rows = {}
+
+        # least recently used pixmaps keyed by texture path
+        self.pixmaps = collections.OrderedDict()
+        self.pending_paths = set()
+
+        thumbnail_size = thumbnail_loader.thumbnail_cache.thumbnail_size
+        self.placeholder = QtGui.QPixmap(thumbnail_size, thumbnail_size)
+        self.placeholder.fill(QtGui.QColor(*PLACEHOLDER_COLOR))
+
+        self.thumbnail_loader.thumbnail_ready.connect(self.thumbnail_loaded)
+
+        self.set_texture_paths(texture_paths)
+
+    def set_texture_paths(self, texture_paths):
+        """Replaces the textures shown, loaded pixmaps are kept.
+
+        Arguments:
+            texture_paths (list): paths of the textures
+        """
+
+        self.beginResetModel()
+
+        self.texture_paths = list(texture_paths)
+        self.texture_rows = dict(
+            (texture_path, row) for row, texture_path in enumerate(self.texture_paths))
+
+        self.drop_pending()
+
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):  # pylint: disable = C0103
+        if parent.isValid():
+            return 0
+
+        return len(self.texture_paths)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        texture_path = self.texture_paths[index.row()]
+
+        if role == QtCore.Qt.DisplayRole:
+            return os.path.basename(texture_path)
+
+        if role == QtCore.Qt.ToolTipRole:
+            return texture_path
+
+        if role == QtCore.Qt.DecorationRole:
+            return self.thumbnail(texture_path)
+
+        return None
+
+    def thumbnail(self, texture_path):
+        """Gets the pixmap of a texture, requesting it if it is not loaded.
+
+        Arguments:
+            texture_path (string): path of the texture
+
+        Returns:
+            QPixmap -- the thumbnail, or the placeholder while it loads
+        """
+
+        pixmap = self.pixmaps.pop(texture_path, None)
+
+        if pixmap is not None:
+            # mark as the most recently used pixmap
+            self.pixmaps[texture_path] = pixmap
+            return pixmap
+
+        if texture_path not in self.pending_paths:
+            self.pending_paths.add(texture_path)
+            self.thumbnail_loader.request(texture_path)
+
+        return self.placeholder
+
+    def drop_pending(self):
+        """Drops the requests that have not started.
+
+        Rows still on screen request their thumbnail again when they are
+        painted.
+        """
+
+        self.thumbnail_loader.clear()
+        self.pending_paths.clear()
+
+    @QtCore.Slot(str, str)
+    def thumbnail_loaded(self, texture_path, thumbnail_path):
+        """Stores a finished thumbnail and repaints its row.
+
+        Arguments:
+            texture_path (string): path of the texture
+            thumbnail_path (string): path of the PNG thumbnail, empty when
+                the texture could not be read
+        """
+
+        self.pending_paths.discard(texture_path)
+
+        # small PNG files, cheap to read on the GUI thread
+        pixmap = QtGui.QPixmap(thumbnail_path) if thumbnail_path else None
+
+        if pixmap is None or pixmap.isNull():
+            pixmap = self.placeholder
+
+        self.pixmaps.pop(texture_path, None)
+        self.pixmaps[texture_path] = pixmap
+
+        while len(self.pixmaps) > PIXMAPS_KEPT:
+            self.pixmaps.popitem(last=False)
+
+        row = self.texture_rows.get(texture_path)
+
+        if row is not None:
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+
+class ThumbnailView(QtWidgets.QListView):
+    """
+    Icon mode list view of a ThumbnailListModel.
+    """
+
+    def __init__(self, thumbnail_model, parent=None):
+        """Creates the view.
+
+        Arguments:
+            thumbnail_model (ThumbnailListModel): model of the thumbnails
+
+        Keyword Arguments:
+            parent (QWidget): parent of the view (default: {None})
+        """
+
+        super(ThumbnailView, self).__init__(parent)
+
+        thumbnail_size = thumbnail_model.placeholder.width()
+
+        self.setViewMode(QtWidgets.QListView.IconMode)
+        self.setMovement(QtWidgets.QListView.Static)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
+
+        # lets the view size every item from the first one and lay out tens
+        # of thousands of items without asking the model for each
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+
+        self.setIconSize(QtCore.QSize(thumbnail_size, thumbnail_size))
+        self.setGridSize(QtCore.QSize(
+            thumbnail_size + 24, thumbnail_size + self.fontMetrics().height() + 16))
+        self.setTextElideMode(QtCore.Qt.ElideMiddle)
+
+        self.setModel(thumbnail_model)
+
+        self.verticalScrollBar().valueChanged.connect(
+            lambda *args: thumbnail_model.drop_pending())
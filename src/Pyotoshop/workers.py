@@ -0,0 +1,248 @@
+"""Worker thread running Pyotoshop tasks off the Qt GUI thread."""
+
+import functools
+import threading
+import traceback
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from Qt import QtCore
+
+from .photoshop import initialize_com_thread, uninitialize_com_thread
+
+
+class TaskCanceled(Exception):
+    """Raised in a task that calls the GUI thread once the window closes."""
+
+
+def on_gui_thread(method):
+    """Makes a method of Main run on the GUI thread.
+
+    Called from a worker thread, the method is run on the GUI thread and
+    the worker waits for its result, so popups and dialogs are only ever
+    created by the GUI thread.
+
+    Arguments:
+        method (function): method of an object with a gui_dispatcher
+
+    Returns:
+        function -- the wrapped method
+    """
+
+    @functools.wraps(method)
+    def gui_method(self, *args):
+        return self.gui_dispatcher.call(method, self, *args)
+
+    return gui_method
+
+
+class GuiDispatcher(QtCore.QObject):
+    """
+    Runs callables on the GUI thread on behalf of worker threads.
+
+    Must be created on the GUI thread. A call from a worker thread is sent
+    through a blocking queued connection, a call from the GUI thread runs
+    directly. Once close is called, calls from worker threads raise
+    TaskCanceled instead of opening popups, so a task still running when
+    the window closes ends instead of waiting on the GUI thread.
+    """
+
+    call_requested = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        super(GuiDispatcher, self).__init__(parent)
+
+        self.gui_thread_id = threading.current_thread().ident
+        self.closing = threading.Event()
+
+        self.call_requested.connect(
+            self.run_call, QtCore.Qt.BlockingQueuedConnection)
+
+    def call(self, function, *args):
+        """Runs a callable on the GUI thread and waits for it.
+
+        Arguments:
+            function (callable): callable to run
+
+        Returns:
+            object -- value returned by the callable, an exception it raised
+                is raised again on the calling thread
+        """
+
+        if threading.current_thread().ident == self.gui_thread_id:
+            return function(*args)
+
+        if self.closing.is_set():
+            raise TaskCanceled()
+
+        # [function, args, result, error], filled in by run_call
+        gui_call = [function, args, None, None]
+
+        self.call_requested.emit(gui_call)
+
+        if gui_call[3] is not None:
+            raise gui_call[3]
+
+        return gui_call[2]
+
+    @QtCore.Slot(object)
+    def run_call(self, gui_call):
+        """Runs a call sent by a worker thread.
+
+        Arguments:
+            gui_call (list): [function, args, result, error]
+        """
+
+        # calls sent before the window started closing are still queued
+        if self.closing.is_set():
+            gui_call[3] = TaskCanceled()
+            return
+
+        try:
+            gui_call[2] = gui_call[0](*gui_call[1])
+        except Exception as error:  # pylint: disable = W0703
+            gui_call[3] = error
+
+    def close(self):
+        """Makes later calls from worker threads raise TaskCanceled."""
+
+        self.closing.set()
+
+
+class ProgressProxy(QtCore.QObject):
+    """
+    Thread safe stand in for a QProgressDialog driven by a worker thread.
+
+    It has the QProgressDialog methods used by core.Pyotoshop. Updates are
+    sent to the dialog as queued signals, and the cancel state is kept in
+    a threading.Event. Worker pool jobs can therefore check wasCanceled
+    while they run.
+    """
+
+    value_changed = QtCore.Signal(int)
+    label_changed = QtCore.Signal(str)
+    close_requested = QtCore.Signal()
+
+    def __init__(self, progress_dialog):
+        """Connects the proxy to a dialog, must be called on the GUI thread.
+
+        Arguments:
+            progress_dialog (QProgressDialog): dialog showing the progress
+        """
+
+        super(ProgressProxy, self).__init__()
+
+        self.progress_dialog = progress_dialog
+        self.canceled = threading.Event()
+
+        self.value_changed.connect(progress_dialog.setValue)
+        self.label_changed.connect(progress_dialog.setLabelText)
+        self.close_requested.connect(progress_dialog.close)
+        progress_dialog.canceled.connect(self.canceled.set)
+
+    def setValue(self, value):  # pylint: disable = C0103
+        """Sets the value of the dialog.
+
+        Arguments:
+            value (int): progress value
+        """
+
+        self.value_changed.emit(value)
+
+    def setLabelText(self, text):  # pylint: disable = C0103
+        """Sets the label of the dialog.
+
+        Arguments:
+            text (string): label text
+        """
+
+        self.label_changed.emit(text)
+
+    def wasCanceled(self):  # pylint: disable = C0103
+        """Checks if the user canceled, safe to call from any thread.
+
+        Returns:
+            bool -- True once the cancel button was pressed
+        """
+
+        return self.canceled.is_set()
+
+    def cancel(self):
+        """Cancels the task as the cancel button does, from any thread."""
+
+        self.canceled.set()
+
+    def close(self):
+        """Closes the dialog."""
+
+        self.close_requested.emit()
+
+
+class TaskThread(QtCore.QThread):
+    """
+    Long lived thread running tasks one at a time.
+
+    A single thread is reused for every task because the Photoshop COM
+    connection kept by the PhotoshopSession belongs to the thread that
+    created it.
+    """
+
+    task_finished = QtCore.Signal()
+    task_failed = QtCore.Signal(str)
+
+    def __init__(self, parent=None):
+        super(TaskThread, self).__init__(parent)
+        self.tasks = queue.Queue()
+
+    def submit(self, function, *args):
+        """Queues a task.
+
+        Arguments:
+            function (callable): task to run on the thread
+        """
+
+        self.tasks.put((function, args))
+
+    def stop(self):
+        """Stops the thread once the running task is done.
+
+        Queued tasks that have not started are dropped. It does not wait
+        for the thread, the finished signal is emitted once it ends.
+        """
+
+        while True:
+            try:
+                self.tasks.get_nowait()
+            except queue.Empty:
+                break
+
+        self.tasks.put(None)
+
+    def run(self):
+        """Runs queued tasks until stop is called."""
+
+        initialize_com_thread()
+
+        try:
+            while True:
+                task = self.tasks.get()
+
+                if task is None:
+                    break
+
+                function, args = task
+
+                try:
+                    function(*args)
+                except TaskCanceled:
+                    # the window is closing, there is no one to report to
+                    pass
+                except Exception:  # pylint: disable = W0703
+                    self.task_failed.emit(traceback.format_exc())
+
+                self.task_finished.emit()
+        finally:
+            uninitialize_com_thread()
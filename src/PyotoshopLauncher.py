@@ -0,0 +1,15 @@
+"""Entry script of Pyotoshop.spec, shows the Pyotoshop window.
+
+Set PYOTOSHOP_PROFILE_STARTUP to 1, or to the path of a report file for
+the windowed executable, to time the imports of the startup.
+"""
+
+import sys
+
+from Pyotoshop.startup import start_profiling
+
+start_profiling()
+
+from Pyotoshop.gui import main  # pylint: disable = C0413
+
+sys.exit(main())
@@ -0,0 +1,9 @@
+"""Tests of the Pyotoshop package."""
+
+import os
+import sys
+
+# src goes first so the package is imported rather than the Pyotoshop.py
+# script at the root of the repository
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,90 @@
+"""Tests of the resize backends."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from Pyotoshop.backends import NumpyResizeBackend, PillowResizeBackend
+from Pyotoshop.index import TextureIndex
+
+
+class StubPyotoshop(object):
+    """Pyotoshop attributes read by the resize backends."""
+
+    tga_rle = False
+
+    def __init__(self, temp_dir, resize_memory_budget):
+        super(StubPyotoshop, self).__init__()
+
+        self.resize_memory_budget = resize_memory_budget
+        self.texture_index = TextureIndex(
+            os.path.join(temp_dir, 'texture_index.db'))
+
+    def open_texture_index(self):
+        return self.texture_index
+
+
+class PillowResizeBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_tiled_resize_without_mip_chain(self):
+        # 1024x1024 RGBA is 4 MB, over the 1 MB budget, so it is tiled
+        texture_path = os.path.join(self.temp_dir, 'large.tga')
+        Image.new('RGBA', (1024, 1024), (10, 20, 30, 40)).save(texture_path)
+
+        pyotoshop = StubPyotoshop(self.temp_dir, 1024 * 1024)
+        file_name = os.path.join(self.temp_dir, 'large_256.tga')
+
+        PillowResizeBackend(pyotoshop).resize_chain(
+            texture_path, [256], [file_name])
+
+        pyotoshop.texture_index.close()
+
+        resized_image = Image.open(file_name)
+        self.assertEqual(resized_image.size, (256, 256))
+        self.assertEqual(resized_image.getpixel((0, 0)), (10, 20, 30, 40))
+
+
+class NumpyResizeBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+        # bottom up RGBA TGA with a different value in every block
+        self.texture_path = os.path.join(self.temp_dir, 'large.tga')
+        Image.frombytes('RGBA', (1024, 1024), bytes(bytearray(
+            x % 251 for x in range(1024 * 1024 * 4)))).save(self.texture_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def resize_chain(self, resize_memory_budget, name):
+        pyotoshop = StubPyotoshop(self.temp_dir, resize_memory_budget)
+        file_names = [
+            os.path.join(self.temp_dir, '{0}_{1}.tga'.format(name, x))
+            for x in (256, 128)]
+
+        NumpyResizeBackend(pyotoshop).resize_chain(
+            self.texture_path, [256, 128], file_names)
+
+        pyotoshop.texture_index.close()
+
+        return [Image.open(x).tobytes() for x in file_names]
+
+    def test_tiled_chain_matches_full_chain(self):
+        # 1024x1024 RGBA is 4 MB, over the 1 MB budget, so it is tiled
+        self.assertEqual(
+            self.resize_chain(1024 * 1024, 'tiled'),
+            self.resize_chain(64 * 1024 * 1024, 'full'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests of the decoded image cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from Pyotoshop.cache import DecodedImageCache
+
+
+class DecodedImageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.texture_paths = []
+
+        # 32x32 RGB images hold 3 KB of pixel data each
+        for file_name in ('rock.png', 'sand.png', 'moss.png'):
+            texture_path = os.path.join(self.temp_dir, file_name)
+            Image.new('RGB', (32, 32)).save(texture_path)
+            self.texture_paths.append(texture_path)
+
+        self.image_cache = DecodedImageCache(32 * 32 * 3 * 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_least_recently_used_image_is_evicted(self):
+        rock_path, sand_path, moss_path = self.texture_paths
+
+        rock_image = self.image_cache.load(rock_path)
+        self.image_cache.load(sand_path)
+
+        # rock becomes the most recently used, so sand is evicted for moss
+        self.assertIs(self.image_cache.load(rock_path), rock_image)
+        self.image_cache.load(moss_path)
+
+        self.assertIsNone(self.image_cache.get(sand_path))
+        self.assertIs(self.image_cache.get(rock_path), rock_image)
+
+        cache_stats = self.image_cache.stats()
+        self.assertEqual(cache_stats.evictions, 1)
+        self.assertEqual(cache_stats.entries, 2)
+        self.assertEqual(cache_stats.size, 32 * 32 * 3 * 2)
+
+    def test_smaller_budget_evicts_images(self):
+        for texture_path in self.texture_paths[:2]:
+            self.image_cache.load(texture_path)
+
+        self.image_cache.set_budget(32 * 32 * 3)
+
+        self.assertEqual(self.image_cache.stats().entries, 1)
+        self.assertIsNone(self.image_cache.get(self.texture_paths[0]))
+
+    def test_image_over_the_budget_is_not_cached(self):
+        large_path = os.path.join(self.temp_dir, 'large.png')
+        Image.new('RGB', (64, 64)).save(large_path)
+
+        self.image_cache.load(large_path)
+
+        self.assertEqual(self.image_cache.stats().entries, 0)
+
+    def test_edited_image_is_decoded_again(self):
+        rock_path = self.texture_paths[0]
+        self.image_cache.load(rock_path)
+
+        Image.new('RGB', (16, 16)).save(rock_path)
+
+        self.assertEqual(self.image_cache.load(rock_path).size, (16, 16))
+
+
+if __name__ == '__main__':
+    unittest.main()
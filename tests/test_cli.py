@@ -0,0 +1,27 @@
+"""Tests of the command line interface."""
+
+import os
+import unittest
+
+from Pyotoshop.cli import HeadlessPyotoshop, build_parser
+
+
+class PackStrategyTest(unittest.TestCase):
+
+    def test_strategy_is_set_from_the_arguments(self):
+        args = build_parser().parse_args(
+            ['pack', os.curdir, '--presets', 'presets.json',
+             '--pack-strategy', 'applyimage'])
+
+        self.assertEqual(args.pack_strategy, 'applyimage')
+
+    def test_unknown_strategy_is_rejected(self):
+        pyotoshop = HeadlessPyotoshop()
+        pyotoshop.photoshop_pack_strategy = 'paste'
+
+        with self.assertRaises(ValueError):
+            pyotoshop.pack_textures([])
+
+
+if __name__ == '__main__':
+    unittest.main()
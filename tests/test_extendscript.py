@@ -0,0 +1,33 @@
+"""Tests of the ExtendScript job descriptions."""
+
+import unittest
+
+from Pyotoshop.extendscript import pack_script_job
+from Pyotoshop.packing import PackJob
+
+
+class PackScriptJobTest(unittest.TestCase):
+
+    def test_png_sources_are_packed_to_tga(self):
+        pack_job = PackJob(
+            'textures/rock_packed.png',
+            ('textures/rock_R.png', 'textures/rock_G.png',
+             'textures/rock_B.png', 'textures/rock_A.png'),
+            (None, None, None, None))
+
+        script_job = pack_script_job(pack_job)
+
+        self.assertEqual(script_job['output'], 'textures/rock_packed.tga')
+        self.assertEqual(script_job['channels'], list(pack_job.channel_paths))
+
+    def test_jpg_sources_are_packed_to_tga(self):
+        pack_job = PackJob(
+            'rock_packed.jpg', ('rock_R.jpg', 'rock_G.jpg', 'rock_B.jpg', ''),
+            (None, None, None, None))
+
+        self.assertEqual(
+            pack_script_job(pack_job)['output'], 'rock_packed.tga')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests of the texture metadata index."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import scandir
+from PIL import Image
+
+from Pyotoshop.index import TextureIndex
+
+
+class TextureIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.texture_index = TextureIndex(
+            os.path.join(self.temp_dir, 'texture_index.db'))
+
+        self.texture_paths = []
+
+        for file_name in ('rock.tga', 'sand.png'):
+            texture_path = os.path.join(self.temp_dir, file_name)
+            Image.new('RGB', (64, 32)).save(texture_path)
+            self.texture_paths.append(texture_path)
+
+    def tearDown(self):
+        self.texture_index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def texture_entries(self):
+        return [x for x in scandir.scandir(self.temp_dir)
+                if x.path in self.texture_paths]
+
+    def test_partition_finds_changed_textures(self):
+        rock_path, sand_path = self.texture_paths
+
+        _, stale_textures = self.texture_index.partition(self.texture_entries())
+        self.assertEqual(
+            sorted(x[0] for x in stale_textures), sorted(self.texture_paths))
+
+        for texture_path in self.texture_paths:
+            self.texture_index.lookup_path(texture_path)
+
+        # a different size makes the stored record of the texture stale
+        Image.new('RGB', (128, 32)).save(sand_path)
+
+        current_records, stale_textures = self.texture_index.partition(
+            self.texture_entries())
+
+        self.assertEqual(list(current_records), [rock_path])
+        self.assertEqual([x[0] for x in stale_textures], [sand_path])
+        self.assertEqual(self.texture_index.lookup_path(sand_path).width, 128)
+
+    def test_relative_path_shares_the_absolute_record(self):
+        rock_path = self.texture_paths[0]
+        current_dir = os.getcwd()
+
+        os.chdir(self.temp_dir)
+
+        try:
+            self.texture_index.lookup_path('rock.tga')
+            relative_record = self.texture_index.find('rock.tga')
+            texture_records = self.texture_index.find_many(
+                ['rock.tga', rock_path])
+        finally:
+            os.chdir(current_dir)
+
+        self.assertEqual(relative_record.path, 'rock.tga')
+        self.assertEqual(self.texture_index.find(rock_path).path, rock_path)
+        self.assertEqual(sorted(texture_records), sorted(['rock.tga', rock_path]))
+        self.assertEqual(texture_records[rock_path].width, 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
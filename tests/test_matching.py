@@ -0,0 +1,58 @@
+"""Tests of the matching of texture files to channel suffixes."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import scandir
+
+from Pyotoshop.matching import SuffixMatcher
+
+
+class SuffixMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.suffix_matcher = SuffixMatcher(
+            [('Red', '_Roughness'), ('Green', '_R'), ('Blue', '_AO'),
+             ('Alpha', '')], ('.tga', '.png'))
+
+    def test_longest_suffix_wins(self):
+        self.assertEqual(
+            self.suffix_matcher.match('rock_Roughness.tga'), ('rock', 'Red'))
+        self.assertEqual(
+            self.suffix_matcher.match('rock_R.tga'), ('rock', 'Green'))
+
+    def test_suffix_must_end_the_name(self):
+        self.assertIsNone(self.suffix_matcher.match('rock_AO_old.tga'))
+        self.assertEqual(
+            self.suffix_matcher.match('rock_AO_AO.PNG'), ('rock_AO', 'Blue'))
+
+    def test_other_extensions_and_empty_suffixes_are_skipped(self):
+        self.assertIsNone(self.suffix_matcher.match('rock_AO.jpg'))
+        self.assertIsNone(self.suffix_matcher.match('rock.tga'))
+        self.assertIsNone(SuffixMatcher([], ('.tga',)).match('rock_AO.tga'))
+
+    def test_group_keeps_the_first_file_of_each_source(self):
+        temp_dir = tempfile.mkdtemp()
+
+        try:
+            for file_name in ('rock_AO.png', 'rock_AO.tga', 'rock_R.tga',
+                              'sand_AO.tga', 'notes.txt'):
+                open(os.path.join(temp_dir, file_name), 'w').close()
+
+            dir_files = sorted(
+                scandir.scandir(temp_dir), key=lambda x: x.name)
+            source_sets = self.suffix_matcher.group(dir_files)
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(list(source_sets), ['rock', 'sand'])
+        self.assertEqual(source_sets['rock'], {
+            'Blue': os.path.join(temp_dir, 'rock_AO.png'),
+            'Green': os.path.join(temp_dir, 'rock_R.tga')})
+        self.assertEqual(list(source_sets['sand']), ['Blue'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Tests of the in memory channel packing."""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from PIL import Image
+
+from Pyotoshop.packing import load_channel, load_pack_presets, pack_channels
+
+
+class PackChannelsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+        random_state = numpy.random.RandomState(0)
+        self.sources = {}
+
+        for suffix in ('R', 'G', 'B', 'A'):
+            self.sources[suffix] = Image.fromarray(random_state.randint(
+                0, 256, (16, 16, 3)).astype(numpy.uint8))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save_sources(self, extension):
+        channel_paths = []
+
+        for suffix in ('R', 'G', 'B', 'A'):
+            texture_path = os.path.join(
+                self.temp_dir, 'rock_{0}{1}'.format(suffix, extension))
+            self.sources[suffix].save(texture_path)
+            channel_paths.append(texture_path)
+
+        return channel_paths
+
+    def test_tga_luminance_matches_pillow(self):
+        texture_path = self.save_sources('.tga')[0]
+
+        self.assertTrue(numpy.array_equal(
+            load_channel(texture_path),
+            numpy.asarray(self.sources['R'].convert('L'))))
+
+    def test_packed_channels_match_pillow(self):
+        for extension in ('.tga', '.png'):
+            channel_paths = self.save_sources(extension)
+            tga_file = pack_channels(
+                channel_paths,
+                os.path.join(self.temp_dir, 'rock_packed' + extension))
+
+            self.assertEqual(os.path.splitext(tga_file)[1], '.tga')
+
+            packed = Image.open(tga_file)
+            self.assertEqual(packed.mode, 'RGBA')
+
+            for band, suffix in zip(packed.split(), ('R', 'G', 'B', 'A')):
+                self.assertTrue(numpy.array_equal(
+                    numpy.asarray(band),
+                    numpy.asarray(self.sources[suffix].convert('L'))))
+
+
+    def test_chosen_channels_of_rgba_source(self):
+        random_state = numpy.random.RandomState(1)
+        rgba = random_state.randint(0, 256, (16, 16, 4)).astype(numpy.uint8)
+
+        for extension in ('.tga', '.png'):
+            texture_path = os.path.join(self.temp_dir, 'rock_RGBA' + extension)
+            Image.fromarray(rgba, 'RGBA').save(texture_path)
+
+            # alpha into red, blue into green, red into blue, luminance
+            # into alpha
+            tga_file = pack_channels(
+                [texture_path] * 4,
+                os.path.join(self.temp_dir, 'rock_packed' + extension),
+                ('A', 'B', 'R', None))
+
+            packed = numpy.asarray(Image.open(tga_file))
+            luminance = numpy.asarray(
+                Image.fromarray(rgba, 'RGBA').convert('L'))
+
+            self.assertTrue(numpy.array_equal(packed[..., 0], rgba[..., 3]))
+            self.assertTrue(numpy.array_equal(packed[..., 1], rgba[..., 2]))
+            self.assertTrue(numpy.array_equal(packed[..., 2], rgba[..., 0]))
+            self.assertTrue(numpy.array_equal(packed[..., 3], luminance))
+
+
+class LoadPackPresetsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.presets_path = os.path.join(self.temp_dir, 'presets.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_presets(self, source_channels):
+        with open(self.presets_path, 'w') as presets_file:
+            json.dump([{
+                'name': 'ORM', 'packed_suffix': '_ORM',
+                'channels': {'Red': '_AO', 'Green': '_Roughness',
+                             'Blue': '_Metallic'},
+                'source_channels': source_channels}], presets_file)
+
+    def test_source_channels(self):
+        self.write_presets({'Green': 'G', 'Blue': 'L'})
+
+        pack_preset = load_pack_presets(self.presets_path)[0]
+
+        self.assertEqual(
+            pack_preset.channel_suffixes, ('_AO', '_Roughness', '_Metallic', ''))
+        self.assertEqual(pack_preset.source_channels, (None, 'G', None, None))
+
+    def test_invalid_source_channel(self):
+        self.write_presets({'Green': 'X'})
+
+        self.assertRaises(ValueError, load_pack_presets, self.presets_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
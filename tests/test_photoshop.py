@@ -0,0 +1,44 @@
+"""Tests of the Photoshop session."""
+
+import unittest
+
+from Pyotoshop.photoshop import PhotoshopSession
+
+
+class StubPyotoshop(object):
+    """Pyotoshop attributes read by the session, on an untested OS."""
+
+    photoshop_factory = None
+
+    def __init__(self):
+        super(StubPyotoshop, self).__init__()
+        self.os_checks = 0
+
+    def check_windows_version(self):
+        # the real check shows a popup and returns None off Windows
+        self.os_checks += 1
+
+
+class PhotoshopSessionTest(unittest.TestCase):
+
+    def test_failed_os_probe_runs_once(self):
+        pyotoshop = StubPyotoshop()
+        session = PhotoshopSession(pyotoshop)
+
+        self.assertFalse(session.is_supported_os())
+        self.assertFalse(session.is_supported_os())
+        self.assertEqual(pyotoshop.os_checks, 1)
+
+    def test_availability_is_checked_without_the_os_probe(self):
+        pyotoshop = StubPyotoshop()
+        session = PhotoshopSession(pyotoshop)
+
+        session.is_available()
+        self.assertEqual(pyotoshop.os_checks, 0)
+
+        pyotoshop.photoshop_factory = object()
+        self.assertTrue(session.is_available())
+
+
+if __name__ == '__main__':
+    unittest.main()
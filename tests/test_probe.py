@@ -0,0 +1,87 @@
+"""Tests of the header only texture probes."""
+
+import os
+import zlib
+import shutil
+import struct
+import tempfile
+import unittest
+
+from PIL import Image
+
+from Pyotoshop.probe import PNG_SIGNATURE, probe_image
+
+
+class ProbeImageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, file_name, data):
+        texture_path = os.path.join(self.temp_dir, file_name)
+
+        with open(texture_path, 'wb') as texture_file:
+            texture_file.write(data)
+
+        return texture_path
+
+    def write_tga(self, pixel_depth, alpha_bits):
+        # uncompressed true color header followed by black pixels
+        header = struct.pack(
+            '<BBBHHBHHHHBB', 0, 0, 2, 0, 0, 0, 0, 0, 8, 4, pixel_depth,
+            alpha_bits)
+
+        return self.write_file(
+            'texture_{0}.tga'.format(pixel_depth),
+            header + b'\0' * (8 * 4 * pixel_depth // 8))
+
+    def write_png_header(self, sample_depth, color_type):
+        ihdr = struct.pack('>IIBBBBB', 8, 4, sample_depth, color_type, 0, 0, 0)
+
+        return self.write_file('texture.png', PNG_SIGNATURE + struct.pack(
+            '>I4s13sI', len(ihdr), b'IHDR', ihdr,
+            zlib.crc32(b'IHDR' + ihdr) & 0xFFFFFFFF))
+
+    def test_tga_alpha_comes_from_the_pixel_depth(self):
+        # alpha bits set on a 24 bit TGA do not give it an alpha channel
+        rgb_info = probe_image(self.write_tga(24, 8))
+        rgba_info = probe_image(self.write_tga(32, 8))
+
+        self.assertEqual((rgb_info.mode, rgb_info.has_alpha), ('RGB', False))
+        self.assertEqual((rgba_info.mode, rgba_info.has_alpha), ('RGBA', True))
+        self.assertEqual((rgba_info.width, rgba_info.height), (8, 4))
+
+    def test_16_bit_tga_alpha_is_the_attribute_bit(self):
+        self.assertTrue(probe_image(self.write_tga(16, 1)).has_alpha)
+        self.assertFalse(probe_image(self.write_tga(16, 0)).has_alpha)
+
+    def test_16_bit_png_modes_are_pillow_modes(self):
+        for color_type, mode, channels in ((0, 'I;16', 1), (2, 'RGB', 3),
+                                           (4, 'RGBA', 2), (6, 'RGBA', 4)):
+            image_info = probe_image(self.write_png_header(16, color_type))
+
+            self.assertEqual(
+                (image_info.mode, image_info.channels, image_info.bit_depth),
+                (mode, channels, 16 * channels))
+
+    def test_png_and_jpeg_headers(self):
+        palette_path = os.path.join(self.temp_dir, 'palette.png')
+        Image.new('P', (16, 8)).save(palette_path, transparency=0)
+
+        jpeg_path = os.path.join(self.temp_dir, 'photo.jpg')
+        Image.new('RGB', (16, 8)).save(jpeg_path)
+
+        palette_info = probe_image(palette_path)
+        jpeg_info = probe_image(jpeg_path)
+
+        self.assertEqual(
+            (palette_info.mode, palette_info.has_alpha), ('P', True))
+        self.assertEqual(
+            (jpeg_info.width, jpeg_info.height, jpeg_info.mode), (16, 8, 'RGB'))
+
+
+if __name__ == '__main__':
+    unittest.main()
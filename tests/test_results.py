@@ -0,0 +1,125 @@
+"""Tests of the resize analysis results and their export."""
+
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from Pyotoshop.cli import HeadlessPyotoshop
+from Pyotoshop.index import TextureIndex
+from Pyotoshop.results import build_result_records
+from Pyotoshop.results import write_results_csv, write_results_json
+
+
+class ResultRecordsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.texture_dir = os.path.join(self.temp_dir, 'textures')
+        os.makedirs(self.texture_dir)
+
+        self.texture_paths = {}
+
+        for file_name, size in (('rock.tga', (512, 512)),
+                                ('rock_256.tga', (256, 256)),
+                                ('wide.png', (64, 32))):
+            texture_path = os.path.join(self.texture_dir, file_name)
+            Image.new('RGB', size).save(texture_path)
+            self.texture_paths[file_name] = texture_path
+
+        self.pyotoshop = HeadlessPyotoshop()
+        self.pyotoshop.target_texture_size = 256
+        self.pyotoshop.texture_index = TextureIndex(
+            os.path.join(self.temp_dir, 'texture_index.db'))
+
+    def tearDown(self):
+        self.pyotoshop.texture_index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def build_records(self):
+        texture_dict = self.pyotoshop.find_textures_to_resize(self.texture_dir)
+
+        return dict(
+            (x.category, x) for x in build_result_records(
+                texture_dict, self.pyotoshop.texture_index))
+
+    def test_already_sized_texture_has_path_and_size(self):
+        sized_record = self.build_records()['Already Sized Textures']
+        texture_path = self.texture_paths['rock_256.tga']
+
+        self.assertEqual(sized_record.path, texture_path)
+        self.assertEqual(sized_record.size, os.path.getsize(texture_path))
+        self.assertEqual((sized_record.width, sized_record.height), (256, 256))
+
+    def test_larger_texture_is_pending_without_a_resize(self):
+        larger_record = self.build_records()['Larger Textures']
+
+        self.assertEqual(larger_record.action, 'Pending')
+
+    def test_larger_texture_action_is_the_resize_outcome(self):
+        texture_dict = self.pyotoshop.find_textures_to_resize(self.texture_dir)
+        texture_path = self.texture_paths['rock.tga']
+
+        for resize_outcome in ('Resized', 'Failed'):
+            result_records = build_result_records(
+                texture_dict, self.pyotoshop.texture_index,
+                {texture_path: resize_outcome})
+
+            self.assertEqual(
+                [x.action for x in result_records if x.path == texture_path],
+                [resize_outcome])
+
+    def test_failed_resize_is_reported(self):
+        self.pyotoshop.resize_backend = 'pillow'
+
+        stone_path = os.path.join(self.texture_dir, 'stone.tga')
+        Image.new('RGB', (512, 512)).save(stone_path)
+
+        # the resized texture cannot be saved over a directory
+        os.makedirs(os.path.join(self.texture_dir, 'stone_256.tga'))
+
+        self.pyotoshop.parse_texture_to_resize(self.texture_dir)
+
+        larger_actions = dict(
+            (x.path, x.action) for x in self.pyotoshop.result_records
+            if x.category == 'Larger Textures')
+
+        self.assertEqual(larger_actions, {
+            self.texture_paths['rock.tga']: 'Resized', stone_path: 'Failed'})
+
+    def test_export_lists_every_category(self):
+        result_records = list(self.build_records().values())
+
+        csv_path = os.path.join(self.temp_dir, 'results.csv')
+        json_path = os.path.join(self.temp_dir, 'results.json')
+
+        write_results_csv(result_records, csv_path)
+        write_results_json(result_records, json_path)
+
+        with open(csv_path) as csv_file:
+            csv_rows = dict(
+                (x['category'], x) for x in csv.DictReader(csv_file))
+
+        with open(json_path) as json_file:
+            json_rows = dict((x['category'], x) for x in json.load(json_file))
+
+        self.assertEqual(
+            sorted(csv_rows), ['Already Sized Textures', 'Larger Textures',
+                               'Not Square'])
+
+        texture_path = self.texture_paths['rock_256.tga']
+
+        self.assertEqual(csv_rows['Already Sized Textures']['path'], texture_path)
+        self.assertEqual(csv_rows['Already Sized Textures']['width'], '256')
+        self.assertEqual(json_rows['Already Sized Textures']['path'], texture_path)
+        self.assertEqual(json_rows['Already Sized Textures']['height'], 256)
+        self.assertEqual(
+            json_rows['Not Square']['path'], self.texture_paths['wide.png'])
+
+
+if __name__ == '__main__':
+    unittest.main()
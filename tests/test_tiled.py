@@ -0,0 +1,110 @@
+"""Tests of the bounded memory strip resizing."""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+
+import numpy
+from PIL import Image
+
+from Pyotoshop import tiled
+
+
+def write_paeth_png(file_name, pixels):
+    """Writes an RGBA PNG with every row Paeth filtered."""
+
+    height, width, channels = pixels.shape
+    rows = pixels.reshape(height, -1).astype(numpy.int16)
+
+    left = numpy.zeros_like(rows)
+    left[:, channels:] = rows[:, :-channels]
+    upper = numpy.zeros_like(rows)
+    upper[1:] = rows[:-1]
+    upper_left = numpy.zeros_like(rows)
+    upper_left[1:, channels:] = rows[:-1, :-channels]
+
+    estimate = left + upper - upper_left
+    left_distance = abs(estimate - left)
+    upper_distance = abs(estimate - upper)
+    upper_left_distance = abs(estimate - upper_left)
+
+    predictor = numpy.where(
+        (left_distance <= upper_distance) &
+        (left_distance <= upper_left_distance),
+        left, numpy.where(upper_distance <= upper_left_distance,
+                          upper, upper_left))
+
+    filtered_rows = numpy.hstack((
+        numpy.full((height, 1), 4, numpy.uint8),
+        ((rows - predictor) & 0xFF).astype(numpy.uint8)))
+
+    with open(file_name, 'wb') as png_file:
+        png_file.write(tiled.PNG_SIGNATURE)
+        png_file.write(tiled.png_chunk(b'IHDR', struct.pack(
+            '>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        png_file.write(tiled.png_chunk(
+            b'IDAT', zlib.compress(filtered_rows.tobytes())))
+        png_file.write(tiled.png_chunk(b'IEND', b''))
+
+
+class PngStripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.texture_path = os.path.join(self.temp_dir, 'paeth.png')
+
+        random_state = numpy.random.RandomState(0)
+        self.pixels = numpy.cumsum(
+            random_state.randint(0, 3, (24, 40, 4)), axis=1).astype(
+                numpy.uint8)
+
+        write_paeth_png(self.texture_path, self.pixels)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def read_strips(self, rows_per_strip):
+        with open(self.texture_path, 'rb') as png_file:
+            header = tiled.read_png_header(png_file)
+
+            return numpy.concatenate(list(
+                tiled.iter_png_strips(png_file, header, rows_per_strip)))
+
+    def test_paeth_rows_match_pillow(self):
+        self.assertTrue(numpy.array_equal(
+            numpy.asarray(Image.open(self.texture_path)), self.pixels))
+        self.assertTrue(numpy.array_equal(self.read_strips(5), self.pixels))
+
+    def test_blocks_smaller_than_strips(self):
+        decode_pixels = tiled.PNG_DECODE_PIXELS
+        tiled.PNG_DECODE_PIXELS = 3 * 40
+
+        try:
+            strips = self.read_strips(7)
+        finally:
+            tiled.PNG_DECODE_PIXELS = decode_pixels
+
+        self.assertTrue(numpy.array_equal(strips, self.pixels))
+
+    def test_row_unfilter_matches_pillow(self):
+        with open(self.texture_path, 'rb') as png_file:
+            tiled.read_png_header(png_file)
+            filtered_rows = numpy.frombuffer(
+                zlib.decompress(b''.join(tiled.iter_png_data(png_file))),
+                numpy.uint8).reshape(24, -1)
+
+        previous_row = numpy.zeros(40 * 4, numpy.uint8)
+
+        for row_index, filtered_row in enumerate(filtered_rows):
+            previous_row = tiled.unfilter_png_row(
+                filtered_row[0], filtered_row[1:], previous_row, 4)
+
+            self.assertTrue(numpy.array_equal(
+                previous_row, self.pixels[row_index].reshape(-1)))
+
+
+if __name__ == '__main__':
+    unittest.main()